@@ -91,27 +91,119 @@ export const updateSettings = (data: any) =>
   })
 
 // Agent endpoints
-export const getDailyDigest = () =>
-  fetchJSON(`${AGENT_BASE_URL}/digest/daily`, {
-    method: 'POST',
-    body: JSON.stringify({ user_id: 1 }),
-  })
+export const getDailyDigest = () => runRecipe('daily_digest')
 
-export const getWeeklyReview = () =>
-  fetchJSON(`${AGENT_BASE_URL}/review/weekly`, {
+export const getWeeklyReview = () => runRecipe('weekly_review')
+
+/**
+ * Run a recipe through the agent's job queue: submit it, then long-poll the
+ * job until it finishes. Resolves with the recipe result.
+ */
+export async function runRecipe(recipeName: string, params: any = {}) {
+  let job = await fetchJSON(`${AGENT_BASE_URL}/recipes/${recipeName}/jobs`, {
     method: 'POST',
-    body: JSON.stringify({ user_id: 1 }),
+    body: JSON.stringify({ user_id: 1, params }),
   })
 
-export const runRecipe = (recipeName: string, params: any = {}) =>
-  fetchJSON(`${AGENT_BASE_URL}/recipes/${recipeName}`, {
+  while (job.status === 'queued' || job.status === 'running') {
+    job = await fetchJSON(`${AGENT_BASE_URL}/jobs/${job.job_id}?wait=30`)
+  }
+
+  if (job.status !== 'succeeded') {
+    throw new Error(job.error || `Recipe ${recipeName} ${job.status}`)
+  }
+
+  return job.result
+}
+
+/**
+ * Run a streaming recipe (e.g. chat_assistant), calling onToken for each text
+ * delta as it arrives and onDone with the final event (which carries the chat
+ * session_id). Resolves with the full response text.
+ */
+export async function streamRecipe(
+  recipeName: string,
+  params: any,
+  onToken: (text: string) => void,
+  onDone?: (event: any) => void
+): Promise<string> {
+  const response = await fetch(`${AGENT_BASE_URL}/recipes/${recipeName}/stream`, {
     method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
     body: JSON.stringify({ user_id: 1, params }),
   })
 
+  if (!response.ok || !response.body) {
+    throw new Error(`HTTP error! status: ${response.status}`)
+  }
+
+  const reader = response.body.getReader()
+  const decoder = new TextDecoder()
+  let buffer = ''
+  let full = ''
+
+  while (true) {
+    const { done, value } = await reader.read()
+    if (done) break
+    buffer += decoder.decode(value, { stream: true })
+
+    // Server-sent events are separated by a blank line
+    let boundary
+    while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+      const raw = buffer.slice(0, boundary)
+      buffer = buffer.slice(boundary + 2)
+      if (!raw.startsWith('data: ')) continue
+
+      const event = JSON.parse(raw.slice(6))
+      if (event.type === 'token') {
+        full += event.text
+        onToken(event.text)
+      } else if (event.type === 'done') {
+        full = event.response
+        onDone?.(event)
+      } else if (event.type === 'error') {
+        throw new Error(event.detail)
+      }
+    }
+  }
+
+  return full
+}
+
+// Agent calls that outlast the API's interactive budget come back as a job (202) to poll
+async function fetchAgentJSON(url: string, options?: RequestInit) {
+  const response = await fetch(url, {
+    ...options,
+    headers: {
+      'Content-Type': 'application/json',
+      ...options?.headers,
+    },
+  })
+
+  if (!response.ok) {
+    throw new Error(`HTTP error! status: ${response.status}`)
+  }
+
+  if (response.status !== 202) {
+    return response.json()
+  }
+
+  const job = await response.json()
+  while (true) {
+    await new Promise((resolve) => setTimeout(resolve, 1000))
+    const result = await fetch(`${API_BASE_URL}${job.result_url}`)
+    if (!result.ok) {
+      throw new Error(`HTTP error! status: ${result.status}`)
+    }
+    if (result.status !== 202) {
+      return result.json()
+    }
+  }
+}
+
 // Next Best Step
 export const getNextBestStep = () =>
-  fetchJSON(`${API_BASE_URL}/agent/next-best-step`, {
+  fetchAgentJSON(`${API_BASE_URL}/agent/next-best-step`, {
     method: 'POST',
     body: JSON.stringify({ user_id: 1 }),
   })
@@ -173,7 +265,10 @@ export const createNurtureCycle = (data: any) =>
     body: JSON.stringify(data),
   })
 
-// Chat/Assistant
-export const sendChatMessage = async (message: string) => {
-  return runRecipe('chat_assistant', { message })
+// Chat/Assistant; pass the session_id from the previous reply to continue a conversation
+export const sendChatMessage = async (message: string, sessionId?: string) => {
+  return runRecipe('chat_assistant', { message, session_id: sessionId })
 }
+
+export const endChatSession = (sessionId: string) =>
+  fetchJSON(`${AGENT_BASE_URL}/chat/sessions/${sessionId}`, { method: 'DELETE' })
@@ -1,6 +1,6 @@
 import { useState } from 'react'
 import { useQuery } from '@tanstack/react-query'
-import { getNextBestStep, runRecipe } from '../api/client'
+import { getNextBestStep, streamRecipe } from '../api/client'
 
 interface Message {
   role: 'user' | 'assistant'
@@ -13,6 +13,8 @@ export default function Assistant() {
   const [input, setInput] = useState('')
   const [loading, setLoading] = useState(false)
   const [nextBestStep, setNextBestStep] = useState<any>(null)
+  // Follow-up messages continue the same server-side session
+  const [sessionId, setSessionId] = useState<string | undefined>(undefined)
 
   const handleSendMessage = async () => {
     if (!input.trim()) return
@@ -27,17 +29,26 @@ export default function Assistant() {
     setInput('')
     setLoading(true)
 
-    try {
-      // Use chat_assistant recipe for real Ollama conversation
-      const response = await runRecipe('chat_assistant', { message: input })
-
-      const assistantMessage: Message = {
-        role: 'assistant',
-        content: response.response || 'I can help you plan your day and manage tasks.',
-        timestamp: new Date(),
-      }
+    // Stream the chat_assistant reply so tokens show up as they are generated
+    const reply: Message = { role: 'assistant', content: '', timestamp: new Date() }
+    const isReply = (m: Message) => m.timestamp === reply.timestamp
 
-      setMessages(prev => [...prev, assistantMessage])
+    try {
+      setMessages(prev => [...prev, reply])
+
+      const response = await streamRecipe(
+        'chat_assistant',
+        { message: input, session_id: sessionId },
+        (text) => {
+          setMessages(prev => prev.map(m => (isReply(m) ? { ...m, content: m.content + text } : m)))
+        },
+        (event) => setSessionId(event.session_id)
+      )
+
+      setMessages(prev => prev.map(m => (isReply(m) ? {
+        ...m,
+        content: response || 'I can help you plan your day and manage tasks.',
+      } : m)))
     } catch (error: any) {
       console.error('Failed to send message:', error)
       const errorMsg = error?.message || String(error)
@@ -46,7 +57,7 @@ export default function Assistant() {
         content: `System Error: ${errorMsg}\n\nAll services are operational. Try refreshing the page or check the browser console.`,
         timestamp: new Date(),
       }
-      setMessages(prev => [...prev, errorMessage])
+      setMessages(prev => [...prev.filter(m => !(isReply(m) && !m.content)), errorMessage])
     } finally {
       setLoading(false)
     }
@@ -13,6 +13,12 @@ if command -v ollama >/dev/null 2>&1; then
         echo "Pulling llama3:8b model (this may take a while)..."
         ollama pull llama3:8b
     }
+
+    # Embedding model for journal/notes retrieval (small)
+    ollama list | grep -q nomic-embed-text || {
+        echo "Pulling nomic-embed-text embedding model..."
+        ollama pull nomic-embed-text
+    }
 else
     echo "⚠ Ollama not found!"
     echo "  Install from: https://ollama.ai"
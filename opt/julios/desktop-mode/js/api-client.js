@@ -52,14 +52,24 @@ class APIClient {
         return await response.json();
     }
 
+    // Recipes run on the agent's job queue: submit, then long-poll until done
     async runAgent(recipeName, params = {}) {
-        const response = await fetch(`${this.agentURL}/recipes/${recipeName}`, {
+        const response = await fetch(`${this.agentURL}/recipes/${recipeName}/jobs`, {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
             body: JSON.stringify({ user_id: 1, params })
         });
         if (!response.ok) throw new Error(`HTTP ${response.status}`);
-        return await response.json();
+        let job = await response.json();
+
+        while (job.status === 'queued' || job.status === 'running') {
+            const poll = await fetch(`${this.agentURL}/jobs/${job.job_id}?wait=30`);
+            if (!poll.ok) throw new Error(`HTTP ${poll.status}`);
+            job = await poll.json();
+        }
+
+        if (job.status !== 'succeeded') throw new Error(job.error || `Recipe ${job.status}`);
+        return job.result;
     }
 
     // Specific API methods
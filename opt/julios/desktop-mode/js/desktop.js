@@ -1300,7 +1300,9 @@ function applySettings(settings) {
 
 async function openTerminal() {
     const content = document.createElement('div');
-    let cwd = '/home/julius';
+    // Each terminal window gets its own persistent shell on the API
+    const sessionId = `desktop-${Date.now()}`;
+    let cwd = '~';
     let commandHistory = [];
     let historyIndex = -1;
 
@@ -1357,19 +1359,11 @@ async function openTerminal() {
             return;
         }
 
-        if (cmd.trim().startsWith('cd ')) {
-            const newDir = cmd.trim().substring(3).trim();
-            // For cd, we'll update cwd but won't actually execute
-            addOutput(`Changed directory to ${newDir}`, 'success');
-            cwd = newDir;
-            return;
-        }
-
         try {
             const response = await fetch(`${api.baseURL}/terminal/execute`, {
                 method: 'POST',
                 headers: { 'Content-Type': 'application/json' },
-                body: JSON.stringify({ command: cmd, cwd: cwd })
+                body: JSON.stringify({ command: cmd, session_id: sessionId })
             });
 
             if (!response.ok) {
@@ -90,6 +90,7 @@ echo "Next steps:"
 echo "  1. Make sure Ollama is installed and running:"
 echo "     → Download from: https://ollama.ai"
 echo "     → Pull a model: ollama pull llama3:8b"
+echo "     → Pull the embedding model: ollama pull nomic-embed-text"
 echo ""
 echo "  2. Initialize the database:"
 echo "     → make db"
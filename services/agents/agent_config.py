@@ -1,7 +1,26 @@
 """Configuration for agent service."""
 import os
+import re
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from pydantic import PrivateAttr, model_validator
 from pydantic_settings import BaseSettings
 
+PIN_HOURS = re.compile(r"^\s*(\d{1,2})\s*-\s*(\d{1,2})\s*$")
+
+
+def parse_pin_hours(value: str) -> Optional[Tuple[int, int]]:
+    """``"7-22"`` -> (7, 22); empty -> None."""
+    if not value.strip():
+        return None
+    match = PIN_HOURS.match(value)
+    if not match:
+        raise ValueError(f"ollama_pin_hours must look like '7-22', got {value!r}")
+    start, end = int(match.group(1)), int(match.group(2))
+    if start > 23 or end > 24:
+        raise ValueError(f"ollama_pin_hours must be local hours (0-24), got {value!r}")
+    return start, end
+
 
 class AgentSettings(BaseSettings):
     """Agent service settings."""
@@ -9,10 +28,89 @@ class AgentSettings(BaseSettings):
     ollama_url: str = "http://localhost:11434"
     ollama_model: str = "llama3:8b"
     ollama_fallback_model: str = "mistral"
+    # Model routing (see agent_core.model_router): tiers from largest to smallest ("" = ollama_model),
+    # each with a latency SLO, and the tier for each recipe ("ask" is the /ask endpoint).
+    # The installers only pull ollama_model, so the small tier uses it too until a smaller model is
+    # pulled and configured, e.g. TIER_MODELS='{"large": "", "small": "llama3.2:3b"}'
+    tier_models: Dict[str, str] = {"large": "", "small": ""}
+    tier_slo_s: Dict[str, float] = {"large": 60.0, "small": 10.0}
+    recipe_tiers: Dict[str, str] = {
+        "next_best_step": "small",
+        "profile_update": "small",
+        "macro_coach": "small",
+    }
+    default_model_tier: str = "large"
+    routing_min_queue_depth: int = 2  # waiting requests before downgrading to meet an SLO
     api_url: str = "http://localhost:8000"
     default_context_window_days: int = 7
+    context_use_bundle: bool = True  # fetch context via /context/bundle, per-module GETs as fallback
+    context_fetch_concurrency: int = 6  # max in-flight per-module requests
+    context_module_timeout_s: float = 10.0
+    # Prompt context is compacted to roughly this many tokens (see agent_core.context_compactor)
+    context_token_budget: int = 3000
+    context_max_text_chars: int = 280
+    ask_retrieval_k: int = 8  # journal/notes/memory items retrieved for /ask
+    api_timeout_s: float = 30.0
+    ollama_timeout_s: float = 120.0
+    # LLM scheduler: concurrent Ollama calls, and how long a request waits before moving up a priority class
+    ollama_max_in_flight: int = 1
+    ollama_priority_aging_s: float = 30.0
+    # Transport retries per model (connection errors and timeouts only), with exponential backoff from this base
+    ollama_transport_attempts: int = 2
+    ollama_retry_backoff_s: float = 0.5
+    # Circuit breaker: consecutive transport failures that open it, how long it stays open, health probe interval
+    ollama_breaker_failures: int = 3
+    ollama_breaker_reset_s: float = 30.0
+    ollama_probe_interval_s: float = 5.0
+    # Model warm-up: models loaded at startup and reloaded when evicted (empty = the primary model)
+    ollama_warm_models: List[str] = []
+    ollama_warm_interval_s: float = 300.0
+    # How long Ollama keeps a model loaded after a request, per model, else the default
+    ollama_keep_alive: Dict[str, str] = {}
+    ollama_default_keep_alive: str = "30m"
+    # Keep models loaded indefinitely during these local hours, e.g. "7-22" (empty = never)
+    ollama_pin_hours: str = ""
+    ollama_pin_models: List[str] = []  # empty = the primary model
+    _pin_window: Optional[Tuple[int, int]] = PrivateAttr(default=None)
+    # Connection pool limits for the shared API and Ollama clients (each)
+    http_max_connections: int = 20
+    http_max_keepalive_connections: int = 10
+    http_keepalive_expiry_s: float = 30.0
+    # Chat sessions: Ollama context window, when to summarize history, and eviction
+    chat_num_ctx: int = 4096
+    chat_summarize_at_tokens: int = 3000
+    chat_keep_turns: int = 4  # most recent turns kept verbatim after summarizing
+    chat_session_idle_s: float = 1800.0
+    chat_max_sessions: int = 50
     default_temperature: float = 0.3
     creative_temperature: float = 0.7
+    # Recipe job queue
+    jobs_db_path: str = str(Path.home() / ".julios" / "data" / "agent_jobs.db")
+    job_workers: int = 2  # recipes run concurrently
+    job_timeout_s: float = 600.0
+    job_retention_days: int = 7
+    # Result cache for deterministic recipes (JSON output, temperature <= 0.3)
+    cache_enabled: bool = True
+    cache_db_path: str = str(Path.home() / ".julios" / "data" / "agent_cache.db")
+    cache_ttl_s: float = 6 * 3600
+    cache_stale_s: float = 24 * 3600  # expired entries kept this much longer, served while Ollama is down
+    cache_max_entries: int = 500
+    cache_max_bytes: int = 20_000_000
+    # LLM call telemetry (token counts and timings per call, see GET /metrics/llm)
+    telemetry_enabled: bool = True
+    telemetry_db_path: str = str(Path.home() / ".julios" / "data" / "agent_telemetry.db")
+    telemetry_retention_days: int = 14
+
+    @model_validator(mode="after")
+    def parse_pin_window(self) -> "AgentSettings":
+        # Parsed once, so a malformed value fails at startup rather than on every LLM call
+        self._pin_window = parse_pin_hours(self.ollama_pin_hours)
+        return self
+
+    @property
+    def pin_window(self) -> Optional[Tuple[int, int]]:
+        """(start, end) local hours of ``ollama_pin_hours``, or None."""
+        return self._pin_window
 
     class Config:
         env_file = ".env"
@@ -0,0 +1,107 @@
+"""Server-side chat sessions that reuse Ollama's KV context between turns.
+
+Ollama's /api/generate returns a ``context`` array encoding the
+conversation so far. Passing it back with the next prompt continues from
+that state, so a follow-up turn only sends (and Ollama only evaluates) the
+new message instead of re-sending the whole context package and history.
+
+A session keeps its turn history alongside that context. When the context
+grows past ``chat_summarize_at_tokens``, the older turns are folded into a
+short summary and the next turn starts a fresh context from the summary
+and the most recent turns. Sessions idle for ``chat_session_idle_s`` are
+evicted, as are the least recently used ones beyond ``chat_max_sessions``.
+"""
+import asyncio
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+from agent_config import settings
+
+
+@dataclass
+class ChatTurn:
+    role: str  # "user" or "assistant"
+    content: str
+
+
+@dataclass
+class ChatSession:
+    id: str
+    user_id: int
+    turns: List[ChatTurn] = field(default_factory=list)
+    # Summary of turns that have been folded out of the context
+    summary: str = ""
+    # Ollama context tokens after the last turn; None means the next turn starts fresh
+    context: Optional[List[int]] = None
+    model: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    last_used_at: float = field(default_factory=time.time)
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock, repr=False)
+
+    @property
+    def context_tokens(self) -> int:
+        return len(self.context) if self.context else 0
+
+    def record(self, message: str, response: str, context: Optional[List[int]], model: Optional[str]):
+        """Append a user/assistant exchange and the context it left behind."""
+        self.turns.append(ChatTurn("user", message))
+        self.turns.append(ChatTurn("assistant", response))
+        self.context = context
+        self.model = model
+        self.last_used_at = time.time()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "session_id": self.id,
+            "user_id": self.user_id,
+            "turns": [{"role": turn.role, "content": turn.content} for turn in self.turns],
+            "summary": self.summary,
+            "context_tokens": self.context_tokens,
+            "model": self.model,
+            "created_at": self.created_at,
+            "last_used_at": self.last_used_at,
+        }
+
+
+class ChatSessionStore:
+    """In-memory chat sessions with idle and size-based eviction."""
+
+    def __init__(self, idle_s: float, max_sessions: int):
+        self.idle_s = idle_s
+        self.max_sessions = max(1, max_sessions)
+        self._sessions: Dict[str, ChatSession] = {}
+
+    def evict(self):
+        """Drop idle sessions, then least recently used ones beyond the cap."""
+        cutoff = time.time() - self.idle_s
+        for session_id in [s.id for s in self._sessions.values() if s.last_used_at < cutoff and not s.lock.locked()]:
+            del self._sessions[session_id]
+
+        excess = len(self._sessions) - self.max_sessions
+        if excess > 0:
+            idle_first = sorted(self._sessions.values(), key=lambda s: s.last_used_at)
+            for session in [s for s in idle_first if not s.lock.locked()][:excess]:
+                del self._sessions[session.id]
+
+    def get(self, session_id: str) -> Optional[ChatSession]:
+        self.evict()
+        return self._sessions.get(session_id)
+
+    def get_or_create(self, user_id: int, session_id: Optional[str] = None) -> ChatSession:
+        """The user's session ``session_id``, or a new one if it is unknown or expired."""
+        session = self.get(session_id) if session_id else None
+        if session is None or session.user_id != user_id:
+            session = ChatSession(id=uuid.uuid4().hex, user_id=user_id)
+            self._sessions[session.id] = session
+        session.last_used_at = time.time()
+        return session
+
+    def delete(self, session_id: str) -> bool:
+        return self._sessions.pop(session_id, None) is not None
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+
+chat_sessions = ChatSessionStore(settings.chat_session_idle_s, settings.chat_max_sessions)
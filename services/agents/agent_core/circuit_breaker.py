@@ -0,0 +1,160 @@
+"""Circuit breaker for Ollama, so an outage fails fast instead of retrying.
+
+Every request to Ollama passes through one shared breaker:
+
+- closed: requests go through; ``ollama_breaker_failures`` consecutive
+  transport failures (connection refused, timeouts) open the circuit
+- open: requests raise OllamaUnavailable immediately, without touching
+  the network or waiting for an LLM slot
+- half-open: one trial request is let through; success closes the
+  circuit, failure opens it again
+
+A background probe polls Ollama's ``/api/tags`` every
+``ollama_probe_interval_s``. A failed probe opens the circuit, and a
+successful one moves an open circuit to half-open, so recovery is noticed
+without sacrificing a user request. Without the probe running, an open
+circuit turns half-open after ``ollama_breaker_reset_s``.
+
+HTTP error responses do not count as failures: Ollama answered, and a
+missing or broken model is for the fallback model to handle.
+"""
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+from agent_config import settings
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class OllamaUnavailable(Exception):
+    """Ollama is unreachable, or the circuit is open and it was not tried."""
+
+    def __init__(self, message: str, retry_after_s: float = 0):
+        super().__init__(message)
+        self.retry_after_s = retry_after_s
+
+
+class CircuitBreaker:
+    """Shared closed / open / half-open state for Ollama requests."""
+
+    def __init__(self, failure_threshold: int, reset_s: float, probe_interval_s: float):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_s = reset_s
+        self.probe_interval_s = probe_interval_s
+        self.state = CLOSED
+        self.failures = 0  # consecutive, while closed
+        self.opened_at: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self._trial_in_flight = False
+        self._probe_task: Optional[asyncio.Task] = None
+        self._counts = {"opened": 0, "rejected": 0, "probes_failed": 0}
+
+    def _transition(self, state: str, reason: str):
+        if state == self.state:
+            return
+        logger.info(f"Ollama circuit {self.state} -> {state}: {reason}")
+        self.state = state
+        if state == OPEN:
+            self.opened_at = time.monotonic()
+            self._counts["opened"] += 1
+        if state == CLOSED:
+            self.failures = 0
+            self.opened_at = None
+        self._trial_in_flight = False
+
+    def retry_after_s(self) -> float:
+        """Seconds until the circuit may let a request through again."""
+        if self.state != OPEN:
+            return 0
+        elapsed = time.monotonic() - self.opened_at
+        return max(0.0, min(self.probe_interval_s, self.reset_s - elapsed))
+
+    def _reject(self):
+        self._counts["rejected"] += 1
+        raise OllamaUnavailable(
+            f"Ollama unavailable (circuit {self.state}): {self.last_error or 'recent failures'}",
+            retry_after_s=self.retry_after_s(),
+        )
+
+    def check(self):
+        """Raise OllamaUnavailable if the circuit is open. Does not take the half-open trial."""
+        if self.state == OPEN and time.monotonic() - self.opened_at >= self.reset_s:
+            self._transition(HALF_OPEN, f"no failures for {self.reset_s:g}s")
+        if self.state == OPEN:
+            self._reject()
+
+    def before_request(self):
+        """Admit a request, or raise OllamaUnavailable. Pair with after_request()."""
+        self.check()
+        if self.state == HALF_OPEN:
+            if self._trial_in_flight:
+                self._reject()
+            self._trial_in_flight = True
+
+    def after_request(self, ok: Optional[bool], error: Optional[BaseException] = None):
+        """Record a request's outcome; None if it was cancelled before finishing."""
+        if ok is None:
+            self._trial_in_flight = False
+        elif ok:
+            self._transition(CLOSED, "request succeeded")
+            self.failures = 0
+        else:
+            if error is not None:
+                self.last_error = str(error) or type(error).__name__
+            self.failures += 1
+            if self.state == HALF_OPEN:
+                self._transition(OPEN, "trial request failed")
+            elif self.state == CLOSED and self.failures >= self.failure_threshold:
+                self._transition(OPEN, f"{self.failures} consecutive failures")
+
+    # Health probe
+
+    def record_probe(self, healthy: bool):
+        if healthy:
+            if self.state == OPEN:
+                self._transition(HALF_OPEN, "health probe succeeded")
+        else:
+            self._counts["probes_failed"] += 1
+            self.last_error = "health probe failed"
+            self._transition(OPEN, "health probe failed")
+
+    async def _probe_loop(self, probe: Callable[[], Awaitable[bool]]):
+        while True:
+            try:
+                healthy = await probe()
+            except Exception:
+                healthy = False
+            self.record_probe(healthy)
+            await asyncio.sleep(self.probe_interval_s)
+
+    def start(self, probe: Callable[[], Awaitable[bool]]):
+        """Poll ``probe`` in the background (no-op if already running)."""
+        if self._probe_task is None:
+            self._probe_task = asyncio.create_task(self._probe_loop(probe))
+
+    async def stop(self):
+        if self._probe_task:
+            self._probe_task.cancel()
+            await asyncio.gather(self._probe_task, return_exceptions=True)
+            self._probe_task = None
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "retry_after_s": round(self.retry_after_s(), 1),
+            "last_error": self.last_error,
+            **self._counts,
+        }
+
+
+breaker = CircuitBreaker(
+    failure_threshold=settings.ollama_breaker_failures,
+    reset_s=settings.ollama_breaker_reset_s,
+    probe_interval_s=settings.ollama_probe_interval_s,
+)
@@ -0,0 +1,105 @@
+"""Application-scoped HTTP clients for the agent service.
+
+One pooled ``httpx.AsyncClient`` talks to the JuliOS API and one to Ollama.
+Both live for the whole process (opened and closed by the FastAPI lifespan
+in main.py), so requests reuse keep-alive connections instead of setting
+up a new TCP connection per call. Routes hand the shared OllamaClient and
+ContextBuilder to recipes through the ``get_*`` dependencies below. The
+recipe result cache and LLM telemetry store are opened alongside them and
+attached to the OllamaClient.
+"""
+from typing import Optional
+import httpx
+from agent_config import settings
+from agent_core.ollama_client import OllamaClient
+from agent_core.context_builder import ContextBuilder
+from agent_core.result_cache import ResultCache
+from agent_core.telemetry import LLMTelemetry
+
+
+def pool_limits() -> httpx.Limits:
+    """Connection pool limits from settings."""
+    return httpx.Limits(
+        max_connections=settings.http_max_connections,
+        max_keepalive_connections=settings.http_max_keepalive_connections,
+        keepalive_expiry=settings.http_keepalive_expiry_s,
+    )
+
+
+class AgentClients:
+    """Shared clients, result cache and telemetry, created on start() and closed on close()."""
+
+    def __init__(self):
+        self.api_http: Optional[httpx.AsyncClient] = None
+        self.ollama_http: Optional[httpx.AsyncClient] = None
+        self.ollama: Optional[OllamaClient] = None
+        self.context_builder: Optional[ContextBuilder] = None
+        self.cache: Optional[ResultCache] = None
+        self.telemetry: Optional[LLMTelemetry] = None
+
+    @property
+    def started(self) -> bool:
+        return self.api_http is not None
+
+    def start(self):
+        """Open the connection pools (no-op if already open)."""
+        if self.started:
+            return
+
+        self.api_http = httpx.AsyncClient(
+            base_url=settings.api_url,
+            timeout=settings.api_timeout_s,
+            limits=pool_limits(),
+        )
+        self.ollama_http = httpx.AsyncClient(
+            timeout=settings.ollama_timeout_s,
+            limits=pool_limits(),
+        )
+        if settings.cache_enabled:
+            self.cache = ResultCache(
+                settings.cache_db_path,
+                ttl_s=settings.cache_ttl_s,
+                max_entries=settings.cache_max_entries,
+                max_bytes=settings.cache_max_bytes,
+                stale_s=settings.cache_stale_s,
+            )
+        if settings.telemetry_enabled:
+            self.telemetry = LLMTelemetry(settings.telemetry_db_path)
+            self.telemetry.prune(settings.telemetry_retention_days * 86400)
+        self.ollama = OllamaClient(client=self.ollama_http, cache=self.cache, telemetry=self.telemetry)
+        self.context_builder = ContextBuilder(client=self.api_http)
+
+    async def close(self):
+        """Close the connection pools."""
+        if not self.started:
+            return
+
+        await self.api_http.aclose()
+        await self.ollama_http.aclose()
+        if self.cache:
+            self.cache.close()
+        if self.telemetry:
+            self.telemetry.close()
+        self.api_http = self.ollama_http = None
+        self.ollama = self.context_builder = self.cache = self.telemetry = None
+
+
+clients = AgentClients()
+
+
+def get_api_client() -> httpx.AsyncClient:
+    """Dependency: pooled client for the JuliOS API (base_url = settings.api_url)."""
+    clients.start()
+    return clients.api_http
+
+
+def get_ollama() -> OllamaClient:
+    """Dependency: shared OllamaClient."""
+    clients.start()
+    return clients.ollama
+
+
+def get_context_builder() -> ContextBuilder:
+    """Dependency: shared ContextBuilder."""
+    clients.start()
+    return clients.context_builder
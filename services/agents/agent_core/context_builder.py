@@ -1,16 +1,47 @@
 """Context builder for aggregating user data."""
+import asyncio
 import httpx
 from datetime import datetime, timedelta
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, List
 from agent_config import settings
 
+ALL_MODULES = [
+    "tasks", "events", "habits", "meals", "workouts", "sleep",
+    "journal", "projects", "skills", "goals", "transactions",
+    "contacts", "bible", "routines"
+]
+
+# Response header carrying the cursor for the next page of an API list
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+# Rows requested per page of an API list (the API's maximum)
+PAGE_SIZE = 500
+
+# Module data keys returned by the API's /context/bundle endpoint
+BUNDLE_KEYS = [
+    "tasks", "events", "habits", "habit_logs", "meals", "workouts", "sleep",
+    "journal", "projects", "skills", "goals", "transactions", "contacts",
+    "bible_plans", "recent_readings", "routines"
+]
+
 
 class ContextBuilder:
     """Builds context packages from user data."""
 
-    def __init__(self, api_url: str = None):
+    def __init__(
+        self,
+        api_url: str = None,
+        use_bundle: bool = None,
+        max_concurrency: int = None,
+        module_timeout: float = None,
+        client: Optional[httpx.AsyncClient] = None,
+    ):
         self.api_url = api_url or settings.api_url
-        self.client = httpx.AsyncClient(timeout=30.0)
+        self.use_bundle = settings.context_use_bundle if use_bundle is None else use_bundle
+        self.max_concurrency = max_concurrency or settings.context_fetch_concurrency
+        self.module_timeout = module_timeout or settings.context_module_timeout_s
+        # A client passed in is shared (see agent_core.clients) and not ours to close
+        self._owns_client = client is None
+        self.client = client or httpx.AsyncClient(timeout=settings.api_timeout_s)
 
     async def build_context(
         self,
@@ -26,18 +57,13 @@ class ContextBuilder:
             include_modules: List of modules to include (None = all)
 
         Returns:
-            Dict with aggregated user data
+            Dict with aggregated user data, plus ``module_errors`` naming any
+            module that could not be fetched
         """
         now = datetime.utcnow()
         start = now - timedelta(days=window_days)
 
-        all_modules = [
-            "tasks", "events", "habits", "meals", "workouts", "sleep",
-            "journal", "projects", "skills", "goals", "transactions",
-            "contacts", "bible", "routines"
-        ]
-
-        modules = include_modules or all_modules
+        modules = include_modules or ALL_MODULES
 
         context = {
             "user_id": user_id,
@@ -46,115 +72,204 @@ class ContextBuilder:
             "window_days": window_days,
         }
 
-        # Tasks
-        if "tasks" in modules:
-            context["tasks"] = await self._get_json(
-                f"/tasks?status=todo"
-            ) + await self._get_json(f"/tasks?status=doing")
+        data = None
+        if self.use_bundle:
+            data = await self._fetch_bundle(modules, window_days)
+        if data is None:
+            data = await self._fetch_modules(modules, start, now)
 
-        # Events
-        if "events" in modules:
-            context["events"] = await self._get_json(
-                f"/calendars/events?start={start.isoformat()}&end={now.isoformat()}"
-            )
+        for key, value in data.items():
+            if key != "contacts":
+                context[key] = value
 
-        # Habits
-        if "habits" in modules:
-            context["habits"] = await self._get_json("/habits?is_active=true")
-            # Get habit logs for window
-            habit_logs = {}
-            for habit in context.get("habits", []):
-                logs = await self._get_json(
-                    f"/habits/{habit['id']}/logs?start={start.isoformat()}"
-                )
-                habit_logs[habit["id"]] = logs
-            context["habit_logs"] = habit_logs
-
-        # Meals
+        # Calculate macro totals
         if "meals" in modules:
-            context["meals"] = await self._get_json(
-                f"/meals?start={start.isoformat()}&end={now.isoformat()}"
-            )
-            # Calculate macro totals
-            context["macro_totals"] = self._calculate_macros(context["meals"])
+            context["macro_totals"] = self._calculate_macros(context.get("meals", []))
 
-        # Workouts
-        if "workouts" in modules:
-            context["workouts"] = await self._get_json(
-                f"/workouts?start={start.isoformat()}&end={now.isoformat()}"
+        # Contacts with upcoming birthdays
+        if "contacts" in modules:
+            context["upcoming_birthdays"] = self._upcoming_birthdays(
+                data.get("contacts", []), now
             )
 
-        # Sleep
-        if "sleep" in modules:
-            context["sleep"] = await self._get_json(
-                f"/sleep?start={start.isoformat()}&end={now.isoformat()}"
-            )
+        return context
 
-        # Journal
-        if "journal" in modules:
-            context["journal"] = await self._get_json(
-                f"/journal?start={start.isoformat()}&end={now.isoformat()}"
+    async def _fetch_bundle(self, modules: list, window_days: int) -> Optional[Dict[str, Any]]:
+        """Fetch all requested modules in one round trip via /context/bundle.
+
+        Returns:
+            Dict of module data, or None if the bundle endpoint is unavailable
+        """
+        try:
+            response = await self.client.get(
+                f"{self.api_url}/context/bundle",
+                params={"window_days": window_days, "modules": ",".join(modules)},
             )
+            response.raise_for_status()
+            bundle = response.json()
+        except (httpx.HTTPError, ValueError):
+            return None
 
-        # Projects
-        if "projects" in modules:
-            context["projects"] = await self._get_json("/projects?status=active")
+        data = {}
+        for key in BUNDLE_KEYS:
+            if key in bundle:
+                data[key] = bundle[key]
+        if "habit_logs" in data:
+            # JSON object keys arrive as strings; keep habit ids as ints like the per-module path
+            data["habit_logs"] = {int(k): v for k, v in data["habit_logs"].items()}
+        return data
 
-        # Skills
-        if "skills" in modules:
-            context["skills"] = await self._get_json("/skills")
+    def _module_endpoints(self, modules: list, start: datetime, now: datetime) -> Dict[str, List[str]]:
+        """Map each data key to the API endpoints that produce it.
 
-        # Goals
-        if "goals" in modules:
-            context["goals"] = await self._get_json("/goals?status=active")
+        Keys with several endpoints have their list results concatenated.
+        """
+        window = f"start={start.isoformat()}&end={now.isoformat()}"
+        endpoints = {}
 
-        # Transactions
+        if "tasks" in modules:
+            endpoints["tasks"] = ["/tasks?status=todo", "/tasks?status=doing"]
+        if "events" in modules:
+            endpoints["events"] = [f"/calendars/events?{window}"]
+        if "habits" in modules:
+            endpoints["habits"] = ["/habits?is_active=true"]
+            endpoints["habit_logs"] = [f"/habits/logs?is_active=true&start={start.isoformat()}"]
+        if "meals" in modules:
+            endpoints["meals"] = [f"/meals?{window}"]
+        if "workouts" in modules:
+            endpoints["workouts"] = [f"/workouts?{window}"]
+        if "sleep" in modules:
+            endpoints["sleep"] = [f"/sleep?{window}"]
+        if "journal" in modules:
+            endpoints["journal"] = [f"/journal?{window}"]
+        if "projects" in modules:
+            endpoints["projects"] = ["/projects?status=active"]
+        if "skills" in modules:
+            endpoints["skills"] = ["/skills"]
+        if "goals" in modules:
+            endpoints["goals"] = ["/goals?status=active"]
         if "transactions" in modules:
-            context["transactions"] = await self._get_json(
-                f"/finances/transactions?start={start.isoformat()}&end={now.isoformat()}"
-            )
-
-        # Contacts with upcoming birthdays
+            endpoints["transactions"] = [f"/finances/transactions?{window}"]
         if "contacts" in modules:
-            all_contacts = await self._get_json("/contacts")
-            upcoming_birthdays = []
-            for contact in all_contacts:
-                if contact.get("birthday"):
-                    # Check if birthday is within next 30 days
-                    bday = datetime.fromisoformat(contact["birthday"].replace("Z", "+00:00"))
-                    # Adjust year to current year
-                    this_year_bday = bday.replace(year=now.year)
-                    if this_year_bday < now:
-                        this_year_bday = bday.replace(year=now.year + 1)
-                    days_until = (this_year_bday - now).days
-                    if 0 <= days_until <= 30:
-                        upcoming_birthdays.append({
-                            "contact": contact,
-                            "days_until": days_until,
-                        })
-            context["upcoming_birthdays"] = upcoming_birthdays
-
-        # Bible
+            endpoints["contacts"] = ["/contacts"]
         if "bible" in modules:
-            context["bible_plans"] = await self._get_json("/bible/plans")
-            context["recent_readings"] = await self._get_json(
-                f"/bible/readings?start={start.isoformat()}"
-            )
-
-        # Routines
+            endpoints["bible_plans"] = ["/bible/plans"]
+            endpoints["recent_readings"] = [f"/bible/readings?start={start.isoformat()}"]
         if "routines" in modules:
-            context["routines"] = await self._get_json("/routines")
+            endpoints["routines"] = ["/routines"]
 
-        return context
+        return endpoints
+
+    async def _fetch_modules(self, modules: list, start: datetime, now: datetime) -> Dict[str, Any]:
+        """Fetch each module with its own API request (fallback path).
+
+        Requests run concurrently, at most ``max_concurrency`` at a time and
+        each bounded by ``module_timeout``. A failed request is reported under
+        ``module_errors`` instead of being silently emptied; a module built
+        from several requests (tasks) keeps the results of the others.
+        """
+        endpoints = self._module_endpoints(modules, start, now)
+        semaphore = asyncio.Semaphore(max(1, self.max_concurrency))
+
+        async def fetch(endpoint: str) -> Any:
+            async with semaphore:
+                return await asyncio.wait_for(
+                    self._fetch_json(endpoint), timeout=self.module_timeout
+                )
+
+        jobs = [(key, endpoint) for key, urls in endpoints.items() for endpoint in urls]
+        results = await asyncio.gather(
+            *(fetch(endpoint) for _, endpoint in jobs),
+            return_exceptions=True,
+        )
 
-    async def _get_json(self, endpoint: str) -> Any:
-        """Fetch JSON from API endpoint."""
+        data = {}
+        errors: Dict[str, List[str]] = {}
+        for (key, endpoint), result in zip(jobs, results):
+            if isinstance(result, asyncio.TimeoutError):
+                errors.setdefault(key, []).append(f"{endpoint}: timed out after {self.module_timeout}s")
+            elif isinstance(result, Exception):
+                errors.setdefault(key, []).append(f"{endpoint}: {result}")
+            elif key in data and isinstance(result, list):
+                data[key] = data[key] + result
+            else:
+                data[key] = result
+
+        # A module built from several endpoints keeps what the others returned
+        for key in endpoints:
+            if key not in data:
+                data[key] = {} if key == "habit_logs" else []
+
+        if "habit_logs" in data:
+            # Keep habit ids as ints and only report logs for the habits in context
+            logs = data["habit_logs"] if isinstance(data["habit_logs"], dict) else {}
+            data["habit_logs"] = {
+                habit["id"]: logs.get(str(habit["id"]), [])
+                for habit in data.get("habits", [])
+            }
+
+        if errors:
+            data["module_errors"] = {key: "; ".join(failed) for key, failed in errors.items()}
+
+        return data
+
+    async def retrieve(self, query: str, k: int = 8, kinds: Optional[List[str]] = None) -> Optional[List[Dict[str, Any]]]:
+        """Journal entries, notes and memory events most relevant to ``query``.
+
+        Args:
+            query: Text to match (e.g. the user's question)
+            k: Number of items
+            kinds: Subset of "journal", "notes", "memory" (None = all)
+
+        Returns:
+            Items ranked by similarity, or None if the API's embedding index
+            is unavailable
+        """
+        params = {"q": query, "k": k}
+        if kinds:
+            params["kinds"] = ",".join(kinds)
         try:
-            response = await self.client.get(f"{self.api_url}{endpoint}")
+            response = await self.client.get(f"{self.api_url}/context/retrieve", params=params)
             response.raise_for_status()
             return response.json()
-        except httpx.HTTPError:
-            return []
+        except (httpx.HTTPError, ValueError):
+            return None
+
+    async def _fetch_json(self, endpoint: str) -> Any:
+        """Fetch JSON from API endpoint, raising on HTTP errors.
+
+        Lists are requested in bounded pages and followed through their
+        X-Next-Cursor header, so the whole window is returned.
+        """
+        response = await self.client.get(f"{self.api_url}{endpoint}", params={"limit": PAGE_SIZE})
+        response.raise_for_status()
+        data = response.json()
+        while isinstance(data, list) and response.headers.get(NEXT_CURSOR_HEADER):
+            response = await self.client.get(
+                f"{self.api_url}{endpoint}",
+                params={"limit": PAGE_SIZE, "cursor": response.headers[NEXT_CURSOR_HEADER]},
+            )
+            response.raise_for_status()
+            data.extend(response.json())
+        return data
+
+    def _upcoming_birthdays(self, contacts: list, now: datetime) -> List[Dict[str, Any]]:
+        """Find contacts whose birthday falls within the next 30 days."""
+        upcoming_birthdays = []
+        for contact in contacts:
+            if contact.get("birthday"):
+                bday = datetime.fromisoformat(contact["birthday"].replace("Z", "+00:00"))
+                # Adjust year to current year
+                this_year_bday = bday.replace(year=now.year)
+                if this_year_bday < now:
+                    this_year_bday = bday.replace(year=now.year + 1)
+                days_until = (this_year_bday - now).days
+                if 0 <= days_until <= 30:
+                    upcoming_birthdays.append({
+                        "contact": contact,
+                        "days_until": days_until,
+                    })
+        return upcoming_birthdays
 
     def _calculate_macros(self, meals: list) -> Dict[str, int]:
         """Calculate total macros from meals."""
@@ -174,5 +289,6 @@ class ContextBuilder:
         return totals
 
     async def close(self):
-        """Close the HTTP client."""
-        await self.client.aclose()
+        """Close the HTTP client, unless it is a shared one."""
+        if self._owns_client:
+            await self.client.aclose()
@@ -0,0 +1,182 @@
+"""Token-budgeted, compact serialization of context for prompts.
+
+Raw API rows carry ids, audit timestamps and null fields the model never
+needs, and pretty-printed JSON of a busy week easily overflows llama3's
+context window. compact_context() turns a ContextBuilder package into a
+bounded one:
+
+- fields that mean nothing to the model (user_id, created_at, nulls,
+  empty strings and lists) are dropped, and timestamps are cut to minutes
+- long free text (journal entries, notes) is clipped
+- time series (meals, sleep, workouts, transactions, Bible readings and
+  habit logs) become tables, newest first:
+  ``{"columns": [...], "rows": [[...], ...]}``
+- every module is held to a token budget; rows past it are dropped
+  deterministically and replaced by an ``"N more omitted"`` marker
+
+Budgets are scaled down when their sum exceeds ``context_token_budget``,
+so the rendered prompt stays bounded however much data the user has.
+"""
+import json
+import re
+from typing import Any, Dict, List, Optional
+from agent_config import settings
+
+# Rough tokens-per-character for llama-family tokenizers on JSON text
+CHARS_PER_TOKEN = 4
+
+# Fields never shown to the model
+DROP_FIELDS = {"user_id", "created_at", "updated_at", "calendar_id", "items_json"}
+
+# Time series rendered as tables: module -> (columns, time column)
+TABLES = {
+    "meals": (["dt", "name", "calories", "protein_g", "carbs_g", "fat_g"], "dt"),
+    "sleep": (["date", "duration_min", "quality"], "date"),
+    "workouts": (["dt", "type", "duration_min", "notes"], "dt"),
+    "transactions": (["dt", "amount_cents", "category", "merchant"], "dt"),
+    "recent_readings": (["dt", "book", "chapter", "verse_start", "verse_end"], "dt"),
+}
+HABIT_LOG_COLUMNS = ["date", "value"]
+
+# Token budget per module, before scaling to the total budget
+MODULE_BUDGETS = {
+    "tasks": 500,
+    "events": 400,
+    "habits": 200,
+    "habit_logs": 250,
+    "meals": 300,
+    "workouts": 150,
+    "sleep": 100,
+    "journal": 500,
+    "projects": 150,
+    "skills": 100,
+    "goals": 250,
+    "transactions": 300,
+    "bible_plans": 100,
+    "recent_readings": 100,
+    "routines": 150,
+    "upcoming_birthdays": 100,
+}
+DEFAULT_MODULE_BUDGET = 150
+
+ISO_TIMESTAMP = re.compile(r"^(\d{4}-\d{2}-\d{2}T\d{2}:\d{2})(:\d{2}(\.\d+)?)?(Z|[+-]\d{2}:\d{2})?$")
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count of ``text``."""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def render(data: Any) -> str:
+    """Serialize for a prompt: compact separators, no indentation."""
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def omitted_marker(count: int) -> str:
+    return f"{count} more omitted"
+
+
+def compact_value(value: Any, max_text_chars: Optional[int] = None) -> Any:
+    """Prune fields, shorten timestamps and clip long text, recursively."""
+    max_text_chars = max_text_chars or settings.context_max_text_chars
+    if isinstance(value, dict):
+        compacted = {}
+        for key, item in value.items():
+            if key in DROP_FIELDS:
+                continue
+            item = compact_value(item, max_text_chars)
+            if item is None or item == "" or item == [] or item == {}:
+                continue
+            compacted[key] = item
+        return compacted
+    if isinstance(value, list):
+        return [compact_value(item, max_text_chars) for item in value]
+    if isinstance(value, str):
+        match = ISO_TIMESTAMP.match(value)
+        if match:
+            return match.group(1)
+        if len(value) > max_text_chars:
+            return value[:max_text_chars].rstrip() + "…"
+    return value
+
+
+def _fit(items: List[Any], budget_tokens: int) -> int:
+    """How many leading ``items`` fit in ``budget_tokens``."""
+    used = 0
+    for count, item in enumerate(items):
+        # +1 for the separating comma
+        used += estimate_tokens(render(item)) + 1
+        if used > budget_tokens:
+            return count
+    return len(items)
+
+
+def compact_table(rows: List[Dict[str, Any]], columns: List[str], time_column: str, budget_tokens: int) -> Dict[str, Any]:
+    """Encode rows as a newest-first table, truncated to ``budget_tokens``."""
+    rows = sorted(rows, key=lambda row: (str(row.get(time_column) or ""), render(row)), reverse=True)
+    table_rows = [[compact_value(row.get(column)) for column in columns] for row in rows]
+
+    header_tokens = estimate_tokens(render({"columns": columns, "rows": []}))
+    kept = _fit(table_rows, budget_tokens - header_tokens)
+    table = {"columns": columns, "rows": table_rows[:kept]}
+    if kept < len(table_rows):
+        table["omitted"] = omitted_marker(len(table_rows) - kept)
+    return table
+
+
+def compact_list(items: List[Any], budget_tokens: int) -> List[Any]:
+    """Prune items and keep them in order until ``budget_tokens`` is spent."""
+    items = [compact_value(item) for item in items]
+    kept = _fit(items, budget_tokens)
+    if kept < len(items):
+        return items[:kept] + [omitted_marker(len(items) - kept)]
+    return items
+
+
+def compact_module(name: str, value: Any, budget_tokens: Optional[int] = None) -> Any:
+    """Compact one context module (e.g. ``"meals"``) within its budget."""
+    budget_tokens = budget_tokens or MODULE_BUDGETS.get(name, DEFAULT_MODULE_BUDGET)
+
+    if name == "habit_logs" and isinstance(value, dict):
+        # {habit_id: [logs]}; share the budget between habits in id order
+        habit_ids = sorted(value, key=str)
+        per_habit = budget_tokens // max(len(habit_ids), 1)
+        return {
+            str(habit_id): compact_table(value[habit_id], HABIT_LOG_COLUMNS, "date", per_habit)
+            for habit_id in habit_ids
+        }
+    if name in TABLES and isinstance(value, list):
+        columns, time_column = TABLES[name]
+        return compact_table(value, columns, time_column, budget_tokens)
+    if isinstance(value, list):
+        return compact_list(value, budget_tokens)
+    return compact_value(value)
+
+
+def compact_context(context: Dict[str, Any], budget_tokens: Optional[int] = None) -> Dict[str, Any]:
+    """Compact a ContextBuilder package to at most about ``budget_tokens``.
+
+    Args:
+        context: Context from ContextBuilder.build_context()
+        budget_tokens: Total budget (default ``context_token_budget``)
+
+    Returns:
+        Context with the same keys (minus pruned ones), modules compacted
+    """
+    budget_tokens = budget_tokens or settings.context_token_budget
+    modules = [key for key, value in context.items() if isinstance(value, (list, dict)) and key != "module_errors"]
+
+    requested = {name: MODULE_BUDGETS.get(name, DEFAULT_MODULE_BUDGET) for name in modules}
+    scalars = {key: value for key, value in context.items() if key not in requested}
+    available = budget_tokens - estimate_tokens(render(compact_value(scalars)))
+    scale = min(1.0, available / max(sum(requested.values()), 1))
+
+    compacted = {}
+    for key, value in context.items():
+        if key in DROP_FIELDS:
+            continue
+        if key in requested:
+            compacted[key] = compact_module(key, value, max(int(requested[key] * scale), 1))
+        else:
+            compacted[key] = compact_value(value)
+    return compacted
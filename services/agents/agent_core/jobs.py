@@ -0,0 +1,292 @@
+"""Recipe job queue with results persisted in SQLite.
+
+Submitting a recipe stores a ``queued`` job and returns its id at once. A
+fixed number of workers take jobs by priority class, then in submission
+order, and record the result or error, with submit/start/finish timestamps, in the
+``recipe_jobs`` table. Clients poll a job (optionally long-polling until it
+finishes) or follow its status changes. Jobs that were queued or running
+when the service stopped are queued again on the next start.
+"""
+import asyncio
+import json
+import logging
+import sqlite3
+import time
+import uuid
+from pathlib import Path
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+from agent_core.scheduler import INTERACTIVE, current_priority, priority_rank
+from agent_core.result_cache import bypass_cache as cache_bypass
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED = (SUCCEEDED, FAILED, CANCELLED)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS recipe_jobs (
+    id TEXT PRIMARY KEY,
+    recipe TEXT NOT NULL,
+    user_id INTEGER NOT NULL,
+    params_json TEXT NOT NULL,
+    priority TEXT NOT NULL DEFAULT 'interactive',
+    bypass_cache INTEGER NOT NULL DEFAULT 0,
+    status TEXT NOT NULL,
+    result_json TEXT,
+    error TEXT,
+    submitted_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_recipe_jobs_status_submitted ON recipe_jobs (status, submitted_at);
+CREATE INDEX IF NOT EXISTS idx_recipe_jobs_submitted ON recipe_jobs (submitted_at);
+"""
+
+# Columns added after the table was first created: name -> definition
+ADDED_COLUMNS = {
+    "priority": f"TEXT NOT NULL DEFAULT '{INTERACTIVE}'",
+    "bypass_cache": "INTEGER NOT NULL DEFAULT 0",
+}
+
+# (recipe, user_id, params) -> recipe result
+JobRunner = Callable[[str, int, Dict[str, Any]], Awaitable[Dict[str, Any]]]
+
+
+def job_dict(row: sqlite3.Row) -> Dict[str, Any]:
+    """API representation of a job row."""
+    started, finished = row["started_at"], row["finished_at"]
+    return {
+        "job_id": row["id"],
+        "recipe": row["recipe"],
+        "user_id": row["user_id"],
+        "params": json.loads(row["params_json"]),
+        "priority": row["priority"],
+        "bypass_cache": bool(row["bypass_cache"]),
+        "status": row["status"],
+        "result": json.loads(row["result_json"]) if row["result_json"] is not None else None,
+        "error": row["error"],
+        "submitted_at": row["submitted_at"],
+        "started_at": started,
+        "finished_at": finished,
+        "queue_ms": round((started - row["submitted_at"]) * 1000) if started else None,
+        "run_ms": round((finished - started) * 1000) if started and finished else None,
+    }
+
+
+class JobStore:
+    """SQLite persistence for recipe jobs."""
+
+    def __init__(self, path: str):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        # Only ever used from the event loop thread; autocommit per statement
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(recipe_jobs)")}
+        for name, definition in ADDED_COLUMNS.items():
+            if name not in columns:
+                self._conn.execute(f"ALTER TABLE recipe_jobs ADD COLUMN {name} {definition}")
+
+    def create(
+        self,
+        recipe: str,
+        user_id: int,
+        params: Dict[str, Any],
+        priority: str = INTERACTIVE,
+        bypass_cache: bool = False,
+    ) -> Dict[str, Any]:
+        job_id = uuid.uuid4().hex
+        self._conn.execute(
+            "INSERT INTO recipe_jobs (id, recipe, user_id, params_json, priority, bypass_cache, status, submitted_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (job_id, recipe, user_id, json.dumps(params), priority, int(bypass_cache), QUEUED, time.time()),
+        )
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        row = self._conn.execute("SELECT * FROM recipe_jobs WHERE id = ?", (job_id,)).fetchone()
+        return job_dict(row) if row else None
+
+    def list(self, status: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        """Most recently submitted jobs first."""
+        if status:
+            rows = self._conn.execute(
+                "SELECT * FROM recipe_jobs WHERE status = ? ORDER BY submitted_at DESC LIMIT ?",
+                (status, limit),
+            )
+        else:
+            rows = self._conn.execute(
+                "SELECT * FROM recipe_jobs ORDER BY submitted_at DESC LIMIT ?", (limit,)
+            )
+        return [job_dict(row) for row in rows]
+
+    def pending(self) -> List[Tuple[str, str]]:
+        """(id, priority) of jobs left queued or running by a previous process, oldest first."""
+        rows = self._conn.execute(
+            "SELECT id, priority FROM recipe_jobs WHERE status IN (?, ?) ORDER BY submitted_at",
+            (QUEUED, RUNNING),
+        )
+        return [(row["id"], row["priority"]) for row in rows]
+
+    def mark_running(self, job_id: str) -> bool:
+        """Claim a queued job; False if it was cancelled meanwhile."""
+        cursor = self._conn.execute(
+            "UPDATE recipe_jobs SET status = ?, started_at = ? WHERE id = ? AND status IN (?, ?)",
+            (RUNNING, time.time(), job_id, QUEUED, RUNNING),
+        )
+        return cursor.rowcount == 1
+
+    def finish(self, job_id: str, status: str, result: Any = None, error: Optional[str] = None):
+        self._conn.execute(
+            "UPDATE recipe_jobs SET status = ?, result_json = ?, error = ?, finished_at = ? WHERE id = ?",
+            (status, json.dumps(result) if result is not None else None, error, time.time(), job_id),
+        )
+
+    def prune(self, older_than_s: float) -> int:
+        """Delete finished jobs submitted more than ``older_than_s`` ago."""
+        cursor = self._conn.execute(
+            f"DELETE FROM recipe_jobs WHERE status IN ({', '.join('?' * len(FINISHED))}) AND submitted_at < ?",
+            (*FINISHED, time.time() - older_than_s),
+        )
+        return cursor.rowcount
+
+    def close(self):
+        self._conn.close()
+
+
+class JobQueue:
+    """Bounded pool of workers running recipe jobs from a JobStore."""
+
+    def __init__(self, store: JobStore, runner: JobRunner, workers: int, timeout_s: float):
+        self.store = store
+        self.runner = runner
+        self.workers = max(1, workers)
+        self.timeout_s = timeout_s
+        # (priority rank, submission seq, job id)
+        self._queue: "asyncio.PriorityQueue[Tuple[int, int, str]]" = asyncio.PriorityQueue()
+        self._seq = 0
+        self._workers: List[asyncio.Task] = []
+        self._running: Dict[str, asyncio.Task] = {}
+        self._cancelled: Set[str] = set()
+        self._changed = asyncio.Condition()
+
+    @property
+    def depth(self) -> int:
+        """Jobs waiting for a worker."""
+        return self._queue.qsize()
+
+    def _enqueue(self, job_id: str, priority: str):
+        self._seq += 1
+        self._queue.put_nowait((priority_rank(priority), self._seq, job_id))
+
+    def start(self):
+        for job_id, priority in self.store.pending():
+            self._enqueue(job_id, priority)
+        self._workers = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def submit(
+        self,
+        recipe: str,
+        user_id: int,
+        params: Dict[str, Any],
+        priority: str = INTERACTIVE,
+        bypass_cache: bool = False,
+    ) -> Dict[str, Any]:
+        job = self.store.create(recipe, user_id, params, priority, bypass_cache)
+        self._enqueue(job["job_id"], priority)
+        return job
+
+    async def cancel(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Cancel a queued or running job; finished jobs are left as they are."""
+        job = self.store.get(job_id)
+        if job is None or job["status"] in FINISHED:
+            return job
+
+        task = self._running.get(job_id)
+        if task:
+            self._cancelled.add(job_id)
+            task.cancel()
+        else:
+            self.store.finish(job_id, CANCELLED, error="cancelled")
+            await self._notify()
+        return await self.wait(job_id, timeout=5)
+
+    async def wait(self, job_id: str, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Return the job once it has finished, or as it stands after ``timeout``."""
+        def finished():
+            job = self.store.get(job_id)
+            return job is None or job["status"] in FINISHED
+
+        try:
+            async with self._changed:
+                await asyncio.wait_for(self._changed.wait_for(finished), timeout)
+        except asyncio.TimeoutError:
+            pass
+        return self.store.get(job_id)
+
+    async def follow(self, job_id: str) -> AsyncIterator[Dict[str, Any]]:
+        """Yield the job now and after each status change until it finishes."""
+        job = self.store.get(job_id)
+        while job is not None:
+            yield job
+            if job["status"] in FINISHED:
+                return
+            status = job["status"]
+            async with self._changed:
+                await self._changed.wait_for(lambda: (self.store.get(job_id) or {}).get("status") != status)
+            job = self.store.get(job_id)
+
+    async def _notify(self):
+        async with self._changed:
+            self._changed.notify_all()
+
+    async def _work(self):
+        while True:
+            _, _, job_id = await self._queue.get()
+            try:
+                await self._run(job_id)
+            except Exception:
+                logger.exception(f"Job {job_id} crashed its worker")
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job_id: str):
+        if not self.store.mark_running(job_id):
+            return
+        await self._notify()
+        job = self.store.get(job_id)
+
+        # The recipe's Ollama calls queue at the job's priority
+        current_priority.set(job["priority"])
+        cache_bypass.set(job["bypass_cache"])
+        task = asyncio.create_task(
+            asyncio.wait_for(self.runner(job["recipe"], job["user_id"], job["params"]), self.timeout_s)
+        )
+        self._running[job_id] = task
+        try:
+            result = await task
+            self.store.finish(job_id, SUCCEEDED, result=result)
+        except asyncio.CancelledError:
+            if job_id not in self._cancelled:
+                # The worker itself is being stopped; leave the job for the next start
+                raise
+            self.store.finish(job_id, CANCELLED, error="cancelled")
+        except asyncio.TimeoutError:
+            self.store.finish(job_id, FAILED, error=f"timed out after {self.timeout_s}s")
+        except Exception as e:
+            self.store.finish(job_id, FAILED, error=str(e) or type(e).__name__)
+        finally:
+            self._running.pop(job_id, None)
+            self._cancelled.discard(job_id)
+            await self._notify()
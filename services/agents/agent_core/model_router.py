@@ -0,0 +1,131 @@
+"""Per-recipe model routing, with latency-aware downgrade under load.
+
+Recipes are mapped to model tiers (``recipe_tiers``). Each tier names a
+local model and a latency SLO (``tier_models``, ``tier_slo_s``), and tiers
+are listed from largest to smallest. Cheap structured tasks such as
+next_best_step or profile_update field extraction go to the small tier;
+everything else defaults to ``default_model_tier``. A tier without a model
+uses the primary model; by default only the primary model is installed, so
+both tiers use it until a smaller model is configured.
+
+Every generation reports Ollama's token counts and timings back to the
+router, which keeps moving averages of tokens/sec per model, output tokens
+per recipe and seconds per generation. When at least
+``routing_min_queue_depth`` requests are waiting for an LLM slot, the
+router predicts each tier's latency (queue wait plus the recipe's output
+tokens at the model's observed speed) and picks the largest tier, no larger
+than the recipe's own, that meets the recipe's SLO; the smallest if none do.
+
+The recipe being run is carried in a context variable set by the routes
+and job runner, so recipes call OllamaClient without naming a model.
+"""
+from collections import defaultdict
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+from agent_config import settings
+from agent_core.scheduler import LLMScheduler, scheduler as llm_scheduler
+
+current_recipe: ContextVar[Optional[str]] = ContextVar("llm_recipe", default=None)
+
+# Weight of the newest observation in the moving averages
+EWMA_ALPHA = 0.2
+# Output tokens assumed for a recipe before any have been observed
+DEFAULT_OUTPUT_TOKENS = 300
+
+
+def ewma(average: Optional[float], value: float) -> float:
+    return value if average is None else average + EWMA_ALPHA * (value - average)
+
+
+class ModelRouter:
+    """Chooses the model for each generation from the recipe's tier and observed speed."""
+
+    def __init__(self, scheduler: Optional[LLMScheduler] = None):
+        self.scheduler = scheduler or llm_scheduler
+        self.tokens_per_s: Dict[str, float] = {}  # per model
+        self.output_tokens: Dict[str, float] = {}  # per recipe
+        self.generation_s: Optional[float] = None  # any model, load and prompt included
+        self.downgrades: Dict[str, int] = defaultdict(int)  # per recipe
+
+    @property
+    def tiers(self) -> List[str]:
+        """Tier names, largest first."""
+        return list(settings.tier_models)
+
+    def tier_model(self, tier: str) -> str:
+        # An empty tier model means the configured primary model
+        return settings.tier_models.get(tier) or settings.ollama_model
+
+    def tier_for(self, recipe: Optional[str]) -> str:
+        tier = settings.recipe_tiers.get(recipe or "", settings.default_model_tier)
+        return tier if tier in settings.tier_models else self.tiers[0]
+
+    def predict_s(self, recipe: Optional[str], model: str, queue_depth: int) -> Optional[float]:
+        """Expected seconds until ``recipe`` finishes on ``model``, or None if the model is unobserved."""
+        tokens_per_s = self.tokens_per_s.get(model)
+        if not tokens_per_s:
+            return None
+        wait_s = queue_depth * (self.generation_s or 0) / self.scheduler.max_in_flight
+        return wait_s + self.output_tokens.get(recipe or "", DEFAULT_OUTPUT_TOKENS) / tokens_per_s
+
+    def model_for(self, recipe: Optional[str]) -> str:
+        """Model for the next generation of ``recipe``."""
+        tier = self.tier_for(recipe)
+        queue_depth = self.scheduler.queue_depth
+        if queue_depth < settings.routing_min_queue_depth:
+            return self.tier_model(tier)
+
+        slo_s = settings.tier_slo_s.get(tier)
+        candidates = self.tiers[self.tiers.index(tier):]
+        chosen = candidates[-1]
+        for candidate in candidates:
+            predicted = self.predict_s(recipe, self.tier_model(candidate), queue_depth)
+            # Unobserved models are given the benefit of the doubt
+            if slo_s is None or predicted is None or predicted <= slo_s:
+                chosen = candidate
+                break
+
+        if chosen != tier:
+            self.downgrades[recipe or ""] += 1
+        return self.tier_model(chosen)
+
+    def observe(self, recipe: Optional[str], model: str, data: Dict[str, Any]):
+        """Record a finished generation's token counts and timings (Ollama's final response)."""
+        eval_count, eval_ns = data.get("eval_count"), data.get("eval_duration")
+        if eval_count and eval_ns:
+            self.tokens_per_s[model] = ewma(self.tokens_per_s.get(model), eval_count / (eval_ns / 1e9))
+            key = recipe or ""
+            self.output_tokens[key] = ewma(self.output_tokens.get(key), eval_count)
+        if data.get("total_duration"):
+            self.generation_s = ewma(self.generation_s, data["total_duration"] / 1e9)
+
+    def metrics(self) -> Dict[str, Any]:
+        """Tiers with their models, SLOs and observed speed; recipe routes and downgrades."""
+        tiers = {}
+        for tier in self.tiers:
+            model = self.tier_model(tier)
+            tokens_per_s = self.tokens_per_s.get(model)
+            tiers[tier] = {
+                "model": model,
+                "slo_s": settings.tier_slo_s.get(tier),
+                "tokens_per_s": round(tokens_per_s, 1) if tokens_per_s else None,
+            }
+
+        recipes = {}
+        for recipe in sorted(set(settings.recipe_tiers) | set(self.output_tokens) | set(self.downgrades)):
+            output_tokens = self.output_tokens.get(recipe)
+            recipes[recipe or "(none)"] = {
+                "tier": self.tier_for(recipe),
+                "avg_output_tokens": round(output_tokens) if output_tokens else None,
+                "downgrades": self.downgrades.get(recipe, 0),
+            }
+
+        return {
+            "min_queue_depth": settings.routing_min_queue_depth,
+            "avg_generation_s": round(self.generation_s, 2) if self.generation_s else None,
+            "tiers": tiers,
+            "recipes": recipes,
+        }
+
+
+router = ModelRouter()
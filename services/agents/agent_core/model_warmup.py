@@ -0,0 +1,122 @@
+"""Keep the configured Ollama models loaded, so recipes don't pay load time.
+
+Loading ``llama3:8b`` takes tens of seconds, and Ollama unloads a model
+once its keep_alive runs out after the last request. The warmer loads the
+configured models (``ollama_warm_models``; by default only the primary
+model, so a CPU-only box doesn't keep several models resident) with an
+empty prompt at startup, then every ``ollama_warm_interval_s`` reloads any
+that Ollama has evicted. Models that are not installed are skipped, with
+one warning each.
+
+Every request carries the model's keep_alive (see OllamaClient.keep_alive),
+and during ``ollama_pin_hours`` the pinned models are kept loaded
+indefinitely, so the first interactive request of the day is not a cold
+start. When the pin window opens or closes, the warmer reloads the model
+with its new keep_alive right away.
+"""
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Optional, Set, Union
+from agent_config import settings
+from agent_core.circuit_breaker import OllamaUnavailable
+from agent_core.ollama_client import OllamaClient
+
+logger = logging.getLogger(__name__)
+
+
+def tagged(model: str) -> str:
+    """Model name as /api/ps reports it ("mistral" -> "mistral:latest")."""
+    return model if ":" in model else f"{model}:latest"
+
+
+class ModelWarmer:
+    """Preloads models and reloads them when evicted."""
+
+    def __init__(self, ollama: OllamaClient, models: Optional[List[str]] = None, interval_s: Optional[float] = None):
+        self.ollama = ollama
+        self.models = [model for model in dict.fromkeys(models or settings.ollama_warm_models or [ollama.model]) if model]
+        self.interval_s = interval_s or settings.ollama_warm_interval_s
+        # model -> keep_alive it was last loaded with, seconds that took, and when
+        self._keep_alive: Dict[str, Union[str, int]] = {}
+        self._loads: Dict[str, Dict[str, Any]] = {}
+        self._missing: Set[str] = set()  # not installed, already warned about
+        self._task: Optional[asyncio.Task] = None
+
+    async def warm(self, model: str):
+        keep_alive = self.ollama.keep_alive(model)
+        load_s = await self.ollama.load(model)
+        self._keep_alive[model] = keep_alive
+        self._loads[model] = {"last_load_s": round(load_s, 2), "last_loaded_at": time.time()}
+        logger.info(f"Warmed {model} in {load_s:.1f}s (keep_alive={keep_alive})")
+
+    async def warm_all(self):
+        """Load each model that is not resident or whose keep_alive has changed."""
+        try:
+            resident = await self.ollama.running_models()
+        except Exception:
+            # Older Ollama without /api/ps: load everything
+            resident = {}
+        # Empty if Ollama can't list them; then every model is tried
+        installed = {tagged(model) for model in await self.ollama.list_models()}
+
+        for model in self.models:
+            if installed and tagged(model) not in installed:
+                if model not in self._missing:
+                    logger.warning(f"Not warming {model}: not installed (ollama pull {model})")
+                    self._missing.add(model)
+                continue
+            self._missing.discard(model)
+            if tagged(model) in resident and self._keep_alive.get(model) == self.ollama.keep_alive(model):
+                continue
+            try:
+                await self.warm(model)
+            except OllamaUnavailable:
+                return
+            except Exception as e:
+                logger.warning(f"Could not warm {model}: {e}")
+
+    async def _run(self):
+        while True:
+            await self.warm_all()
+            await asyncio.sleep(self._sleep_s())
+
+    def _sleep_s(self) -> float:
+        """Interval, shortened to wake up when a pin window opens or closes."""
+        if settings.pin_window is None:
+            return self.interval_s
+        now = time.localtime()
+        to_next_hour = 3600 - now.tm_min * 60 - now.tm_sec
+        return min(self.interval_s, to_next_hour + 1)
+
+    def start(self):
+        """Warm up in the background (no-op if already running)."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def status(self) -> Dict[str, Any]:
+        """Residency of each warmed model, for /health."""
+        try:
+            resident = await self.ollama.running_models()
+        except Exception:
+            resident = None
+
+        models = []
+        for model in self.models:
+            loaded = resident.get(tagged(model)) if resident is not None else None
+            models.append({
+                "name": model,
+                "resident": None if resident is None else loaded is not None,
+                "expires_at": loaded.get("expires_at") if loaded else None,
+                "size_vram": loaded.get("size_vram") if loaded else None,
+                "keep_alive": self.ollama.keep_alive(model),
+                "pinned": self.ollama.pinned(model),
+                **self._loads.get(model, {}),
+            })
+        return {"models": models}
@@ -1,10 +1,30 @@
-"""Ollama client wrapper with retry logic and error handling."""
+"""Ollama client wrapper with retry logic and error handling.
+
+Two separate mechanisms handle failures:
+
+- transport retries: a connection error or timeout is retried
+  (``ollama_transport_attempts``, short backoff) through the shared circuit
+  breaker, which fails fast while Ollama is down (agent_core.circuit_breaker)
+- fallback model: when Ollama answers with an error for the requested model
+  (missing, failed to load), the request is repeated once with the fallback
+  model; unreachable Ollama is not retried with another model
+"""
 import httpx
-from typing import Optional, Dict, Any, List
-from tenacity import retry, stop_after_attempt, wait_exponential
+import time
+from datetime import datetime
+from typing import Optional, Dict, Any, List, AsyncIterator, Tuple, Union
+from tenacity import AsyncRetrying, retry_if_exception_type, stop_after_attempt, wait_exponential
 from agent_config import settings
+from agent_core.circuit_breaker import CircuitBreaker, OllamaUnavailable, breaker as ollama_breaker
+from agent_core.model_router import ModelRouter, current_recipe, router as model_router
+from agent_core.scheduler import LLMScheduler, current_priority, scheduler as llm_scheduler
+from agent_core.result_cache import ResultCache, cache_key, is_cacheable
+from agent_core.telemetry import LLMTelemetry
 import json
 
+# Token counts and timings (nanoseconds) from Ollama's final response, passed through to callers
+TIMING_FIELDS = ("prompt_eval_count", "eval_count", "total_duration", "load_duration", "prompt_eval_duration", "eval_duration")
+
 
 class OllamaClient:
     """Wrapper for Ollama API with retry and fallback logic."""
@@ -14,16 +34,287 @@ class OllamaClient:
         base_url: str = None,
         model: str = None,
         fallback_model: str = None,
+        client: Optional[httpx.AsyncClient] = None,
+        scheduler: Optional[LLMScheduler] = None,
+        cache: Optional[ResultCache] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        router: Optional[ModelRouter] = None,
+        telemetry: Optional[LLMTelemetry] = None,
     ):
         self.base_url = base_url or settings.ollama_url
         self.model = model or settings.ollama_model
         self.fallback_model = fallback_model or settings.ollama_fallback_model
-        self.client = httpx.AsyncClient(timeout=120.0)
+        # A client passed in is shared (see agent_core.clients) and not ours to close
+        self._owns_client = client is None
+        self.client = client or httpx.AsyncClient(timeout=settings.ollama_timeout_s)
+        # Every generation waits for a slot, interactive requests first
+        self.scheduler = scheduler or llm_scheduler
+        # Fails requests fast while Ollama is unreachable
+        self.breaker = breaker or ollama_breaker
+        # Picks the model for requests that don't name one, by recipe tier and load
+        self.router = router or model_router
+        # Per-call token counts and timings, see GET /metrics/llm
+        self.telemetry = telemetry
+        # Deterministic recipe results, see generate_cached()
+        self.cache = cache
+
+    def _generate_payload(
+        self,
+        prompt: str,
+        system: Optional[str],
+        temperature: Optional[float],
+        max_tokens: Optional[int],
+        model: Optional[str],
+        format: Optional[str],
+        stream: bool = False,
+        context: Optional[List[int]] = None,
+        num_ctx: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        temp = temperature if temperature is not None else settings.default_temperature
+
+        payload = {
+            "model": model or self.route(),
+            "prompt": prompt,
+            "stream": stream,
+            "options": {
+                "temperature": temp,
+            }
+        }
+
+        if system:
+            payload["system"] = system
+
+        if max_tokens:
+            payload["options"]["num_predict"] = max_tokens
+
+        if num_ctx:
+            payload["options"]["num_ctx"] = num_ctx
+
+        if context:
+            # Continue from a previous generation's KV state
+            payload["context"] = context
+
+        if format == "json":
+            payload["format"] = "json"
+
+        return payload
+
+    def _chat_payload(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: Optional[float],
+        model: Optional[str],
+        format: Optional[str],
+        stream: bool = False,
+    ) -> Dict[str, Any]:
+        temp = temperature if temperature is not None else settings.default_temperature
+
+        payload = {
+            "model": model or self.route(),
+            "messages": messages,
+            "stream": stream,
+            "options": {
+                "temperature": temp,
+            }
+        }
+
+        if format == "json":
+            payload["format"] = "json"
+
+        return payload
+
+    def route(self) -> str:
+        """Model for the current recipe (see agent_core.model_router)."""
+        return self.router.model_for(current_recipe.get())
+
+    def pinned(self, model: str, now: Optional[datetime] = None) -> bool:
+        """Whether ``model`` should stay loaded indefinitely right now (``ollama_pin_hours``)."""
+        if settings.pin_window is None:
+            return False
+        if model not in (settings.ollama_pin_models or [self.model]):
+            return False
+        start, end = settings.pin_window
+        hour = (now or datetime.now()).hour
+        # "22-6" wraps past midnight
+        return start <= hour < end if start <= end else hour >= start or hour < end
+
+    def keep_alive(self, model: str) -> Union[str, int]:
+        """How long Ollama should keep ``model`` loaded after a request (-1 = indefinitely)."""
+        if self.pinned(model):
+            return -1
+        return settings.ollama_keep_alive.get(model, settings.ollama_default_keep_alive)
+
+    def _models(self, model: str, fallback: bool = True) -> List[str]:
+        """Models to try, in order: the requested one, then the fallback model (if ``fallback``)."""
+        models = [model]
+        if fallback and self.fallback_model and self.fallback_model != model:
+            models.append(self.fallback_model)
+        return models
+
+    async def _send(self, path: str, body: Dict[str, Any], stream: bool = False) -> httpx.Response:
+        """POST ``body`` through the circuit breaker, retrying transport errors.
+
+        HTTP error responses are returned, not raised.
+
+        Raises:
+            OllamaUnavailable: The circuit is open, or Ollama stayed unreachable
+        """
+        retrying = AsyncRetrying(
+            retry=retry_if_exception_type(httpx.TransportError),
+            stop=stop_after_attempt(settings.ollama_transport_attempts),
+            wait=wait_exponential(multiplier=settings.ollama_retry_backoff_s, max=4),
+            reraise=True,
+        )
+        try:
+            async for attempt in retrying:
+                with attempt:
+                    self.breaker.before_request()
+                    ok, error = None, None
+                    try:
+                        request = self.client.build_request("POST", f"{self.base_url}{path}", json=body)
+                        response = await self.client.send(request, stream=stream)
+                        ok = True
+                        return response
+                    except httpx.TransportError as e:
+                        ok, error = False, e
+                        raise
+                    finally:
+                        self.breaker.after_request(ok, error)
+        except httpx.TransportError as e:
+            raise OllamaUnavailable(
+                f"Ollama unreachable: {str(e) or type(e).__name__}",
+                retry_after_s=self.breaker.retry_after_s(),
+            ) from e
+
+    def _record(
+        self,
+        endpoint: str,
+        model: str,
+        fallback: bool,
+        data: Optional[Dict[str, Any]] = None,
+        error: Optional[Exception] = None,
+        queue_s: Optional[float] = None,
+        started: Optional[float] = None,
+        ttft_s: Optional[float] = None,
+    ):
+        """Report a finished call to the router and telemetry."""
+        recipe = current_recipe.get()
+        if data is not None:
+            self.router.observe(recipe, model, data)
+        if self.telemetry is not None:
+            self.telemetry.record(
+                endpoint,
+                recipe,
+                model,
+                data,
+                fallback=fallback,
+                priority=current_priority.get(),
+                error=(str(error) or type(error).__name__) if error is not None else None,
+                queue_s=queue_s,
+                wall_s=time.monotonic() - started if started is not None else None,
+                ttft_s=ttft_s,
+            )
+
+    async def _post_json(
+        self, path: str, payload: Dict[str, Any], queued_at: float, fallback: bool = True
+    ) -> Tuple[Dict[str, Any], bool]:
+        """POST ``payload``, repeating it with the fallback model if the model fails.
+
+        Args:
+            queued_at: time.monotonic() when the caller started waiting for its LLM slot
+            fallback: Whether to try the fallback model
+
+        Returns:
+            (response JSON, whether the fallback model answered)
+        """
+        endpoint = path.rsplit("/", 1)[-1]
+        queue_s = time.monotonic() - queued_at
+        last_error: Optional[Exception] = None
+        for attempt, used_model in enumerate(self._models(payload["model"], fallback)):
+            body = {**payload, "model": used_model, "keep_alive": self.keep_alive(used_model)}
+            if attempt:
+                # Context tokens belong to the primary model
+                body.pop("context", None)
+            started = time.monotonic()
+            try:
+                response = await self._send(path, body)
+                response.raise_for_status()
+            except (httpx.HTTPStatusError, OllamaUnavailable) as e:
+                self._record(endpoint, used_model, bool(attempt), error=e, queue_s=queue_s, started=started)
+                if isinstance(e, OllamaUnavailable):
+                    raise
+                last_error = e
+                continue
+            data = response.json()
+            self._record(endpoint, used_model, bool(attempt), data, queue_s=queue_s, started=started)
+            return data, bool(attempt)
+        raise last_error
+
+    async def _stream(self, path: str, payload: Dict[str, Any], fallback: bool = True) -> AsyncIterator[Dict[str, Any]]:
+        """POST a streaming request and yield Ollama's NDJSON chunks.
+
+        Falls back to the fallback model only if the primary model fails
+        before the first chunk; once output has been yielded it cannot be
+        retried transparently.
+        """
+        endpoint = path.rsplit("/", 1)[-1] + "_stream"
+        self.breaker.check()
+        queued_at = time.monotonic()
+        async with self.scheduler.slot():
+            queue_s = time.monotonic() - queued_at
+            last_error: Optional[Exception] = None
+            for attempt, used_model in enumerate(self._models(payload["model"], fallback)):
+                body = {**payload, "model": used_model, "keep_alive": self.keep_alive(used_model)}
+                if attempt:
+                    # Context tokens belong to the primary model
+                    body.pop("context", None)
+                started = time.monotonic()
+                ttft_s: Optional[float] = None
+                try:
+                    response = await self._send(path, body, stream=True)
+                except OllamaUnavailable as e:
+                    self._record(endpoint, used_model, bool(attempt), error=e, queue_s=queue_s, started=started)
+                    raise
+
+                try:
+                    if response.status_code >= 400:
+                        await response.aread()
+                        last_error = httpx.HTTPStatusError(
+                            f"{response.status_code} {response.text}",
+                            request=response.request,
+                            response=response,
+                        )
+                        self._record(endpoint, used_model, bool(attempt), error=last_error, queue_s=queue_s, started=started)
+                        continue
+
+                    yielded = False
+                    async for line in response.aiter_lines():
+                        if not line.strip():
+                            continue
+                        chunk = json.loads(line)
+                        if "error" in chunk:
+                            error = Exception(f"Ollama stream failed: {chunk['error']}")
+                            self._record(endpoint, used_model, bool(attempt), error=error, queue_s=queue_s, started=started)
+                            if yielded:
+                                raise error
+                            # Nothing sent to the caller yet: try the next model
+                            last_error = Exception(chunk["error"])
+                            break
+                        if ttft_s is None and (chunk.get("response") or chunk.get("message", {}).get("content")):
+                            ttft_s = time.monotonic() - started
+                        if attempt:
+                            chunk["fallback"] = True
+                        if chunk.get("done"):
+                            self._record(endpoint, used_model, bool(attempt), chunk, queue_s=queue_s, started=started, ttft_s=ttft_s)
+                        yielded = True
+                        yield chunk
+                    else:
+                        return
+                finally:
+                    await response.aclose()
+
+            raise Exception(f"Ollama stream failed: {str(last_error)}")
 
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=2, max=10)
-    )
     async def generate(
         self,
         prompt: str,
@@ -32,6 +323,9 @@ class OllamaClient:
         max_tokens: Optional[int] = None,
         model: Optional[str] = None,
         format: Optional[str] = None,  # "json" for JSON output
+        context: Optional[List[int]] = None,
+        num_ctx: Optional[int] = None,
+        fallback: bool = True,
     ) -> Dict[str, Any]:
         """Generate completion from Ollama.
 
@@ -42,69 +336,98 @@ class OllamaClient:
             max_tokens: Maximum tokens to generate
             model: Model override
             format: Output format ("json" for JSON mode)
+            context: "context" from a previous response, to continue that conversation
+            num_ctx: Context window size override
+            fallback: Retry with the fallback model if the model fails; off for a
+                prompt that only makes sense with ``context``, which the fallback
+                model doesn't get
 
         Returns:
             Dict with response and metadata
+
+        Raises:
+            OllamaUnavailable: Ollama is down; raised at once while the circuit is open
         """
-        used_model = model or self.model
-        temp = temperature if temperature is not None else settings.default_temperature
+        payload = self._generate_payload(
+            prompt, system, temperature, max_tokens, model, format, context=context, num_ctx=num_ctx
+        )
 
-        payload = {
-            "model": used_model,
-            "prompt": prompt,
-            "stream": False,
-            "options": {
-                "temperature": temp,
-            }
+        # Fail fast rather than queue for a slot while the circuit is open
+        self.breaker.check()
+        queued_at = time.monotonic()
+        async with self.scheduler.slot():
+            try:
+                data, used_fallback = await self._post_json("/api/generate", payload, queued_at, fallback)
+            except httpx.HTTPStatusError as e:
+                raise Exception(f"Ollama generation failed: {str(e)}")
+
+        result = {
+            "response": data.get("response", ""),
+            "model": data.get("model"),
+            "done": data.get("done", True),
+            "context": data.get("context"),
+            **{field: data.get(field) for field in TIMING_FIELDS},
         }
+        if used_fallback:
+            result["fallback"] = True
+        return result
 
-        if system:
-            payload["system"] = system
+    async def generate_cached(
+        self,
+        recipe: str,
+        template: str,
+        inputs: Any,
+        prompt: str,
+        temperature: float = None,
+        model: Optional[str] = None,
+        format: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """generate(), served from the result cache when the output is deterministic.
 
-        if max_tokens:
-            payload["options"]["num_predict"] = max_tokens
+        JSON-mode generations at temperature <= 0.3 are looked up under the
+        recipe, model, template version, temperature and a hash of ``inputs``
+        (the data substituted into the template). Anything else, or no cache
+        configured, goes straight to generate().
 
-        if format == "json":
-            payload["format"] = "json"
+        Args:
+            recipe: Recipe name
+            template: Prompt template before substitution
+            inputs: JSON-serializable data substituted into the template
+            prompt: The rendered prompt
+            temperature: Sampling temperature (default from settings)
+            model: Model override
+            format: Output format ("json" for JSON mode)
 
-        try:
-            response = await self.client.post(
-                f"{self.base_url}/api/generate",
-                json=payload,
-            )
-            response.raise_for_status()
-            data = response.json()
+        Returns:
+            Dict with response and metadata; "cached" is True on a hit, and
+            "stale" too for an expired entry served while Ollama is down
+        """
+        temp = temperature if temperature is not None else settings.default_temperature
+        model = model or self.route()
+        if self.cache is None or not is_cacheable(temp, format):
+            return await self.generate(prompt=prompt, temperature=temp, model=model, format=format)
 
-            return {
-                "response": data.get("response", ""),
-                "model": data.get("model"),
-                "done": data.get("done", True),
-                "context": data.get("context"),
-            }
+        key = cache_key(recipe, model, template, temp, inputs)
+        cached = self.cache.get(recipe, key)
+        if cached is not None:
+            return {**cached, "cached": True}
 
-        except httpx.HTTPError as e:
-            # Try fallback model if available
-            if self.fallback_model and used_model != self.fallback_model:
-                payload["model"] = self.fallback_model
-                try:
-                    response = await self.client.post(
-                        f"{self.base_url}/api/generate",
-                        json=payload,
-                    )
-                    response.raise_for_status()
-                    data = response.json()
-
-                    return {
-                        "response": data.get("response", ""),
-                        "model": data.get("model"),
-                        "done": data.get("done", True),
-                        "context": data.get("context"),
-                        "fallback": True,
-                    }
-                except httpx.HTTPError:
-                    pass
-
-            raise Exception(f"Ollama generation failed: {str(e)}")
+        try:
+            result = await self.generate(prompt=prompt, temperature=temp, model=model, format=format)
+        except OllamaUnavailable:
+            # Degrade to an expired answer for the same inputs, if one is left
+            stale = self.cache.get_stale(recipe, key)
+            if stale is None:
+                raise
+            return {**stale, "cached": True, "stale": True}
+        # Only keep answers from the requested model that parse
+        if not result.get("fallback"):
+            try:
+                json.loads(result["response"])
+            except ValueError:
+                return result
+            self.cache.put(recipe, key, {k: v for k, v in result.items() if k != "context"})
+        return result
 
     async def chat(
         self,
@@ -124,59 +447,71 @@ class OllamaClient:
         Returns:
             Dict with response and metadata
         """
-        used_model = model or self.model
-        temp = temperature if temperature is not None else settings.default_temperature
+        payload = self._chat_payload(messages, temperature, model, format)
 
-        payload = {
-            "model": used_model,
-            "messages": messages,
-            "stream": False,
-            "options": {
-                "temperature": temp,
-            }
+        self.breaker.check()
+        queued_at = time.monotonic()
+        async with self.scheduler.slot():
+            try:
+                data, fallback = await self._post_json("/api/chat", payload, queued_at)
+            except httpx.HTTPStatusError as e:
+                raise Exception(f"Ollama chat failed: {str(e)}")
+
+        result = {
+            "message": data.get("message", {}),
+            "response": data.get("message", {}).get("content", ""),
+            "model": data.get("model"),
+            "done": data.get("done", True),
+            **{field: data.get(field) for field in TIMING_FIELDS},
         }
+        if fallback:
+            result["fallback"] = True
+        return result
 
-        if format == "json":
-            payload["format"] = "json"
+    async def generate_stream(
+        self,
+        prompt: str,
+        system: Optional[str] = None,
+        temperature: float = None,
+        max_tokens: Optional[int] = None,
+        model: Optional[str] = None,
+        format: Optional[str] = None,
+        context: Optional[List[int]] = None,
+        num_ctx: Optional[int] = None,
+        fallback: bool = True,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Stream a completion from Ollama as it is generated.
 
-        try:
-            response = await self.client.post(
-                f"{self.base_url}/api/chat",
-                json=payload,
-            )
-            response.raise_for_status()
-            data = response.json()
+        Takes the same arguments as generate().
 
-            return {
-                "message": data.get("message", {}),
-                "response": data.get("message", {}).get("content", ""),
-                "model": data.get("model"),
-                "done": data.get("done", True),
-            }
+        Yields:
+            Ollama chunks: {"response": text delta, "done": False, ...}, then a
+            final {"done": True, ...} carrying timing, token counts and context
+        """
+        payload = self._generate_payload(
+            prompt, system, temperature, max_tokens, model, format, stream=True, context=context, num_ctx=num_ctx
+        )
+        async for chunk in self._stream("/api/generate", payload, fallback):
+            yield chunk
 
-        except httpx.HTTPError as e:
-            # Try fallback model
-            if self.fallback_model and used_model != self.fallback_model:
-                payload["model"] = self.fallback_model
-                try:
-                    response = await self.client.post(
-                        f"{self.base_url}/api/chat",
-                        json=payload,
-                    )
-                    response.raise_for_status()
-                    data = response.json()
-
-                    return {
-                        "message": data.get("message", {}),
-                        "response": data.get("message", {}).get("content", ""),
-                        "model": data.get("model"),
-                        "done": data.get("done", True),
-                        "fallback": True,
-                    }
-                except httpx.HTTPError:
-                    pass
-
-            raise Exception(f"Ollama chat failed: {str(e)}")
+    async def chat_stream(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float = None,
+        model: Optional[str] = None,
+        format: Optional[str] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Stream a chat completion from Ollama as it is generated.
+
+        Takes the same arguments as chat().
+
+        Yields:
+            Ollama chunks with the assistant text delta copied to "response"
+        """
+        payload = self._chat_payload(messages, temperature, model, format, stream=True)
+        async for chunk in self._stream("/api/chat", payload):
+            chunk["response"] = chunk.get("message", {}).get("content", "")
+            yield chunk
 
     async def check_health(self) -> bool:
         """Check if Ollama is available."""
@@ -196,6 +531,27 @@ class OllamaClient:
         except httpx.HTTPError:
             return []
 
+    async def running_models(self) -> Dict[str, Dict[str, Any]]:
+        """Models Ollama currently has loaded, by name (from /api/ps)."""
+        response = await self.client.get(f"{self.base_url}/api/ps")
+        response.raise_for_status()
+        return {model.get("name"): model for model in response.json().get("models", [])}
+
+    async def load(self, model: str) -> float:
+        """Load ``model`` without generating (empty prompt), with its keep_alive.
+
+        Does not take an LLM slot; Ollama loads models alongside running generations.
+
+        Returns:
+            Seconds taken, mostly Ollama's load time if the model was not resident
+        """
+        self.breaker.check()
+        started = time.monotonic()
+        response = await self._send("/api/generate", {"model": model, "prompt": "", "keep_alive": self.keep_alive(model)})
+        response.raise_for_status()
+        return time.monotonic() - started
+
     async def close(self):
-        """Close the HTTP client."""
-        await self.client.aclose()
+        """Close the HTTP client, unless it is a shared one."""
+        if self._owns_client:
+            await self.client.aclose()
@@ -0,0 +1,181 @@
+"""Persistent cache of deterministic recipe generations.
+
+Recipes that ask for JSON at a low temperature give the same answer for
+the same inputs, so re-running them with unchanged data (the UI remounting,
+an automation firing again) should not pay for another generation. Results
+are stored in SQLite under a key made of the recipe, model, prompt
+template version, temperature and a canonical hash of the inputs that went
+into the prompt. Entries expire after a TTL, and the least recently used
+are evicted beyond the entry and byte caps. Expired entries are kept for a
+further grace period, to answer with while Ollama is down.
+
+Callers can skip the cache for the current request by setting
+``bypass_cache``.
+"""
+import hashlib
+import json
+import sqlite3
+import time
+from collections import defaultdict
+from contextvars import ContextVar
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+bypass_cache: ContextVar[bool] = ContextVar("bypass_cache", default=False)
+
+# Generations at or below this temperature in JSON mode are cacheable
+MAX_CACHEABLE_TEMPERATURE = 0.3
+
+# Context keys that change on every build without the data changing
+VOLATILE_KEYS = ("window_start", "window_end")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS recipe_cache (
+    key TEXT PRIMARY KEY,
+    recipe TEXT NOT NULL,
+    value_json TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    last_used_at REAL NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_recipe_cache_last_used ON recipe_cache (last_used_at);
+"""
+
+
+def is_cacheable(temperature: float, format: Optional[str]) -> bool:
+    return format == "json" and temperature <= MAX_CACHEABLE_TEMPERATURE
+
+
+def template_version(template: str) -> str:
+    """Short content hash of a prompt template, so edits invalidate old entries."""
+    return hashlib.sha256(template.encode()).hexdigest()[:12]
+
+
+def inputs_hash(inputs: Any) -> str:
+    """Canonical hash of prompt inputs: key order and volatile window bounds don't matter."""
+    if isinstance(inputs, dict):
+        inputs = {k: v for k, v in inputs.items() if k not in VOLATILE_KEYS}
+    canonical = json.dumps(inputs, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def dated(inputs: Dict[str, Any], day: Optional[date] = None) -> Dict[str, Any]:
+    """``inputs`` tagged with the local date, for recipes about today or this week.
+
+    The window bounds are left out of the hash, so without the date a new
+    day with unchanged data would be served the previous day's result.
+    """
+    return {**inputs, "cache_date": (day or date.today()).isoformat()}
+
+
+def cache_key(recipe: str, model: str, template: str, temperature: float, inputs: Any) -> str:
+    parts = [recipe, model, template_version(template), f"{temperature:g}", inputs_hash(inputs)]
+    return hashlib.sha256("\0".join(parts).encode()).hexdigest()
+
+
+class ResultCache:
+    """SQLite-backed LRU/TTL cache of generation results."""
+
+    def __init__(self, path: str, ttl_s: float, max_entries: int, max_bytes: int, stale_s: float = 0):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        # Only ever used from the event loop thread; autocommit per statement
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        self.ttl_s = ttl_s
+        self.stale_s = stale_s
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._counts: Dict[str, Dict[str, int]] = defaultdict(lambda: {"hits": 0, "misses": 0, "bypassed": 0, "stale": 0})
+        self.evictions = 0
+
+    def get(self, recipe: str, key: str) -> Optional[Dict[str, Any]]:
+        """Cached value for ``key``, or None on a miss or when bypassed."""
+        counts = self._counts[recipe]
+        if bypass_cache.get():
+            counts["bypassed"] += 1
+            return None
+
+        row = self._conn.execute(
+            "SELECT value_json FROM recipe_cache WHERE key = ? AND created_at >= ?",
+            (key, time.time() - self.ttl_s),
+        ).fetchone()
+        if row is None:
+            counts["misses"] += 1
+            return None
+
+        counts["hits"] += 1
+        self._conn.execute(
+            "UPDATE recipe_cache SET last_used_at = ?, hits = hits + 1 WHERE key = ?",
+            (time.time(), key),
+        )
+        return json.loads(row["value_json"])
+
+    def get_stale(self, recipe: str, key: str) -> Optional[Dict[str, Any]]:
+        """Value for ``key`` even if expired, within the grace period; for when Ollama is down."""
+        row = self._conn.execute(
+            "SELECT value_json FROM recipe_cache WHERE key = ? AND created_at >= ?",
+            (key, time.time() - self.ttl_s - self.stale_s),
+        ).fetchone()
+        if row is None:
+            return None
+        self._counts[recipe]["stale"] += 1
+        return json.loads(row["value_json"])
+
+    def put(self, recipe: str, key: str, value: Dict[str, Any]):
+        value_json = json.dumps(value)
+        now = time.time()
+        self._conn.execute(
+            "INSERT OR REPLACE INTO recipe_cache (key, recipe, value_json, size, created_at, last_used_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (key, recipe, value_json, len(value_json), now, now),
+        )
+        self.evict()
+
+    def evict(self):
+        """Drop entries past their grace period, then least recently used ones beyond the caps."""
+        cursor = self._conn.execute(
+            "DELETE FROM recipe_cache WHERE created_at < ?", (time.time() - self.ttl_s - self.stale_s,)
+        )
+        self.evictions += cursor.rowcount
+
+        entries, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM recipe_cache").fetchone()
+        if entries <= self.max_entries and size <= self.max_bytes:
+            return
+
+        rows = self._conn.execute("SELECT key, size FROM recipe_cache ORDER BY last_used_at").fetchall()
+        doomed = []
+        for row in rows:
+            if entries <= self.max_entries and size <= self.max_bytes:
+                break
+            doomed.append(row["key"])
+            entries -= 1
+            size -= row["size"]
+        self._conn.executemany("DELETE FROM recipe_cache WHERE key = ?", [(key,) for key in doomed])
+        self.evictions += len(doomed)
+
+    def clear(self) -> int:
+        return self._conn.execute("DELETE FROM recipe_cache").rowcount
+
+    def metrics(self) -> Dict[str, Any]:
+        """Hit/miss/bypass/stale counts since startup, overall and per recipe, and current size."""
+        entries, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM recipe_cache").fetchone()
+        hits = sum(c["hits"] for c in self._counts.values())
+        misses = sum(c["misses"] for c in self._counts.values())
+        return {
+            "entries": entries,
+            "bytes": size,
+            "hits": hits,
+            "misses": misses,
+            "bypassed": sum(c["bypassed"] for c in self._counts.values()),
+            "stale": sum(c["stale"] for c in self._counts.values()),
+            "hit_rate": round(hits / (hits + misses), 3) if hits + misses else 0.0,
+            "evictions": self.evictions,
+            "recipes": dict(self._counts),
+        }
+
+    def close(self):
+        self._conn.close()
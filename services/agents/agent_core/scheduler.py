@@ -0,0 +1,144 @@
+"""Priority scheduler for Ollama calls.
+
+A local Ollama instance effectively runs one generation at a time, so
+calls queue up in front of it. Every OllamaClient request takes a slot
+from the scheduler first. At most ``max_in_flight`` run at once, and
+waiting requests are granted in priority order: interactive (someone is
+waiting on screen), then scheduled (automations), then backfill. Requests
+of the same class go first-come first-served. A request is promoted one
+class for every ``aging_s`` it has waited, so background recipes still
+finish while the user is chatting.
+
+The priority of the current request is carried in a context variable:
+routes default to interactive, and job workers set the job's priority.
+"""
+import asyncio
+import itertools
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from agent_config import settings
+
+INTERACTIVE = "interactive"
+SCHEDULED = "scheduled"
+BACKFILL = "backfill"
+# Highest priority first
+PRIORITIES = (INTERACTIVE, SCHEDULED, BACKFILL)
+
+current_priority: ContextVar[str] = ContextVar("llm_priority", default=INTERACTIVE)
+
+
+def priority_rank(priority: str) -> int:
+    """0 for the highest priority class."""
+    return PRIORITIES.index(priority)
+
+
+@dataclass
+class _Waiter:
+    priority: str
+    seq: int
+    enqueued: float
+    future: asyncio.Future = field(repr=False)
+
+
+@dataclass
+class PriorityStats:
+    granted: int = 0
+    wait_total_s: float = 0.0
+    wait_max_s: float = 0.0
+
+    def record(self, waited_s: float):
+        self.granted += 1
+        self.wait_total_s += waited_s
+        self.wait_max_s = max(self.wait_max_s, waited_s)
+
+
+class LLMScheduler:
+    """Grants a bounded number of concurrent LLM calls by priority."""
+
+    def __init__(self, max_in_flight: int, aging_s: float):
+        self.max_in_flight = max(1, max_in_flight)
+        self.aging_s = aging_s
+        self._in_flight = 0
+        self._waiters: List[_Waiter] = []
+        self._seq = itertools.count()
+        self._stats = {priority: PriorityStats() for priority in PRIORITIES}
+
+    def _rank(self, waiter: _Waiter, now: float) -> Tuple[int, int]:
+        boost = int((now - waiter.enqueued) / self.aging_s) if self.aging_s > 0 else 0
+        return (max(priority_rank(waiter.priority) - boost, 0), waiter.seq)
+
+    def _grant(self):
+        now = time.monotonic()
+        while self._in_flight < self.max_in_flight and self._waiters:
+            waiter = min(self._waiters, key=lambda w: self._rank(w, now))
+            self._waiters.remove(waiter)
+            self._in_flight += 1
+            waiter.future.set_result(None)
+
+    async def acquire(self, priority: Optional[str] = None):
+        """Wait for a slot; pair every acquire() with a release()."""
+        priority = priority or current_priority.get()
+        stats = self._stats[priority]
+
+        if self._in_flight < self.max_in_flight and not self._waiters:
+            self._in_flight += 1
+            stats.record(0.0)
+            return
+
+        waiter = _Waiter(priority, next(self._seq), time.monotonic(), asyncio.get_running_loop().create_future())
+        self._waiters.append(waiter)
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # Granted just as we were cancelled; hand the slot on
+                self.release()
+            else:
+                self._waiters.remove(waiter)
+            raise
+        stats.record(time.monotonic() - waiter.enqueued)
+
+    @property
+    def queue_depth(self) -> int:
+        """Requests waiting for a slot."""
+        return len(self._waiters)
+
+    def release(self):
+        self._in_flight -= 1
+        self._grant()
+
+    @asynccontextmanager
+    async def slot(self, priority: Optional[str] = None) -> AsyncIterator[None]:
+        """Hold a slot for the duration of the block."""
+        await self.acquire(priority)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def metrics(self) -> Dict[str, Any]:
+        """In-flight count, queue depth per class and wait times."""
+        depth = {priority: 0 for priority in PRIORITIES}
+        for waiter in self._waiters:
+            depth[waiter.priority] += 1
+
+        return {
+            "max_in_flight": self.max_in_flight,
+            "in_flight": self._in_flight,
+            "queue_depth": sum(depth.values()),
+            "priorities": {
+                priority: {
+                    "waiting": depth[priority],
+                    "granted": stats.granted,
+                    "avg_wait_ms": round(stats.wait_total_s / stats.granted * 1000) if stats.granted else 0,
+                    "max_wait_ms": round(stats.wait_max_s * 1000),
+                }
+                for priority, stats in self._stats.items()
+            },
+        }
+
+
+scheduler = LLMScheduler(settings.ollama_max_in_flight, settings.ollama_priority_aging_s)
@@ -0,0 +1,62 @@
+"""Single-flight deduplication of identical recipe runs.
+
+When the dashboard mounts, several components can ask for the same recipe
+for the same user at once. Calls with the same key (recipe, user and
+params) that arrive while one is already running attach to that run and
+all get its result (or exception) instead of building the context and
+calling Ollama again. The run is cancelled only when every caller waiting
+on it has gone away.
+"""
+import asyncio
+import json
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+
+def recipe_key(recipe: str, user_id: int, params: Dict[str, Any]) -> Tuple[str, int, str]:
+    """Key for a recipe run; params compare regardless of key order."""
+    return (recipe, user_id, json.dumps(params, sort_keys=True, separators=(",", ":"), default=str))
+
+
+@dataclass
+class _Flight:
+    task: asyncio.Task
+    waiters: int = 0
+
+
+class SingleFlight:
+    """Shares one execution among concurrent calls with the same key."""
+
+    def __init__(self):
+        self._flights: Dict[Hashable, _Flight] = {}
+        self.started = 0
+        self.joined = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Run ``fn()``, or wait for the run already in flight under ``key``."""
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight(asyncio.create_task(fn()))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda _: self._land(key, flight))
+            self.started += 1
+        else:
+            self.joined += 1
+
+        flight.waiters += 1
+        try:
+            # Shielded so one caller going away doesn't cancel the others' result
+            return await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            if flight.waiters == 1 and not flight.task.done():
+                flight.task.cancel()
+            raise
+        finally:
+            flight.waiters -= 1
+
+    def _land(self, key: Hashable, flight: _Flight):
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+    def metrics(self) -> Dict[str, int]:
+        return {"in_flight": len(self._flights), "started": self.started, "joined": self.joined}
@@ -0,0 +1,183 @@
+"""Per-call LLM telemetry in SQLite, for tuning prompt sizes and model choices.
+
+Ollama's final response carries token counts and timings (nanoseconds):
+``prompt_eval_count``, ``eval_count``, ``total_duration``,
+``load_duration``, ``prompt_eval_duration`` and ``eval_duration``.
+OllamaClient records one ``llm_calls`` row per request with these, tagged
+with the recipe, requested and answering model, priority class and
+fallback flag, plus the time spent waiting for an LLM slot, wall time and
+(for streams) time to first token. Failed requests are recorded with
+their error.
+
+aggregate() summarizes a time window per recipe and model: p50/p95
+latency, tokens/sec, prompt size distribution and how often a call had to
+load the model first.
+"""
+import math
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS llm_calls (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ts REAL NOT NULL,
+    endpoint TEXT NOT NULL,
+    recipe TEXT,
+    model TEXT NOT NULL,
+    fallback INTEGER NOT NULL DEFAULT 0,
+    priority TEXT,
+    status TEXT NOT NULL,
+    error TEXT,
+    queue_ms REAL,
+    wall_ms REAL,
+    ttft_ms REAL,
+    prompt_eval_count INTEGER,
+    eval_count INTEGER,
+    total_ms REAL,
+    load_ms REAL,
+    prompt_eval_ms REAL,
+    eval_ms REAL
+);
+CREATE INDEX IF NOT EXISTS idx_llm_calls_ts ON llm_calls (ts);
+"""
+
+OK = "ok"
+ERROR = "error"
+
+# A call whose load_duration exceeds this loaded the model rather than finding it resident
+COLD_LOAD_MS = 100
+# Upper bounds (tokens) of the prompt size histogram buckets; the last bucket is open-ended
+PROMPT_BUCKETS = (256, 512, 1024, 2048, 4096)
+
+
+def ns_to_ms(value: Optional[int]) -> Optional[float]:
+    return value / 1e6 if value else None
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    """Nearest-rank percentile of ``values`` (0 < q <= 100)."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)]
+
+
+def prompt_histogram(sizes: List[int]) -> Dict[str, int]:
+    histogram = {f"<={bound}": 0 for bound in PROMPT_BUCKETS}
+    histogram[f">{PROMPT_BUCKETS[-1]}"] = 0
+    for size in sizes:
+        bound = next((b for b in PROMPT_BUCKETS if size <= b), None)
+        histogram[f"<={bound}" if bound else f">{PROMPT_BUCKETS[-1]}"] += 1
+    return histogram
+
+
+def summarize(rows: List[sqlite3.Row]) -> Dict[str, Any]:
+    """Aggregates over a group of llm_calls rows."""
+    ok = [row for row in rows if row["status"] == OK]
+    latencies = [row["wall_ms"] for row in ok if row["wall_ms"] is not None]
+    ttfts = [row["ttft_ms"] for row in ok if row["ttft_ms"] is not None]
+    prompts = [row["prompt_eval_count"] for row in ok if row["prompt_eval_count"] is not None]
+    queue = [row["queue_ms"] for row in ok if row["queue_ms"] is not None]
+    eval_tokens = sum(row["eval_count"] or 0 for row in ok)
+    eval_ms = sum(row["eval_ms"] or 0 for row in ok)
+    loads = [row["load_ms"] for row in ok if (row["load_ms"] or 0) > COLD_LOAD_MS]
+
+    def rounded(value: Optional[float], digits: int = 0) -> Optional[float]:
+        return round(value, digits) if value is not None else None
+
+    return {
+        "calls": len(rows),
+        "errors": len(rows) - len(ok),
+        "fallbacks": sum(1 for row in ok if row["fallback"]),
+        "latency_ms": {"p50": rounded(percentile(latencies, 50)), "p95": rounded(percentile(latencies, 95))},
+        "ttft_ms": {"p50": rounded(percentile(ttfts, 50)), "p95": rounded(percentile(ttfts, 95))},
+        "queue_ms": {"p50": rounded(percentile(queue, 50)), "p95": rounded(percentile(queue, 95))},
+        "tokens_per_s": rounded(eval_tokens / (eval_ms / 1000), 1) if eval_ms else None,
+        "output_tokens": {"total": eval_tokens, "avg": rounded(eval_tokens / len(ok), 1) if ok else None},
+        "prompt_tokens": {
+            "p50": percentile(prompts, 50),
+            "p95": percentile(prompts, 95),
+            "max": max(prompts) if prompts else None,
+            "histogram": prompt_histogram(prompts),
+        },
+        "model_loads": {
+            "count": len(loads),
+            "rate": rounded(len(loads) / len(ok), 3) if ok else None,
+            "avg_ms": rounded(sum(loads) / len(loads)) if loads else None,
+        },
+    }
+
+
+class LLMTelemetry:
+    """SQLite log of Ollama calls with aggregate queries."""
+
+    def __init__(self, path: str):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        # Only ever used from the event loop thread; autocommit per statement
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    def record(
+        self,
+        endpoint: str,
+        recipe: Optional[str],
+        model: str,
+        data: Optional[Dict[str, Any]] = None,
+        fallback: bool = False,
+        priority: Optional[str] = None,
+        error: Optional[str] = None,
+        queue_s: Optional[float] = None,
+        wall_s: Optional[float] = None,
+        ttft_s: Optional[float] = None,
+    ):
+        """Store one call; ``data`` is Ollama's final response (None if the call failed)."""
+        data = data or {}
+        self._conn.execute(
+            "INSERT INTO llm_calls (ts, endpoint, recipe, model, fallback, priority, status, error, "
+            "queue_ms, wall_ms, ttft_ms, prompt_eval_count, eval_count, total_ms, load_ms, prompt_eval_ms, eval_ms) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                time.time(), endpoint, recipe, model, int(fallback), priority,
+                ERROR if error else OK, error,
+                queue_s * 1000 if queue_s is not None else None,
+                wall_s * 1000 if wall_s is not None else None,
+                ttft_s * 1000 if ttft_s is not None else None,
+                data.get("prompt_eval_count"), data.get("eval_count"),
+                ns_to_ms(data.get("total_duration")), ns_to_ms(data.get("load_duration")),
+                ns_to_ms(data.get("prompt_eval_duration")), ns_to_ms(data.get("eval_duration")),
+            ),
+        )
+
+    def aggregate(self, since_s: float, recipe: Optional[str] = None) -> Dict[str, Any]:
+        """Aggregates over the last ``since_s`` seconds: overall, per recipe and per model."""
+        query = "SELECT * FROM llm_calls WHERE ts >= ?"
+        params: List[Any] = [time.time() - since_s]
+        if recipe:
+            query += " AND recipe = ?"
+            params.append(recipe)
+        rows = self._conn.execute(query, params).fetchall()
+
+        by_recipe: Dict[str, List[sqlite3.Row]] = {}
+        by_model: Dict[str, List[sqlite3.Row]] = {}
+        for row in rows:
+            by_recipe.setdefault(row["recipe"] or "(none)", []).append(row)
+            by_model.setdefault(row["model"], []).append(row)
+
+        return {
+            "since_s": since_s,
+            "overall": summarize(rows),
+            "recipes": {name: summarize(group) for name, group in sorted(by_recipe.items())},
+            "models": {name: summarize(group) for name, group in sorted(by_model.items())},
+        }
+
+    def prune(self, older_than_s: float) -> int:
+        """Delete calls recorded more than ``older_than_s`` ago."""
+        return self._conn.execute("DELETE FROM llm_calls WHERE ts < ?", (time.time() - older_than_s,)).rowcount
+
+    def close(self):
+        self._conn.close()
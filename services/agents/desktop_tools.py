@@ -360,16 +360,21 @@ def write_file(path: str, content: str) -> dict:
 # TERMINAL TOOLS
 # ============================================================================
 
-def execute_command(command: str, cwd: Optional[str] = None) -> dict:
+def execute_command(command: str, cwd: Optional[str] = None, session_id: Optional[str] = "agent") -> dict:
     """
     Execute a shell command.
 
+    Commands run in a persistent shell session on the API, so `cd` and
+    exported variables carry over between calls with the same session_id.
+    In a session stdout and stderr are returned merged in 'stdout'.
+
     Args:
         command: Shell command to execute
         cwd: Working directory (optional)
+        session_id: Shell session to reuse (None = one-off process)
 
     Returns:
-        Command output (stdout, stderr, exit code)
+        Command output (stdout, stderr, exit code, cwd)
 
     Example:
         result = execute_command(command="ls -la", cwd="/home/julius")
@@ -378,6 +383,8 @@ def execute_command(command: str, cwd: Optional[str] = None) -> dict:
     data = {'command': command}
     if cwd:
         data['cwd'] = cwd
+    if session_id:
+        data['session_id'] = session_id
 
     response = requests.post(f"{API_BASE}/terminal/execute", json=data)
     return response.json()
@@ -1,8 +1,11 @@
 """Main agent service API."""
-from fastapi import FastAPI, HTTPException
+from contextlib import asynccontextmanager
+from fastapi import Depends, FastAPI, HTTPException
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, AsyncIterator, Awaitable, Callable, List, Literal, Tuple
 from recipes.daily_digest import run_daily_digest
 from recipes.weekly_review import run_weekly_review
 from recipes.bible_reflector import run_bible_reflector
@@ -11,16 +14,58 @@ from recipes.schedule_rebalancer import run_schedule_rebalancer
 from recipes.profile_update import run_profile_update
 from recipes.next_best_step import run_next_best_step
 from recipes.skin_coach import run_skin_coach
-from recipes.chat_assistant import run_chat_assistant
+from recipes.chat_assistant import run_chat_assistant, stream_chat_assistant
 from recipes.code_assistant import run_code_assistant
 from agent_core.ollama_client import OllamaClient
 from agent_core.context_builder import ContextBuilder
+from agent_core.context_compactor import compact_context, compact_module, render
+from agent_core.clients import clients, get_api_client, get_context_builder, get_ollama
+from agent_core.jobs import JobQueue, JobStore
+from agent_core.scheduler import current_priority, scheduler
+from agent_core.result_cache import bypass_cache
+from agent_core.singleflight import SingleFlight, recipe_key
+from agent_core.chat_sessions import chat_sessions
+from agent_core.circuit_breaker import OllamaUnavailable, breaker
+from agent_core.model_router import current_recipe, router
+from agent_core.model_warmup import ModelWarmer
+from agent_config import settings
+import asyncio
+import httpx
 import json
 
+# Recipe job queue and model warmer, created by the lifespan
+job_queue: Optional[JobQueue] = None
+model_warmer: Optional[ModelWarmer] = None
+# Identical recipe runs in flight at once (route or job) share one execution
+recipe_flights = SingleFlight()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open the shared HTTP connection pools and start the job workers, Ollama health probe and model warm-up."""
+    global job_queue, model_warmer
+
+    clients.start()
+    breaker.start(clients.ollama.check_health)
+    model_warmer = ModelWarmer(clients.ollama)
+    model_warmer.start()
+    store = JobStore(settings.jobs_db_path)
+    store.prune(settings.job_retention_days * 86400)
+    job_queue = JobQueue(store, run_recipe_job, settings.job_workers, settings.job_timeout_s)
+    job_queue.start()
+    yield
+    await job_queue.stop()
+    store.close()
+    await model_warmer.stop()
+    await breaker.stop()
+    await clients.close()
+
+
 app = FastAPI(
     title="JuliOS Agent Service",
     description="AI agent service for JuliOS",
     version="2.0.0",
+    lifespan=lifespan,
 )
 
 # CORS middleware for local development
@@ -41,93 +86,286 @@ class AskRequest(BaseModel):
 
 class DigestRequest(BaseModel):
     user_id: int
+    # Regenerate even if a cached result exists (the fresh result replaces it)
+    bypass_cache: bool = False
 
 
 class RecipeRequest(BaseModel):
     user_id: int
     params: Dict[str, Any] = {}
+    # LLM scheduling class: someone waiting on screen, an automation, or bulk work
+    priority: Literal["interactive", "scheduled", "backfill"] = "interactive"
+    bypass_cache: bool = False
 
 
 @app.get("/health")
-async def health_check():
-    """Health check endpoint."""
-    client = OllamaClient()
-    ollama_healthy = await client.check_health()
-    await client.close()
+async def health_check(ollama: OllamaClient = Depends(get_ollama)):
+    """Health check endpoint, with circuit state and which models Ollama has loaded."""
+    ollama_healthy = await ollama.check_health()
 
     return {
         "status": "ok" if ollama_healthy else "degraded",
         "ollama_available": ollama_healthy,
+        "llm_queue_depth": scheduler.metrics()["queue_depth"],
+        "circuit": breaker.metrics(),
+        "models": (await model_warmer.status())["models"] if model_warmer and ollama_healthy else [],
     }
 
 
-@app.post("/ask")
-async def agent_ask(request: AskRequest):
-    """Ask the agent a question with context."""
-    try:
-        # Build context
-        context_builder = ContextBuilder()
-        context = await context_builder.build_context(
-            user_id=request.user_id,
-            window_days=request.context_window_days,
+def recipe_error(e: Exception) -> HTTPException:
+    """HTTP error for a failed recipe: 503 with Retry-After while Ollama is down, else 500."""
+    if isinstance(e, OllamaUnavailable):
+        return HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(max(1, round(e.retry_after_s)))},
         )
-        await context_builder.close()
+    return HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/metrics/scheduler")
+async def scheduler_metrics():
+    """LLM scheduler state: in-flight calls, queue depth and waits per priority class."""
+    return {
+        **scheduler.metrics(),
+        "jobs_queued": job_queue.depth if job_queue else 0,
+        "recipe_runs": recipe_flights.metrics(),
+    }
+
+
+@app.get("/metrics/routing")
+async def routing_metrics():
+    """Model tiers with their SLOs and observed tokens/sec, and each recipe's tier and downgrades."""
+    return router.metrics()
+
+
+@app.get("/metrics/llm")
+async def llm_metrics(since_s: float = 86400, recipe: Optional[str] = None):
+    """Ollama call telemetry over the last ``since_s`` seconds.
+
+    p50/p95 latency, tokens/sec, prompt size distribution and model load
+    frequency, overall, per recipe and per model.
+    """
+    clients.start()
+    if clients.telemetry is None:
+        return {"enabled": False}
+    return {"enabled": True, **clients.telemetry.aggregate(since_s, recipe)}
+
+
+@app.get("/metrics/cache")
+async def cache_metrics():
+    """Recipe result cache: hits, misses and bypasses per recipe, and size."""
+    clients.start()
+    if clients.cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **clients.cache.metrics()}
+
+
+@app.delete("/cache")
+async def clear_cache():
+    """Drop every cached recipe result."""
+    clients.start()
+    return {"cleared": clients.cache.clear() if clients.cache else 0}
 
-        # Create prompt
-        system = """You are a helpful personal assistant with access to the user's life data.
+
+ASK_SYSTEM_PROMPT = """You are a helpful personal assistant with access to the user's life data.
 Answer questions based on the context provided. Be concise and actionable."""
 
-        user_prompt = f"""CONTEXT:
-{json.dumps(context, indent=2)}
 
+def sse_event(payload: Dict[str, Any]) -> str:
+    """Format one server-sent event."""
+    return f"data: {json.dumps(payload)}\n\n"
+
+
+async def sse_tokens(chunks: AsyncIterator[Dict[str, Any]]) -> AsyncIterator[str]:
+    """Render Ollama stream chunks as server-sent events.
+
+    Emits {"type": "token", "text"} per text delta, then one
+    {"type": "done", "response", "model", "fallback"} with the full text
+    (plus "session_id" for chat sessions), or {"type": "error", "detail"} if
+    generation fails midway.
+    """
+    text = []
+    try:
+        async for chunk in chunks:
+            delta = chunk.get("response", "")
+            if delta:
+                text.append(delta)
+                yield sse_event({"type": "token", "text": delta})
+            if chunk.get("done"):
+                done = {
+                    "type": "done",
+                    "response": "".join(text),
+                    "model": chunk.get("model"),
+                    "fallback": chunk.get("fallback", False),
+                }
+                if "session_id" in chunk:
+                    done["session_id"] = chunk["session_id"]
+                yield sse_event(done)
+    except Exception as e:
+        yield sse_event({"type": "error", "detail": str(e)})
+    finally:
+        # Release the LLM slot promptly if the client disconnects mid-stream
+        await chunks.aclose()
+
+
+def sse_response(chunks: AsyncIterator[Dict[str, Any]]) -> StreamingResponse:
+    return StreamingResponse(
+        sse_tokens(chunks),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+# Context keys kept for /ask when retrieval is available; history comes from retrieval
+ASK_CORE_KEYS = ["tasks", "events", "goals", "habits", "habit_logs"]
+
+
+async def build_ask_prompt(request: AskRequest, context_builder: ContextBuilder) -> Tuple[str, List[dict]]:
+    """Build the /ask prompt from the user's context and question.
+
+    Journal entries, notes and memory events relevant to the question are
+    retrieved from the API's embedding index and added to a small
+    current-state context. When the index is unavailable or returns
+    nothing, the whole window's context is used instead.
+
+    Returns:
+        (prompt, sources) where sources are the retrieved items
+    """
+    retrieved, context = await asyncio.gather(
+        context_builder.retrieve(request.query, k=settings.ask_retrieval_k),
+        context_builder.build_context(
+            user_id=request.user_id,
+            window_days=request.context_window_days,
+        ),
+    )
+
+    if not retrieved:
+        # Index unavailable, or nothing relevant: keep the whole window's context
+        retrieved = []
+    else:
+        context = {
+            key: value for key, value in context.items()
+            if key in ASK_CORE_KEYS or not isinstance(value, (list, dict))
+        }
+
+    relevant = ""
+    if retrieved:
+        items = [
+            {key: item[key] for key in ("kind", "title", "dt", "text") if item.get(key)}
+            for item in retrieved
+        ]
+        relevant = f"""
+RELEVANT HISTORY (journal, notes and memories, most relevant first):
+{render(compact_module("retrieved", items, settings.context_token_budget // 2))}
+"""
+
+    sources = [
+        {"kind": item["kind"], "id": item["id"], "title": item.get("title"), "score": item["score"]}
+        for item in retrieved
+    ]
+    return f"""CONTEXT:
+{render(compact_context(context))}
+{relevant}
 QUESTION:
 {request.query}
 
-Provide a helpful answer based on the context."""
+Provide a helpful answer based on the context.""", sources
+
+
+@app.post("/ask")
+async def agent_ask(
+    request: AskRequest,
+    context_builder: ContextBuilder = Depends(get_context_builder),
+    ollama: OllamaClient = Depends(get_ollama),
+):
+    """Ask the agent a question with context."""
+    current_recipe.set("ask")
+    try:
+        user_prompt, sources = await build_ask_prompt(request, context_builder)
 
         # Call Ollama
-        client = OllamaClient()
-        try:
-            result = await client.generate(
-                prompt=user_prompt,
-                system=system,
-                temperature=0.4,
-            )
-
-            return {
-                "answer": result.get("response", ""),
-                "sources": [],
-                "reasoning": None,
-            }
-        finally:
-            await client.close()
+        result = await ollama.generate(
+            prompt=user_prompt,
+            system=ASK_SYSTEM_PROMPT,
+            temperature=0.4,
+        )
+
+        return {
+            "answer": result.get("response", ""),
+            "sources": sources,
+            "reasoning": None,
+        }
 
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise recipe_error(e)
+
+
+@app.post("/ask/stream")
+async def agent_ask_stream(
+    request: AskRequest,
+    context_builder: ContextBuilder = Depends(get_context_builder),
+    ollama: OllamaClient = Depends(get_ollama),
+):
+    """Ask the agent a question, streaming the answer as server-sent events."""
+    current_recipe.set("ask")
+    try:
+        user_prompt, _ = await build_ask_prompt(request, context_builder)
+    except Exception as e:
+        raise recipe_error(e)
+
+    return sse_response(ollama.generate_stream(
+        prompt=user_prompt,
+        system=ASK_SYSTEM_PROMPT,
+        temperature=0.4,
+    ))
 
 
 @app.post("/digest/daily")
-async def daily_digest(request: DigestRequest):
+async def daily_digest(
+    request: DigestRequest,
+    context_builder: ContextBuilder = Depends(get_context_builder),
+    ollama: OllamaClient = Depends(get_ollama),
+):
     """Generate daily digest."""
+    current_recipe.set("daily_digest")
+    bypass_cache.set(request.bypass_cache)
     try:
-        digest = await run_daily_digest(request.user_id)
+        digest = await recipe_flights.do(
+            flight_key("daily_digest", request.user_id, {}),
+            lambda: run_daily_digest(request.user_id, context_builder=context_builder, ollama=ollama),
+        )
         return digest
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise recipe_error(e)
 
 
 @app.post("/review/weekly")
-async def weekly_review(request: DigestRequest):
+async def weekly_review(
+    request: DigestRequest,
+    context_builder: ContextBuilder = Depends(get_context_builder),
+    ollama: OllamaClient = Depends(get_ollama),
+):
     """Generate weekly review."""
+    current_recipe.set("weekly_review")
+    bypass_cache.set(request.bypass_cache)
     try:
-        review = await run_weekly_review(request.user_id)
+        review = await recipe_flights.do(
+            flight_key("weekly_review", request.user_id, {}),
+            lambda: run_weekly_review(request.user_id, context_builder=context_builder, ollama=ollama),
+        )
         return review
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise recipe_error(e)
 
 
 @app.post("/actions/run")
-async def run_action(action_name: str, user_id: int):
+async def run_action(
+    action_name: str,
+    user_id: int,
+    context_builder: ContextBuilder = Depends(get_context_builder),
+    ollama: OllamaClient = Depends(get_ollama),
+):
     """Run a named action."""
     # Map action names to functions
     actions = {
@@ -137,48 +375,222 @@ async def run_action(action_name: str, user_id: int):
     if action_name not in actions:
         raise HTTPException(status_code=404, detail=f"Action '{action_name}' not found")
 
+    current_recipe.set(actions[action_name].__name__.removeprefix("run_"))
     try:
-        result = await actions[action_name](user_id)
+        result = await actions[action_name](user_id, context_builder=context_builder, ollama=ollama)
         return result
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise recipe_error(e)
+
+
+# name -> (user_id, params, api client, {"context_builder", "ollama"}) -> recipe coroutine
+RECIPES: Dict[str, Callable[[int, Dict[str, Any], httpx.AsyncClient, Dict[str, Any]], Awaitable[dict]]] = {
+    "bible_reflector": lambda user_id, params, api, deps: run_bible_reflector(
+        user_id,
+        params.get("passage", ""),
+        **deps
+    ),
+    "macro_coach": lambda user_id, params, api, deps: run_macro_coach(
+        user_id,
+        params.get("targets"),
+        **deps
+    ),
+    "schedule_rebalancer": lambda user_id, params, api, deps: run_schedule_rebalancer(user_id, **deps),
+    "daily_digest": lambda user_id, params, api, deps: run_daily_digest(user_id, **deps),
+    "weekly_review": lambda user_id, params, api, deps: run_weekly_review(user_id, **deps),
+    "profile_update": lambda user_id, params, api, deps: run_profile_update(user_id, api=api, **deps),
+    "next_best_step": lambda user_id, params, api, deps: run_next_best_step(user_id, **deps),
+    "skin_coach": lambda user_id, params, api, deps: run_skin_coach(user_id, api=api, ollama=deps["ollama"]),
+    "chat_assistant": lambda user_id, params, api, deps: run_chat_assistant(
+        user_id,
+        params.get("message", ""),
+        params.get("session_id"),
+        **deps
+    ),
+    "code_assistant": lambda user_id, params, api, deps: run_code_assistant(
+        user_id,
+        params.get("message", ""),
+        params.get("files", []),
+        params.get("operation"),
+        **deps
+    ),
+}
+
+
+def flight_key(recipe_name: str, user_id: int, params: Dict[str, Any]) -> tuple:
+    """Single-flight key; cache-bypassing runs never join runs that may be served from cache."""
+    return (*recipe_key(recipe_name, user_id, params), bypass_cache.get())
+
+
+async def run_recipe_once(
+    recipe_name: str,
+    user_id: int,
+    params: Dict[str, Any],
+    api: httpx.AsyncClient,
+    deps: Dict[str, Any],
+) -> dict:
+    """Run a recipe, or join an identical run (same recipe, user and params) already in flight."""
+    current_recipe.set(recipe_name)
+    return await recipe_flights.do(
+        flight_key(recipe_name, user_id, params),
+        lambda: RECIPES[recipe_name](user_id, params, api, deps),
+    )
+
+
+async def run_recipe_job(recipe_name: str, user_id: int, params: Dict[str, Any]) -> dict:
+    """Job runner: run a queued recipe with the shared clients."""
+    deps = {"context_builder": get_context_builder(), "ollama": get_ollama()}
+    return await run_recipe_once(recipe_name, user_id, params, get_api_client(), deps)
 
 
 @app.post("/recipes/{recipe_name}")
-async def run_recipe(recipe_name: str, request: RecipeRequest):
-    """Run a named recipe."""
+async def run_recipe(
+    recipe_name: str,
+    request: RecipeRequest,
+    api: httpx.AsyncClient = Depends(get_api_client),
+    context_builder: ContextBuilder = Depends(get_context_builder),
+    ollama: OllamaClient = Depends(get_ollama),
+):
+    """Run a named recipe and wait for its result.
+
+    Long recipes are better submitted to POST /recipes/{recipe_name}/jobs.
+    """
+    if recipe_name not in RECIPES:
+        raise HTTPException(status_code=404, detail=f"Recipe '{recipe_name}' not found")
+
+    current_priority.set(request.priority)
+    bypass_cache.set(request.bypass_cache)
+    deps = {"context_builder": context_builder, "ollama": ollama}
+    try:
+        result = await run_recipe_once(recipe_name, request.user_id, request.params, api, deps)
+        return result
+    except Exception as e:
+        raise recipe_error(e)
+
+
+def get_job_queue() -> JobQueue:
+    if job_queue is None:
+        raise HTTPException(status_code=503, detail="Job queue is not running")
+    return job_queue
+
+
+def get_job_or_404(queue: JobQueue, job_id: str) -> dict:
+    job = queue.store.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found")
+    return job
+
+
+@app.post("/recipes/{recipe_name}/jobs", status_code=202)
+async def submit_recipe_job(
+    recipe_name: str,
+    request: RecipeRequest,
+    queue: JobQueue = Depends(get_job_queue),
+):
+    """Queue a recipe run and return its job right away.
+
+    Poll GET /jobs/{job_id} (with ``wait`` to long-poll) or follow
+    GET /jobs/{job_id}/events for completion.
+    """
+    if recipe_name not in RECIPES:
+        raise HTTPException(status_code=404, detail=f"Recipe '{recipe_name}' not found")
+
+    job = await queue.submit(
+        recipe_name, request.user_id, request.params, request.priority, bypass_cache=request.bypass_cache
+    )
+    return JSONResponse(status_code=202, content=job, headers={"Location": f"/jobs/{job['job_id']}"})
+
+
+@app.get("/jobs")
+async def list_jobs(
+    status: Optional[str] = None,
+    limit: int = 50,
+    queue: JobQueue = Depends(get_job_queue),
+) -> List[dict]:
+    """List recent jobs, newest first."""
+    return queue.store.list(status, min(max(limit, 1), 500))
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(
+    job_id: str,
+    wait: float = 0,
+    queue: JobQueue = Depends(get_job_queue),
+):
+    """Get a job's status, result and timings.
+
+    With ``wait`` > 0, hold the request up to that many seconds (max 60) for
+    the job to finish before answering.
+    """
+    job = get_job_or_404(queue, job_id)
+    if wait > 0:
+        job = await queue.wait(job_id, timeout=min(wait, 60))
+    return job
+
+
+@app.get("/jobs/{job_id}/events")
+async def follow_job(job_id: str, queue: JobQueue = Depends(get_job_queue)):
+    """Server-sent {"type": "job", ...job} events on every status change until the job finishes."""
+    get_job_or_404(queue, job_id)
+
+    async def events():
+        async for job in queue.follow(job_id):
+            yield sse_event({"type": "job", **job})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.delete("/jobs/{job_id}")
+async def cancel_job(job_id: str, queue: JobQueue = Depends(get_job_queue)):
+    """Cancel a queued or running job."""
+    get_job_or_404(queue, job_id)
+    return await queue.cancel(job_id)
+
+
+@app.post("/recipes/{recipe_name}/stream")
+async def run_recipe_stream(
+    recipe_name: str,
+    request: RecipeRequest,
+    context_builder: ContextBuilder = Depends(get_context_builder),
+    ollama: OllamaClient = Depends(get_ollama),
+):
+    """Run a recipe that supports streaming, as server-sent events."""
+    deps = {"context_builder": context_builder, "ollama": ollama}
     recipes = {
-        "bible_reflector": lambda: run_bible_reflector(
-            request.user_id,
-            request.params.get("passage", "")
-        ),
-        "macro_coach": lambda: run_macro_coach(
-            request.user_id,
-            request.params.get("targets")
-        ),
-        "schedule_rebalancer": lambda: run_schedule_rebalancer(request.user_id),
-        "daily_digest": lambda: run_daily_digest(request.user_id),
-        "weekly_review": lambda: run_weekly_review(request.user_id),
-        "profile_update": lambda: run_profile_update(request.user_id),
-        "next_best_step": lambda: run_next_best_step(request.user_id),
-        "skin_coach": lambda: run_skin_coach(request.user_id),
-        "chat_assistant": lambda: run_chat_assistant(request.user_id, request.params.get("message", "")),
-        "code_assistant": lambda: run_code_assistant(
+        "chat_assistant": lambda: stream_chat_assistant(
             request.user_id,
             request.params.get("message", ""),
-            request.params.get("files", []),
-            request.params.get("operation")
+            request.params.get("session_id"),
+            **deps
         ),
     }
 
     if recipe_name not in recipes:
-        raise HTTPException(status_code=404, detail=f"Recipe '{recipe_name}' not found")
+        raise HTTPException(status_code=404, detail=f"Recipe '{recipe_name}' does not support streaming")
 
-    try:
-        result = await recipes[recipe_name]()
-        return result
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    current_recipe.set(recipe_name)
+    return sse_response(recipes[recipe_name]())
+
+
+@app.get("/chat/sessions/{session_id}")
+async def get_chat_session(session_id: str):
+    """A chat session's turns, summary and context size."""
+    session = chat_sessions.get(session_id)
+    if not session:
+        raise HTTPException(status_code=404, detail=f"Chat session '{session_id}' not found")
+    return session.to_dict()
+
+
+@app.delete("/chat/sessions/{session_id}")
+async def delete_chat_session(session_id: str):
+    """End a chat session and free its context."""
+    if not chat_sessions.delete(session_id):
+        raise HTTPException(status_code=404, detail=f"Chat session '{session_id}' not found")
+    return {"deleted": session_id}
 
 
 if __name__ == "__main__":
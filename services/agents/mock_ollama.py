@@ -0,0 +1,359 @@
+"""Stand-in Ollama server for latency benchmarks and load tests without a model.
+
+Implements the parts of the Ollama HTTP API the services use:
+``/api/generate`` and ``/api/chat`` (streamed and not), ``/api/tags``,
+``/api/ps``, ``/api/embed`` and ``/api/embeddings``. Latency is simulated
+deterministically: a model that is not loaded first costs ``load_s``, every
+request then waits ``ttft_s`` for its first token, and output is produced
+at ``tokens_per_s`` (per model via ``tokens_per_s_by_model``). Final responses
+carry the same token counts and durations as real Ollama, so telemetry,
+routing and chat context reuse behave as they would against a real model.
+
+Responses:
+
+- the first ``responses_path`` entry whose ``pattern`` (regex) matches the
+  prompt, or the last user message for chat, is returned verbatim (a JSON
+  value is serialized):
+  ``[{"pattern": "nutrition coach", "response": {"protein_gap_g": 20}}]``
+- otherwise, in JSON mode, the example schema in the prompt (the last
+  ``{...}`` block starting a line, with ``...`` placeholders dropped)
+- otherwise ``output_tokens`` words of filler text
+
+Failure injection: ``failure_rate`` answers 500, ``stall_rate`` hangs for
+``stall_s`` first (for client timeouts), ``failing_models`` always fail
+with 500 and models not in ``models`` get 404, as in Ollama. To simulate
+Ollama being down, stop the server.
+
+Settings come from ``MOCK_OLLAMA_*`` environment variables and can be
+changed at runtime with ``PATCH /mock/config``; ``GET /mock/stats`` counts
+requests per endpoint, model and outcome.
+
+Usage:
+    python mock_ollama.py                      # on :11434, in place of Ollama
+    MOCK_OLLAMA_TOKENS_PER_S=15 MOCK_OLLAMA_LOAD_S=8 python mock_ollama.py
+"""
+import asyncio
+import hashlib
+import json
+import math
+import random
+import re
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic_settings import BaseSettings
+
+
+class MockSettings(BaseSettings):
+    """Mock Ollama settings (environment variables prefixed MOCK_OLLAMA_)."""
+
+    port: int = 11434
+    models: List[str] = ["llama3:8b", "llama3.2:3b", "mistral", "nomic-embed-text"]
+    # Latency model
+    load_s: float = 0.0  # loading a model that is not resident
+    ttft_s: float = 0.2  # prompt evaluation, before the first token
+    tokens_per_s: float = 30.0
+    tokens_per_s_by_model: Dict[str, float] = {}
+    output_tokens: int = 40  # length of filler responses
+    default_keep_alive_s: float = 300.0
+    # Failure injection
+    failure_rate: float = 0.0
+    stall_rate: float = 0.0
+    stall_s: float = 30.0
+    failing_models: List[str] = []
+    seed: int = 0
+    # Canned responses: JSON list of {"pattern": regex, "response": text or JSON value}
+    responses_path: Optional[str] = None
+    embedding_dim: int = 64
+
+    class Config:
+        env_prefix = "mock_ollama_"
+        case_sensitive = False
+
+
+settings = MockSettings()
+app = FastAPI(title="Mock Ollama", description="Ollama stand-in for benchmarks")
+
+rng = random.Random(settings.seed)
+stats: Counter = Counter()
+# model -> time.time() its keep_alive runs out
+loaded: Dict[str, float] = {}
+
+DURATION = re.compile(r"^(\d+(?:\.\d+)?)(ms|s|m|h)$")
+DURATION_UNITS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+TOKEN = re.compile(r"\S+\s*|\s+")
+WORD = re.compile(r"\w+")
+FILLER = "the plan looks steady today so keep focus on the next small step and rest well".split()
+
+
+def tagged(model: str) -> str:
+    return model if ":" in model else f"{model}:latest"
+
+
+def known(model: str) -> bool:
+    return tagged(model) in {tagged(m) for m in settings.models}
+
+
+def keep_alive_s(value: Any) -> float:
+    """Ollama keep_alive (seconds, duration string, or negative for forever) in seconds."""
+    if value is None:
+        return settings.default_keep_alive_s
+    if isinstance(value, (int, float)):
+        return math.inf if value < 0 else float(value)
+    match = DURATION.match(str(value))
+    if not match:
+        return settings.default_keep_alive_s
+    return float(match.group(1)) * DURATION_UNITS[match.group(2)]
+
+
+def load_responses() -> List[Tuple[re.Pattern, Any]]:
+    if not settings.responses_path:
+        return []
+    entries = json.loads(Path(settings.responses_path).read_text())
+    return [(re.compile(entry["pattern"], re.IGNORECASE | re.DOTALL), entry["response"]) for entry in entries]
+
+
+canned = load_responses()
+
+
+def schema_from_prompt(prompt: str) -> Optional[str]:
+    """The last JSON object in the prompt that starts a line, with "..." placeholders removed."""
+    cleaned = re.sub(r"^\s*\.\.\..*$\n?", "", prompt, flags=re.MULTILINE)
+    cleaned = re.sub(r",(\s*[\]}])", r"\1", cleaned)
+    decoder = json.JSONDecoder()
+    for match in reversed(list(re.finditer(r"^\{", cleaned, flags=re.MULTILINE))):
+        try:
+            value, _ = decoder.raw_decode(cleaned, match.start())
+        except ValueError:
+            continue
+        return json.dumps(value)
+    return None
+
+
+def response_text(prompt: str, format: Optional[str]) -> str:
+    for pattern, response in canned:
+        if pattern.search(prompt):
+            return response if isinstance(response, str) else json.dumps(response)
+    if format == "json":
+        return schema_from_prompt(prompt) or "{}"
+    words = [FILLER[i % len(FILLER)] for i in range(settings.output_tokens)]
+    return " ".join(words).capitalize() + "."
+
+
+def embed(text: str) -> List[float]:
+    """Deterministic unit vector from hashed words, so similar texts score high."""
+    vector = [0.0] * settings.embedding_dim
+    for word in WORD.findall(text.lower()):
+        vector[int(hashlib.md5(word.encode()).hexdigest(), 16) % settings.embedding_dim] += 1.0
+    norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+    return [v / norm for v in vector]
+
+
+def error(status: int, message: str, endpoint: str, model: str) -> JSONResponse:
+    stats[(endpoint, model, f"error_{status}")] += 1
+    return JSONResponse({"error": message}, status_code=status)
+
+
+async def admit(endpoint: str, body: Dict[str, Any]) -> Tuple[Optional[JSONResponse], float]:
+    """Apply failure injection and model loading.
+
+    Returns:
+        (error response or None, seconds spent loading the model)
+    """
+    model = body.get("model", "")
+    if not known(model):
+        return error(404, f"model '{model}' not found, try pulling it first", endpoint, model), 0.0
+    if model in settings.failing_models:
+        return error(500, f"model '{model}' failed to load", endpoint, model), 0.0
+    if settings.stall_rate and rng.random() < settings.stall_rate:
+        await asyncio.sleep(settings.stall_s)
+    if settings.failure_rate and rng.random() < settings.failure_rate:
+        return error(500, "injected failure", endpoint, model), 0.0
+
+    load_s = 0.0
+    now = time.time()
+    if loaded.get(tagged(model), 0) < now:
+        load_s = settings.load_s
+        await asyncio.sleep(load_s)
+    loaded[tagged(model)] = time.time() + keep_alive_s(body.get("keep_alive"))
+    return None, load_s
+
+
+def timings(prompt_tokens: int, eval_tokens: int, load_s: float, tokens_per_s: float) -> Dict[str, int]:
+    eval_s = eval_tokens / tokens_per_s
+    return {
+        "total_duration": int((load_s + settings.ttft_s + eval_s) * 1e9),
+        "load_duration": int(load_s * 1e9),
+        "prompt_eval_count": prompt_tokens,
+        "prompt_eval_duration": int(settings.ttft_s * 1e9),
+        "eval_count": eval_tokens,
+        "eval_duration": int(eval_s * 1e9),
+    }
+
+
+def generation(
+    endpoint: str, body: Dict[str, Any], prompt: str, load_s: float
+) -> Tuple[List[str], Dict[str, Any], float]:
+    """Tokens to produce, the final response's counts and durations, and seconds per token."""
+    model = body["model"]
+    tokens = TOKEN.findall(response_text(prompt, body.get("format")))
+    tokens_per_s = settings.tokens_per_s_by_model.get(model, settings.tokens_per_s)
+    prompt_tokens = max(1, len(prompt) // 4) + len(body.get("context") or [])
+    stats[(endpoint, model, "ok")] += 1
+    return tokens, timings(prompt_tokens, len(tokens), load_s, tokens_per_s), 1 / tokens_per_s
+
+
+async def stream_chunks(chunks: AsyncIterator[Dict[str, Any]]) -> StreamingResponse:
+    async def ndjson():
+        async for chunk in chunks:
+            yield json.dumps(chunk) + "\n"
+
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+
+@app.get("/api/tags")
+async def tags():
+    return {"models": [{"name": tagged(model), "model": tagged(model)} for model in settings.models]}
+
+
+@app.get("/api/ps")
+async def running():
+    now = time.time()
+    return {
+        "models": [
+            {
+                "name": model,
+                "model": model,
+                "size_vram": 0,
+                "expires_at": "forever" if expires == math.inf else time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(expires)),
+            }
+            for model, expires in loaded.items()
+            if expires > now
+        ]
+    }
+
+
+@app.post("/api/generate")
+async def generate(request: Request):
+    body = await request.json()
+    failure, load_s = await admit("generate", body)
+    if failure:
+        return failure
+
+    prompt = body.get("prompt", "")
+    model = body["model"]
+    if not prompt:
+        # Load request: loads the model, generates nothing
+        return {"model": model, "response": "", "done": True, "done_reason": "load"}
+
+    tokens, final, per_token_s = generation("generate", body, prompt, load_s)
+    # A continuable context covering the prompt and the answer
+    final["context"] = list(range(final["prompt_eval_count"] + final["eval_count"]))
+
+    if not body.get("stream", True):
+        await asyncio.sleep(settings.ttft_s + per_token_s * len(tokens))
+        return {"model": model, "response": "".join(tokens), "done": True, "done_reason": "stop", **final}
+
+    async def chunks():
+        await asyncio.sleep(settings.ttft_s)
+        for token in tokens:
+            yield {"model": model, "response": token, "done": False}
+            await asyncio.sleep(per_token_s)
+        yield {"model": model, "response": "", "done": True, "done_reason": "stop", **final}
+
+    return await stream_chunks(chunks())
+
+
+@app.post("/api/chat")
+async def chat(request: Request):
+    body = await request.json()
+    failure, load_s = await admit("chat", body)
+    if failure:
+        return failure
+
+    messages = body.get("messages", [])
+    user_messages = [m.get("content", "") for m in messages if m.get("role") == "user"]
+    prompt = user_messages[-1] if user_messages else ""
+    model = body["model"]
+    tokens, final, per_token_s = generation("chat", body, prompt, load_s)
+    # Prompt size is the whole conversation
+    final["prompt_eval_count"] = max(1, sum(len(m.get("content", "")) for m in messages) // 4)
+
+    if not body.get("stream", True):
+        await asyncio.sleep(settings.ttft_s + per_token_s * len(tokens))
+        message = {"role": "assistant", "content": "".join(tokens)}
+        return {"model": model, "message": message, "done": True, "done_reason": "stop", **final}
+
+    async def chunks():
+        await asyncio.sleep(settings.ttft_s)
+        for token in tokens:
+            yield {"model": model, "message": {"role": "assistant", "content": token}, "done": False}
+            await asyncio.sleep(per_token_s)
+        yield {"model": model, "message": {"role": "assistant", "content": ""}, "done": True, "done_reason": "stop", **final}
+
+    return await stream_chunks(chunks())
+
+
+@app.post("/api/embed")
+async def embed_batch(request: Request):
+    body = await request.json()
+    failure, _ = await admit("embed", body)
+    if failure:
+        return failure
+
+    inputs = body.get("input", [])
+    inputs = [inputs] if isinstance(inputs, str) else inputs
+    stats[("embed", body["model"], "ok")] += 1
+    return {"model": body["model"], "embeddings": [embed(text) for text in inputs]}
+
+
+@app.post("/api/embeddings")
+async def embeddings(request: Request):
+    body = await request.json()
+    failure, _ = await admit("embeddings", body)
+    if failure:
+        return failure
+
+    stats[("embeddings", body["model"], "ok")] += 1
+    return {"embedding": embed(body.get("prompt", ""))}
+
+
+@app.get("/mock/config")
+async def get_config():
+    return settings.model_dump()
+
+
+@app.patch("/mock/config")
+async def update_config(changes: Dict[str, Any]):
+    """Change settings at runtime, e.g. {"failure_rate": 0.5} in the middle of a load test."""
+    global settings, canned
+    settings = MockSettings(**{**settings.model_dump(), **changes})
+    rng.seed(settings.seed)
+    canned = load_responses()
+    return settings.model_dump()
+
+
+@app.get("/mock/stats")
+async def get_stats():
+    """Requests so far by endpoint, model and outcome."""
+    return [
+        {"endpoint": endpoint, "model": model, "outcome": outcome, "count": count}
+        for (endpoint, model, outcome), count in sorted(stats.items())
+    ]
+
+
+@app.post("/mock/reset")
+async def reset():
+    """Clear stats and unload all models."""
+    stats.clear()
+    loaded.clear()
+    rng.seed(settings.seed)
+    return {"reset": True}
+
+
+if __name__ == "__main__":
+    import uvicorn
+    uvicorn.run(app, host="127.0.0.1", port=settings.port)
@@ -3,27 +3,34 @@ import json
 from pathlib import Path
 from agent_core.ollama_client import OllamaClient
 from agent_core.context_builder import ContextBuilder
+from agent_core.context_compactor import compact_module, render
 from agent_config import settings
 
 
-async def run_bible_reflector(user_id: int, passage: str) -> dict:
+async def run_bible_reflector(
+    user_id: int,
+    passage: str,
+    *,
+    context_builder: ContextBuilder,
+    ollama: OllamaClient,
+) -> dict:
     """Generate Bible reflection for passage.
 
     Args:
         user_id: User ID
         passage: Bible passage reference (e.g., "John 3:1-21")
+        context_builder: Shared ContextBuilder
+        ollama: Shared OllamaClient
 
     Returns:
         Dict with summary, three_questions, prayer_points
     """
     # Get recent reflections for context
-    context_builder = ContextBuilder()
     context = await context_builder.build_context(
         user_id=user_id,
         window_days=30,
         include_modules=["bible"]
     )
-    await context_builder.close()
 
     recent_reflections = context.get("recent_readings", [])[:5]
 
@@ -34,29 +41,24 @@ async def run_bible_reflector(user_id: int, passage: str) -> dict:
 
     # Substitute
     prompt = prompt_template.replace("{{passage}}", passage)
-    prompt = prompt.replace("{{recent_reflections}}", json.dumps(recent_reflections, indent=2))
+    prompt = prompt.replace("{{recent_reflections}}", render(compact_module("recent_readings", recent_reflections)))
 
     # Call Ollama with creative temperature
-    client = OllamaClient()
+    result = await ollama.generate(
+        prompt=prompt,
+        temperature=settings.creative_temperature,
+        format="json",
+    )
+
+    response_text = result.get("response", "{}")
     try:
-        result = await client.generate(
-            prompt=prompt,
-            temperature=settings.creative_temperature,
-            format="json",
-        )
-
-        response_text = result.get("response", "{}")
-        try:
-            reflection = json.loads(response_text)
-        except json.JSONDecodeError:
-            reflection = {
-                "summary": "Unable to generate summary",
-                "three_questions": [],
-                "prayer_points": [],
-                "error": "Failed to parse agent response"
-            }
-
-        return reflection
-
-    finally:
-        await client.close()
+        reflection = json.loads(response_text)
+    except json.JSONDecodeError:
+        reflection = {
+            "summary": "Unable to generate summary",
+            "three_questions": [],
+            "prayer_points": [],
+            "error": "Failed to parse agent response"
+        }
+
+    return reflection
@@ -1,28 +1,64 @@
 """
 Conversational assistant recipe for general queries and assistance.
+
+Turns belong to a chat session (see agent_core.chat_sessions). The first
+turn sends the user's context summary; follow-ups send only the new
+message and continue from Ollama's context of the previous turn. If the
+model fails on a follow-up, the turn is rebuilt with the context summary
+and history before trying the fallback model.
 """
 from datetime import datetime, timedelta
+from agent_config import settings
+from agent_core.chat_sessions import ChatSession, chat_sessions
+from agent_core.circuit_breaker import OllamaUnavailable
 from agent_core.context_builder import ContextBuilder
 from agent_core.ollama_client import OllamaClient
+from typing import AsyncIterator, Optional
 import json
 
+GREETING = "How can I help you today?"
+
+FOLLOW_UP_PROMPT = """USER MESSAGE: {message}
+
+Respond in 2-4 sentences. Be warm, helpful, and actionable."""
+
+SUMMARY_PROMPT = """Summarize this conversation between the operator and their assistant in at most five sentences.
+Keep facts, decisions and open questions; drop pleasantries.
+
+EARLIER SUMMARY:
+{summary}
+
+CONVERSATION:
+{transcript}
+
+SUMMARY:"""
 
-async def run_chat_assistant(user_id: int, message: str) -> dict:
-    """
-    Run conversational assistant that can help with general queries.
-    Has access to user context and can provide intelligent responses.
-    """
-    if not message:
-        return {"response": "How can I help you today?"}
 
+def history_block(session: Optional[ChatSession]) -> str:
+    """Earlier summary and recent turns, for a prompt that starts a fresh context."""
+    if session is None or not (session.summary or session.turns):
+        return ""
+
+    lines = ["", "CONVERSATION SO FAR:"]
+    if session.summary:
+        lines.append(f"(summary) {session.summary}")
+    lines.extend(f"{turn.role}: {turn.content}" for turn in session.turns)
+    return "\n".join(lines) + "\n"
+
+
+async def build_chat_prompt(
+    user_id: int,
+    message: str,
+    context_builder: ContextBuilder,
+    session: Optional[ChatSession] = None,
+) -> str:
+    """Build the assistant prompt for a message from the user's recent context."""
     # Build comprehensive context
-    context_builder = ContextBuilder()
     context = await context_builder.build_context(
         user_id=user_id,
         window_days=7,
         include_modules=["tasks", "events", "goals", "sleep", "workouts", "meals"]
     )
-    await context_builder.close()
 
     # Build context summary
     tasks = context.get("tasks", [])
@@ -36,7 +72,7 @@ async def run_chat_assistant(user_id: int, message: str) -> dict:
     active_goals = [g.get("title") for g in goals[:3]]
 
     # Build prompt
-    prompt = f"""You are the operator's personal AI assistant. Be helpful, conversational, and reference their data when relevant.
+    return f"""You are the operator's personal AI assistant. Be helpful, conversational, and reference their data when relevant.
 
 CONTEXT:
 - Today: {datetime.utcnow().strftime("%A, %B %d")}
@@ -44,20 +80,174 @@ CONTEXT:
 - Upcoming events today: {today_events}
 - Recent sleep average: {avg_sleep:.1f} hours
 - Active goals: {', '.join(active_goals) if active_goals else 'None'}
-
+{history_block(session)}
 USER MESSAGE: {message}
 
 Respond in 2-4 sentences. Be warm, helpful, and actionable."""
 
-    # Query LLM
-    ollama = OllamaClient()
-    result = await ollama.generate(
-        model="llama3:8b",
-        prompt=prompt,
-        temperature=0.7
-    )
-    await ollama.close()
+
+async def summarize_session(session: ChatSession, ollama: OllamaClient):
+    """Fold all but the most recent turns into the session summary and drop its context."""
+    keep = settings.chat_keep_turns
+    older = session.turns[:-keep] if keep else session.turns
+    if older:
+        result = await ollama.generate(
+            prompt=SUMMARY_PROMPT.format(
+                summary=session.summary or "(none)",
+                transcript="\n".join(f"{turn.role}: {turn.content}" for turn in older),
+            ),
+            temperature=0.2,
+            max_tokens=250,
+        )
+        session.summary = result.get("response", "").strip()
+        session.turns = session.turns[len(older):]
+    session.context = None
+
+
+def turn_model(session: ChatSession, ollama: OllamaClient) -> str:
+    """Model for the session's next turn, as routed; a context from another model is dropped."""
+    model = ollama.route()
+    if session.model != model:
+        # Context tokens are only meaningful to the model that produced them
+        session.context = None
+    return model
+
+
+async def build_turn_prompt(
+    session: ChatSession,
+    message: str,
+    context_builder: ContextBuilder,
+    ollama: OllamaClient,
+) -> str:
+    """Prompt for the next turn: just the message if the session's context can be continued."""
+    if session.context_tokens > settings.chat_summarize_at_tokens:
+        await summarize_session(session, ollama)
+
+    if session.context:
+        return FOLLOW_UP_PROMPT.format(message=message)
+    return await build_chat_prompt(session.user_id, message, context_builder, session)
+
+
+async def generate_turn(
+    session: ChatSession,
+    message: str,
+    model: str,
+    context_builder: ContextBuilder,
+    ollama: OllamaClient,
+) -> dict:
+    """Generate the next turn's reply.
+
+    A follow-up prompt is only the message, so it is not sent to the fallback
+    model (which can't continue the context). If the model fails on it, the
+    turn is rebuilt with the full prompt, which can fall back.
+    """
+    prompt = await build_turn_prompt(session, message, context_builder, ollama)
+    options = {"model": model, "temperature": 0.7, "num_ctx": settings.chat_num_ctx}
+    if not session.context:
+        return await ollama.generate(prompt=prompt, **options)
+
+    try:
+        return await ollama.generate(prompt=prompt, context=session.context, fallback=False, **options)
+    except OllamaUnavailable:
+        raise
+    except Exception:
+        session.context = None
+        prompt = await build_chat_prompt(session.user_id, message, context_builder, session)
+        return await ollama.generate(prompt=prompt, **options)
+
+
+async def stream_turn(
+    session: ChatSession,
+    message: str,
+    model: str,
+    context_builder: ContextBuilder,
+    ollama: OllamaClient,
+) -> AsyncIterator[dict]:
+    """Streaming variant of generate_turn; the full prompt is retried only if nothing was yielded."""
+    prompt = await build_turn_prompt(session, message, context_builder, ollama)
+    options = {"model": model, "temperature": 0.7, "num_ctx": settings.chat_num_ctx}
+    if not session.context:
+        async for chunk in ollama.generate_stream(prompt=prompt, **options):
+            yield chunk
+        return
+
+    yielded = False
+    try:
+        async for chunk in ollama.generate_stream(prompt=prompt, context=session.context, fallback=False, **options):
+            yielded = True
+            yield chunk
+        return
+    except OllamaUnavailable:
+        raise
+    except Exception:
+        if yielded:
+            raise
+
+    session.context = None
+    prompt = await build_chat_prompt(session.user_id, message, context_builder, session)
+    async for chunk in ollama.generate_stream(prompt=prompt, **options):
+        yield chunk
+
+
+async def run_chat_assistant(
+    user_id: int,
+    message: str,
+    session_id: Optional[str] = None,
+    *,
+    context_builder: ContextBuilder,
+    ollama: OllamaClient,
+) -> dict:
+    """
+    Run conversational assistant that can help with general queries.
+    Has access to user context and can provide intelligent responses.
+    Pass the returned session_id back to continue the conversation.
+    """
+    if not message:
+        return {"response": GREETING, "session_id": session_id}
+
+    session = chat_sessions.get_or_create(user_id, session_id)
+    async with session.lock:
+        model = turn_model(session, ollama)
+        result = await generate_turn(session, message, model, context_builder, ollama)
+
+        response = result.get("response", "")
+        # A fallback model's context can't be continued by the primary model
+        context = None if result.get("fallback") else result.get("context")
+        session.record(message, response, context, result.get("model"))
 
     return {
-        "response": result.get("response", "")
+        "response": response,
+        "session_id": session.id,
     }
+
+
+async def stream_chat_assistant(
+    user_id: int,
+    message: str,
+    session_id: Optional[str] = None,
+    *,
+    context_builder: ContextBuilder,
+    ollama: OllamaClient,
+) -> AsyncIterator[dict]:
+    """Streaming variant of run_chat_assistant.
+
+    Yields:
+        Ollama chunks as they arrive ({"response": text delta, "done": ...});
+        the final chunk carries the session_id
+    """
+    if not message:
+        yield {"response": GREETING, "done": True, "session_id": session_id}
+        return
+
+    session = chat_sessions.get_or_create(user_id, session_id)
+    async with session.lock:
+        model = turn_model(session, ollama)
+
+        text = []
+        async for chunk in stream_turn(session, message, model, context_builder, ollama):
+            text.append(chunk.get("response", ""))
+            if chunk.get("done"):
+                context = None if chunk.get("fallback") else chunk.pop("context", None)
+                session.record(message, "".join(text), context, chunk.get("model"))
+                chunk["session_id"] = session.id
+            yield chunk
@@ -9,7 +9,15 @@ from agent_core.context_builder import ContextBuilder
 from agent_core.ollama_client import OllamaClient
 
 
-async def run_code_assistant(user_id: int, message: str, files: Optional[List[str]] = None, operation: Optional[str] = None) -> dict:
+async def run_code_assistant(
+    user_id: int,
+    message: str,
+    files: Optional[List[str]] = None,
+    operation: Optional[str] = None,
+    *,
+    context_builder: ContextBuilder,
+    ollama: OllamaClient,
+) -> dict:
     """
     Run code assistant that can read and write code files.
 
@@ -18,6 +26,8 @@ async def run_code_assistant(user_id: int, message: str, files: Optional[List[st
         message: User's message/request
         files: Optional list of file paths to include in context
         operation: Optional operation type: "read", "write", "modify", "list"
+        context_builder: Shared ContextBuilder
+        ollama: Shared OllamaClient
 
     Returns:
         Dict with response and any code changes
@@ -51,13 +61,11 @@ async def run_code_assistant(user_id: int, message: str, files: Optional[List[st
                     file_contents[file_path] = f"Error reading file: {str(e)}"
 
     # Build context
-    context_builder = ContextBuilder()
     user_context = await context_builder.build_context(
         user_id=user_id,
         window_days=1,
         include_modules=[]
     )
-    await context_builder.close()
 
     # Build prompt based on operation
     if operation == "read":
@@ -91,14 +99,11 @@ USER REQUEST: {message}
 """
 
     # Call LLM
-    ollama = OllamaClient()
     result = await ollama.generate(
-        model="llama3:8b",
         prompt=user_prompt,
         system=system_prompt,
         temperature=0.3 if operation in ["write", "modify"] else 0.5
     )
-    await ollama.close()
 
     response_text = result.get("response", "")
 
@@ -1,27 +1,77 @@
 """Daily digest recipe."""
 import json
+from datetime import datetime
 from pathlib import Path
+from agent_core.circuit_breaker import OllamaUnavailable
 from agent_core.ollama_client import OllamaClient
+from agent_core.result_cache import dated
 from agent_core.context_builder import ContextBuilder
+from agent_core.context_compactor import compact_context, render
 
 
-async def run_daily_digest(user_id: int) -> dict:
+def rule_based_digest(context: dict) -> dict:
+    """Digest computed from the context alone, for when Ollama is down."""
+    today = datetime.utcnow().date().isoformat()
+
+    open_tasks = [t for t in context.get("tasks", []) if t.get("status") in ("todo", "doing")]
+    # Earliest due first (undated last), then highest priority
+    open_tasks.sort(key=lambda t: (t.get("due_ts") or "9999", -(t.get("priority") or 0)))
+    plan = [
+        {
+            "title": task.get("title", ""),
+            "reason": f"Due {task['due_ts'][:10]}" if task.get("due_ts") else f"Priority {task.get('priority') or 0}",
+            "ref_ids": [f"task_{task.get('id')}"],
+        }
+        for task in open_tasks[:5]
+    ]
+
+    events = sorted(
+        (e for e in context.get("events", []) if str(e.get("start_ts", "")).startswith(today)),
+        key=lambda e: e["start_ts"],
+    )
+    conflicts = [
+        {"time": later["start_ts"][11:16], "description": f"{earlier.get('title')} overlaps {later.get('title')}"}
+        for earlier, later in zip(events, events[1:])
+        if later["start_ts"] < earlier.get("end_ts", "")
+    ]
+
+    protein_today = sum(m.get("protein_g") or 0 for m in context.get("meals", []) if str(m.get("dt", "")).startswith(today))
+    sleep = sorted(context.get("sleep", []), key=lambda s: str(s.get("date", "")), reverse=True)
+    sleep_note = f"{sleep[0].get('duration_min', 0) / 60:.1f}h last logged night" if sleep else ""
+
+    return {
+        "plan": plan,
+        "conflicts": conflicts,
+        "blocks": [],
+        "health": {"macro_delta": f"{protein_today}g protein logged today", "workout_suggestion": "", "sleep_note": sleep_note},
+        "bible": {"next_passage": "", "rationale": ""},
+        "journal_prompt": "What are you grateful for today?",
+        "degraded": True,
+    }
+
+
+async def run_daily_digest(
+    user_id: int,
+    *,
+    context_builder: ContextBuilder,
+    ollama: OllamaClient,
+) -> dict:
     """Generate daily digest for user.
 
     Args:
         user_id: User ID
+        context_builder: Shared ContextBuilder
+        ollama: Shared OllamaClient
 
     Returns:
         Dict with plan, conflicts, blocks, health, bible, journal_prompt
     """
     # Build context
-    context_builder = ContextBuilder()
     context = await context_builder.build_context(
         user_id=user_id,
         window_days=7,
         include_modules=["tasks", "events", "habits", "meals", "workouts", "sleep", "journal", "bible"]
     )
-    await context_builder.close()
 
     # Load prompt template
     prompt_path = Path(__file__).parent.parent / "prompts" / "daily_digest.txt"
@@ -30,33 +80,34 @@ async def run_daily_digest(user_id: int) -> dict:
 
     # Substitute context
     prompt = prompt_template.replace("{{window_days}}", str(context["window_days"]))
-    prompt = prompt.replace("{{context_json}}", json.dumps(context, indent=2))
+    prompt = prompt.replace("{{context_json}}", render(compact_context(context)))
 
-    # Call Ollama
-    client = OllamaClient()
+    # Call Ollama (served from cache if these inputs were seen before)
     try:
-        result = await client.generate(
+        result = await ollama.generate_cached(
+            recipe="daily_digest",
+            template=prompt_template,
+            inputs=dated(context),
             prompt=prompt,
             temperature=0.3,
             format="json",
         )
+    except OllamaUnavailable:
+        return rule_based_digest(context)
+
+    response_text = result.get("response", "{}")
+    try:
+        digest = json.loads(response_text)
+    except json.JSONDecodeError:
+        # Fallback if JSON parsing fails
+        digest = {
+            "plan": [],
+            "conflicts": [],
+            "blocks": [],
+            "health": {"macro_delta": "Unable to analyze", "workout_suggestion": "", "sleep_note": ""},
+            "bible": {"next_passage": "", "rationale": ""},
+            "journal_prompt": "What are you grateful for today?",
+            "error": "Failed to parse agent response"
+        }
 
-        response_text = result.get("response", "{}")
-        try:
-            digest = json.loads(response_text)
-        except json.JSONDecodeError:
-            # Fallback if JSON parsing fails
-            digest = {
-                "plan": [],
-                "conflicts": [],
-                "blocks": [],
-                "health": {"macro_delta": "Unable to analyze", "workout_suggestion": "", "sleep_note": ""},
-                "bible": {"next_passage": "", "rationale": ""},
-                "journal_prompt": "What are you grateful for today?",
-                "error": "Failed to parse agent response"
-            }
-
-        return digest
-
-    finally:
-        await client.close()
+    return digest
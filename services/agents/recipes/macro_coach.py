@@ -2,16 +2,44 @@
 import json
 from pathlib import Path
 from datetime import datetime
+from agent_core.circuit_breaker import OllamaUnavailable
 from agent_core.ollama_client import OllamaClient
+from agent_core.result_cache import dated
 from agent_core.context_builder import ContextBuilder
+from agent_core.context_compactor import compact_module, render
 
 
-async def run_macro_coach(user_id: int, targets: dict = None) -> dict:
+def rule_based_coaching(meals: list, targets: dict) -> dict:
+    """Macro gaps computed from the logged meals, without suggestions; for when Ollama is down."""
+    protein = sum(m.get("protein_g") or 0 for m in meals)
+    calories = sum(m.get("calories") or 0 for m in meals)
+    protein_gap = max(0, targets.get("protein_g", 0) - protein)
+
+    warnings = []
+    if calories > targets.get("calories", float("inf")):
+        warnings.append(f"{calories - targets['calories']} kcal over target")
+    return {
+        "protein_gap_g": protein_gap,
+        "suggestions": [],
+        "warnings": warnings,
+        "degraded": True,
+    }
+
+
+async def run_macro_coach(
+    user_id: int,
+    targets: dict = None,
+    *,
+    context_builder: ContextBuilder,
+    ollama: OllamaClient,
+) -> dict:
     """Generate macro coaching suggestions.
 
     Args:
         user_id: User ID
         targets: Dict with protein_g, calories, etc. (defaults if None)
+        context_builder: Shared ContextBuilder
+        ollama: Shared OllamaClient
 
     Returns:
         Dict with protein_gap_g, suggestions, warnings
@@ -26,13 +54,11 @@ async def run_macro_coach(user_id: int, targets: dict = None) -> dict:
         }
 
     # Get today's meals
-    context_builder = ContextBuilder()
     context = await context_builder.build_context(
         user_id=user_id,
         window_days=1,
         include_modules=["meals"]
     )
-    await context_builder.close()
 
     meals_today = context.get("meals", [])
 
@@ -42,30 +68,31 @@ async def run_macro_coach(user_id: int, targets: dict = None) -> dict:
         prompt_template = f.read()
 
     # Substitute
-    prompt = prompt_template.replace("{{meals_json}}", json.dumps(meals_today, indent=2))
+    prompt = prompt_template.replace("{{meals_json}}", render(compact_module("meals", meals_today)))
     prompt = prompt.replace("{{targets_json}}", json.dumps(targets, indent=2))
 
-    # Call Ollama
-    client = OllamaClient()
+    # Call Ollama (served from cache if these inputs were seen before)
     try:
-        result = await client.generate(
+        result = await ollama.generate_cached(
+            recipe="macro_coach",
+            template=prompt_template,
+            inputs=dated({"meals": meals_today, "targets": targets}),
             prompt=prompt,
             temperature=0.3,
             format="json",
         )
+    except OllamaUnavailable:
+        return rule_based_coaching(meals_today, targets)
 
-        response_text = result.get("response", "{}")
-        try:
-            coaching = json.loads(response_text)
-        except json.JSONDecodeError:
-            coaching = {
-                "protein_gap_g": 0,
-                "suggestions": [],
-                "warnings": [],
-                "error": "Failed to parse agent response"
-            }
-
-        return coaching
+    response_text = result.get("response", "{}")
+    try:
+        coaching = json.loads(response_text)
+    except json.JSONDecodeError:
+        coaching = {
+            "protein_gap_g": 0,
+            "suggestions": [],
+            "warnings": [],
+            "error": "Failed to parse agent response"
+        }
 
-    finally:
-        await client.close()
+    return coaching
@@ -4,25 +4,31 @@ from pathlib import Path
 from datetime import datetime, timedelta
 from agent_core.ollama_client import OllamaClient
 from agent_core.context_builder import ContextBuilder
+from agent_core.context_compactor import compact_module, render
 
 
-async def run_next_best_step(user_id: int) -> dict:
+async def run_next_best_step(
+    user_id: int,
+    *,
+    context_builder: ContextBuilder,
+    ollama: OllamaClient,
+) -> dict:
     """Recommend the next best action right now.
 
     Args:
         user_id: User ID
+        context_builder: Shared ContextBuilder
+        ollama: Shared OllamaClient
 
     Returns:
         Dict with action, duration_min, why, refs
     """
     # Build 2-hour context window
-    context_builder = ContextBuilder()
     context = await context_builder.build_context(
         user_id=user_id,
         window_days=1,
         include_modules=["tasks", "events", "goals", "sleep", "workouts"]
     )
-    await context_builder.close()
 
     # Filter to next 2 hours
     now = datetime.utcnow()
@@ -58,31 +64,26 @@ async def run_next_best_step(user_id: int) -> dict:
         prompt_template = f.read()
 
     # Substitute
-    prompt = prompt_template.replace("{{context_2h_window}}", json.dumps(context_2h, indent=2))
-    prompt = prompt.replace("{{goals_today}}", json.dumps(context.get("goals", []), indent=2))
-    prompt = prompt.replace("{{fatigue_signal}}", json.dumps(fatigue_signal, indent=2))
+    prompt = prompt_template.replace("{{context_2h_window}}", render({key: compact_module(key, items) for key, items in context_2h.items()}))
+    prompt = prompt.replace("{{goals_today}}", render(compact_module("goals", context.get("goals", []))))
+    prompt = prompt.replace("{{fatigue_signal}}", render(fatigue_signal))
 
     # Call Ollama
-    client = OllamaClient()
-    try:
-        result = await client.generate(
-            prompt=prompt,
-            temperature=0.3,
-            format="json",
-        )
-
-        response_text = result.get("response", "{}")
-        try:
-            next_step = json.loads(response_text)
-        except json.JSONDecodeError:
-            next_step = {
-                "action": "Take a short break",
-                "duration_min": 10,
-                "why": "Unable to analyze context",
-                "refs": []
-            }
+    result = await ollama.generate(
+        prompt=prompt,
+        temperature=0.3,
+        format="json",
+    )
 
-        return next_step
+    response_text = result.get("response", "{}")
+    try:
+        next_step = json.loads(response_text)
+    except json.JSONDecodeError:
+        next_step = {
+            "action": "Take a short break",
+            "duration_min": 10,
+            "why": "Unable to analyze context",
+            "refs": []
+        }
 
-    finally:
-        await client.close()
+    return next_step
@@ -3,26 +3,33 @@ import json
 from pathlib import Path
 from datetime import datetime
 from agent_core.ollama_client import OllamaClient
+from agent_core.result_cache import dated
 from agent_core.context_builder import ContextBuilder
+from agent_core.context_compactor import compact_module, render
 
 
-async def run_schedule_rebalancer(user_id: int) -> dict:
+async def run_schedule_rebalancer(
+    user_id: int,
+    *,
+    context_builder: ContextBuilder,
+    ollama: OllamaClient,
+) -> dict:
     """Rebalance today's schedule.
 
     Args:
         user_id: User ID
+        context_builder: Shared ContextBuilder
+        ollama: Shared OllamaClient
 
     Returns:
         Dict with blocks, dropped, rationale
     """
     # Get today's events and top tasks
-    context_builder = ContextBuilder()
     context = await context_builder.build_context(
         user_id=user_id,
         window_days=1,
         include_modules=["tasks", "events"]
     )
-    await context_builder.close()
 
     events_today = context.get("events", [])
     tasks = context.get("tasks", [])[:10]  # Top 10 by priority
@@ -33,30 +40,28 @@ async def run_schedule_rebalancer(user_id: int) -> dict:
         prompt_template = f.read()
 
     # Substitute
-    prompt = prompt_template.replace("{{events_json}}", json.dumps(events_today, indent=2))
-    prompt = prompt.replace("{{tasks_json}}", json.dumps(tasks, indent=2))
+    prompt = prompt_template.replace("{{events_json}}", render(compact_module("events", events_today)))
+    prompt = prompt.replace("{{tasks_json}}", render(compact_module("tasks", tasks)))
 
-    # Call Ollama
-    client = OllamaClient()
+    # Call Ollama (served from cache if these inputs were seen before)
+    result = await ollama.generate_cached(
+        recipe="schedule_rebalancer",
+        template=prompt_template,
+        inputs=dated({"events": events_today, "tasks": tasks}),
+        prompt=prompt,
+        temperature=0.3,
+        format="json",
+    )
+
+    response_text = result.get("response", "{}")
     try:
-        result = await client.generate(
-            prompt=prompt,
-            temperature=0.3,
-            format="json",
-        )
-
-        response_text = result.get("response", "{}")
-        try:
-            schedule = json.loads(response_text)
-        except json.JSONDecodeError:
-            schedule = {
-                "blocks": [],
-                "dropped": [],
-                "rationale": "Unable to analyze schedule",
-                "error": "Failed to parse agent response"
-            }
-
-        return schedule
-
-    finally:
-        await client.close()
+        schedule = json.loads(response_text)
+    except json.JSONDecodeError:
+        schedule = {
+            "blocks": [],
+            "dropped": [],
+            "rationale": "Unable to analyze schedule",
+            "error": "Failed to parse agent response"
+        }
+
+    return schedule
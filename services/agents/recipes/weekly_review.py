@@ -2,25 +2,32 @@
 import json
 from pathlib import Path
 from agent_core.ollama_client import OllamaClient
+from agent_core.result_cache import dated
 from agent_core.context_builder import ContextBuilder
+from agent_core.context_compactor import compact_context, render
 
 
-async def run_weekly_review(user_id: int) -> dict:
+async def run_weekly_review(
+    user_id: int,
+    *,
+    context_builder: ContextBuilder,
+    ollama: OllamaClient,
+) -> dict:
     """Generate weekly review for user.
 
     Args:
         user_id: User ID
+        context_builder: Shared ContextBuilder
+        ollama: Shared OllamaClient
 
     Returns:
         Dict with wins, improvements, metrics, goals_checkin, habit_notes
     """
     # Build context for past 7 days
-    context_builder = ContextBuilder()
     context = await context_builder.build_context(
         user_id=user_id,
         window_days=7,
     )
-    await context_builder.close()
 
     # Load prompt template
     prompt_path = Path(__file__).parent.parent / "prompts" / "weekly_review.txt"
@@ -28,31 +35,29 @@ async def run_weekly_review(user_id: int) -> dict:
         prompt_template = f.read()
 
     # Substitute context
-    prompt = prompt_template.replace("{{context_json}}", json.dumps(context, indent=2))
+    prompt = prompt_template.replace("{{context_json}}", render(compact_context(context)))
+
+    # Call Ollama (served from cache if these inputs were seen before)
+    result = await ollama.generate_cached(
+        recipe="weekly_review",
+        template=prompt_template,
+        inputs=dated(context),
+        prompt=prompt,
+        temperature=0.3,
+        format="json",
+    )
 
-    # Call Ollama
-    client = OllamaClient()
+    response_text = result.get("response", "{}")
     try:
-        result = await client.generate(
-            prompt=prompt,
-            temperature=0.3,
-            format="json",
-        )
-
-        response_text = result.get("response", "{}")
-        try:
-            review = json.loads(response_text)
-        except json.JSONDecodeError:
-            review = {
-                "wins": [],
-                "improvements": [],
-                "metrics": {},
-                "goals_checkin": [],
-                "habit_notes": [],
-                "error": "Failed to parse agent response"
-            }
-
-        return review
-
-    finally:
-        await client.close()
+        review = json.loads(response_text)
+    except json.JSONDecodeError:
+        review = {
+            "wins": [],
+            "improvements": [],
+            "metrics": {},
+            "goals_checkin": [],
+            "habit_notes": [],
+            "error": "Failed to parse agent response"
+        }
+
+    return review
@@ -0,0 +1,175 @@
+"""Pooled proxy client for the agent service.
+
+Every /agent request goes through one long-lived ``httpx.AsyncClient``, so
+calls reuse keep-alive connections to the agent service instead of opening
+a new one each time. Each route has a RoutePolicy: upstream timeouts sized
+for Ollama, and an interactive budget. A call that has not started
+responding within its budget is detached into a ProxyJob that keeps running
+in the background, and the caller gets a job handle to poll. Response
+bodies are relayed as raw bytes and never parsed.
+"""
+import asyncio
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Union
+
+import httpx
+
+from app_config import settings
+
+# Finished jobs are kept this long so late pollers can still read them
+FINISHED_JOB_TTL_S = 600
+
+
+@dataclass(frozen=True)
+class RoutePolicy:
+    """How long a proxied route may take."""
+
+    timeout: httpx.Timeout
+    # Detach into a job after this many seconds; None waits for the full timeout
+    budget_s: Optional[float] = None
+
+
+# Streams may sit silent while the model loads; bound the gap between chunks
+STREAM = RoutePolicy(httpx.Timeout(10.0, read=120.0))
+# Single-answer calls (/ask, /next-best-step, actions)
+INTERACTIVE = RoutePolicy(httpx.Timeout(10.0, read=120.0), settings.agent_interactive_budget_s)
+# Digests, reviews and recipes that send large contexts to the model
+BATCH = RoutePolicy(httpx.Timeout(10.0, read=300.0), settings.agent_interactive_budget_s)
+
+
+class ProxyJob:
+    """A proxied call that outlasted its interactive budget."""
+
+    def __init__(self, method: str, path: str):
+        self.id = uuid.uuid4().hex
+        self.method = method
+        self.path = path
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.status_code: Optional[int] = None
+        self.content_type: Optional[str] = None
+        self.body = b""
+        self.error: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def done(self) -> bool:
+        return self.finished_at is not None
+
+    @property
+    def status(self) -> str:
+        if not self.done:
+            return "running"
+        if self.error is not None or self.status_code is None or self.status_code >= 400:
+            return "failed"
+        return "succeeded"
+
+    async def _collect(self, pending: "asyncio.Future[httpx.Response]"):
+        try:
+            response = await pending
+            try:
+                self.body = await response.aread()
+            finally:
+                await response.aclose()
+            self.status_code = response.status_code
+            self.content_type = response.headers.get("content-type")
+        except asyncio.CancelledError:
+            pending.cancel()
+            self.error = "cancelled"
+        except Exception as e:
+            # httpx errors, or anything else (e.g. the client closed underneath us)
+            self.error = str(e) or type(e).__name__
+        finally:
+            self.finished_at = time.time()
+
+    def start(self, pending: "asyncio.Future[httpx.Response]"):
+        self._task = asyncio.create_task(self._collect(pending))
+
+    def cancel(self):
+        if self._task and not self.done:
+            self._task.cancel()
+
+
+class AgentProxy:
+    """Shared connection pool to the agent service plus detached jobs."""
+
+    def __init__(self, base_url: str):
+        self.base_url = base_url
+        self._client: Optional[httpx.AsyncClient] = None
+        self._jobs: Dict[str, ProxyJob] = {}
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                limits=httpx.Limits(
+                    max_connections=settings.agent_max_connections,
+                    max_keepalive_connections=settings.agent_max_keepalive_connections,
+                ),
+            )
+        return self._client
+
+    async def send(
+        self,
+        method: str,
+        path: str,
+        policy: RoutePolicy,
+        json: Any = None,
+        params: Optional[Dict[str, Any]] = None,
+    ) -> Union[httpx.Response, ProxyJob]:
+        """Send a request to the agent service.
+
+        Args:
+            method: HTTP method
+            path: Agent service path
+            policy: Timeouts and interactive budget for this route
+            json: JSON body
+            params: Query parameters
+
+        Returns:
+            The response with its body not yet read (the caller must close
+            it), or a ProxyJob if no response arrived within the budget
+        """
+        request = self.client.build_request(method, path, json=json, params=params, timeout=policy.timeout)
+        pending = asyncio.ensure_future(self.client.send(request, stream=True))
+        if policy.budget_s is None:
+            return await pending
+
+        try:
+            return await asyncio.wait_for(asyncio.shield(pending), policy.budget_s)
+        except asyncio.TimeoutError:
+            self._evict()
+            job = ProxyJob(method, path)
+            job.start(pending)
+            self._jobs[job.id] = job
+            return job
+        except asyncio.CancelledError:
+            # Our caller went away; don't leave the upstream call running
+            pending.cancel()
+            raise
+
+    def get(self, job_id: str) -> Optional[ProxyJob]:
+        return self._jobs.get(job_id)
+
+    def list(self) -> List[ProxyJob]:
+        self._evict()
+        return list(self._jobs.values())
+
+    def _evict(self):
+        cutoff = time.time() - FINISHED_JOB_TTL_S
+        for job_id, job in list(self._jobs.items()):
+            if job.done and job.finished_at < cutoff:
+                del self._jobs[job_id]
+
+    async def close(self):
+        for job in self._jobs.values():
+            job.cancel()
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+proxy = AgentProxy(settings.agent_service_url)
@@ -19,6 +19,24 @@ class Settings(BaseSettings):
     ollama_model: str = "llama3:8b"
     ollama_fallback_model: str = "mistral"
 
+    # Embedding index for retrieval (journal, notes, memory events)
+    embedding_enabled: bool = True
+    embedding_model: str = "nomic-embed-text"
+    embedding_batch_size: int = 16
+    embedding_flush_s: float = 2.0
+    embedding_max_chars: int = 2000  # text embedded per row
+
+    # Agent service proxy (/agent routes)
+    agent_service_url: str = "http://localhost:8001"
+    agent_max_connections: int = 20
+    agent_max_keepalive_connections: int = 10
+    agent_interactive_budget_s: float = 20.0  # slower calls are handed back as a job
+
+    # Terminal sessions
+    terminal_max_sessions: int = 8
+    terminal_idle_timeout_s: float = 1800
+    terminal_buffer_bytes: int = 256 * 1024
+
     # App
     app_timezone: str = "America/Chicago"
     dev_mode: bool = True
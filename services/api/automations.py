@@ -4,12 +4,17 @@ from apscheduler.triggers.cron import CronTrigger
 from datetime import datetime
 import httpx
 import logging
+import time
 from database import SessionLocal
 from models import AutomationRule, AutomationLog
 import json
 
 logger = logging.getLogger(__name__)
 
+# Long-poll interval and overall limit when waiting on agent recipe jobs
+JOB_POLL_WAIT_S = 30
+JOB_WAIT_LIMIT_S = 900
+
 
 class AutomationEngine:
     """Automation engine for running scheduled tasks and rules."""
@@ -166,6 +171,34 @@ class AutomationEngine:
 
         return False
 
+    def run_recipe_job(self, recipe_name: str, user_id: int, params: dict = None) -> dict:
+        """Submit a recipe to the agent job queue and wait for it to finish.
+
+        Runs on a scheduler thread, so it long-polls the job instead of
+        holding one request open for the whole generation.
+
+        Returns:
+            The finished (or, after JOB_WAIT_LIMIT_S, still unfinished) job
+        """
+        response = self.client.post(
+            f"{self.agent_url}/recipes/{recipe_name}/jobs",
+            # Queue behind anything the user is waiting on
+            json={"user_id": user_id, "params": params or {}, "priority": "scheduled"},
+        )
+        response.raise_for_status()
+        job = response.json()
+
+        deadline = time.monotonic() + JOB_WAIT_LIMIT_S
+        while job["status"] in ("queued", "running") and time.monotonic() < deadline:
+            response = self.client.get(
+                f"{self.agent_url}/jobs/{job['job_id']}",
+                params={"wait": JOB_POLL_WAIT_S},
+            )
+            response.raise_for_status()
+            job = response.json()
+
+        return job
+
     def execute_action(self, action: dict, user_id: int) -> dict:
         """Execute an action."""
         action_type = action.get("type")
@@ -175,13 +208,16 @@ class AutomationEngine:
             save_to = action.get("save_to")
 
             try:
-                response = self.client.post(
-                    f"{self.agent_url}/recipes/{recipe_name}",
-                    json={"user_id": user_id, "params": {}},
-                )
-                result = response.json()
-
-                return {"status": "success", "recipe": recipe_name, "result": result}
+                job = self.run_recipe_job(recipe_name, user_id)
+                if job["status"] != "succeeded":
+                    return {
+                        "status": "error",
+                        "recipe": recipe_name,
+                        "job_id": job["job_id"],
+                        "message": job.get("error") or f"job {job['status']}",
+                    }
+
+                return {"status": "success", "recipe": recipe_name, "job_id": job["job_id"], "result": job["result"]}
 
             except Exception as e:
                 logger.error(f"Error running recipe {recipe_name}: {e}")
@@ -0,0 +1,392 @@
+"""Local embedding index over journal entries, notes and memory events.
+
+Texts are embedded with Ollama's ``/api/embed`` endpoint, in batches, and
+kept as one unit-normalized float16 matrix. The matrix is saved beside the
+SQLite database as ``<db>.embeddings.npy``, with row keys and content
+hashes in ``<db>.embeddings.json``. Searching is a single matrix-vector
+product (cosine similarity) filtered to the user.
+
+ORM writes to the indexed tables mark rows dirty, and a background task
+re-embeds them every ``embedding_flush_s``. Writes that bypass the ORM
+(seed scripts, bulk deletes) are reconciled by content hash on startup.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+import httpx
+import numpy as np
+from sqlalchemy import event
+from sqlalchemy.orm import object_session
+from app_config import settings
+from database import SessionLocal
+from models import JournalEntry, MemoryEvent, Note
+
+logger = logging.getLogger(__name__)
+
+# Longest wait between retries while updates keep failing
+MAX_RETRY_S = 300
+
+
+@dataclass(frozen=True)
+class Source:
+    model: Any
+    text: Callable[[Any], str]
+    title: Callable[[Any], Optional[str]]
+    dt: Callable[[Any], Any]
+
+
+def _join(*parts: Optional[str]) -> str:
+    return "\n".join(part for part in parts if part)
+
+
+# Indexed kinds; keys in the index are "<kind>:<row id>"
+SOURCES: Dict[str, Source] = {
+    "journal": Source(
+        JournalEntry,
+        text=lambda row: _join(row.title, row.content_md, row.tags),
+        title=lambda row: row.title,
+        dt=lambda row: row.dt,
+    ),
+    "notes": Source(
+        Note,
+        text=lambda row: _join(row.title, row.content_md, row.tags),
+        title=lambda row: row.title,
+        dt=lambda row: row.updated_at or row.created_at,
+    ),
+    "memory": Source(
+        MemoryEvent,
+        text=lambda row: f"Q: {row.question}\nA: {row.answer}",
+        title=lambda row: row.question,
+        dt=lambda row: row.created_at,
+    ),
+}
+
+
+def index_key(kind: str, row_id: int) -> str:
+    return f"{kind}:{row_id}"
+
+
+def split_key(key: str) -> Tuple[str, int]:
+    kind, row_id = key.split(":", 1)
+    return kind, int(row_id)
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()[:16]
+
+
+def index_path() -> Path:
+    """Path prefix for the index files, beside the SQLite database."""
+    prefix = "sqlite:///"
+    if settings.database_url.startswith(prefix):
+        db_path = Path(settings.database_url[len(prefix):])
+        return db_path.with_name(db_path.stem + ".embeddings")
+    return Path("juliusos.embeddings")
+
+
+class IndexNotReady(RuntimeError):
+    """Search before anything was embedded, so an empty result would be misleading."""
+
+
+class EmbeddingIndex:
+    """Float16 embedding matrix with incremental, batched updates."""
+
+    def __init__(self, path: Path, model: str, batch_size: int, flush_s: float):
+        self.path = path
+        self.model = model
+        self.batch_size = max(1, batch_size)
+        self.flush_s = flush_s
+        self.keys: List[str] = []
+        self.user_ids = np.zeros(0, dtype=np.int32)
+        self.hashes: List[str] = []
+        self.matrix: Optional[np.ndarray] = None  # (n, dim) float16, rows unit-normalized
+        self._rows: Dict[str, int] = {}
+        # Marked from ORM events, which fire on request threads
+        self._dirty: Set[str] = set()
+        self._dirty_lock = threading.Lock()
+        self._synced = False  # a full sync with the database has succeeded
+        self._listening = False
+        self._client: Optional[httpx.AsyncClient] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    @property
+    def running(self) -> bool:
+        return self._client is not None
+
+    @property
+    def ready(self) -> bool:
+        """Whether search results reflect the data: an index was loaded or a full sync succeeded."""
+        return self.matrix is not None or self._synced
+
+    # Persistence
+
+    def _files(self) -> Tuple[Path, Path]:
+        """(metadata, matrix) file paths."""
+        return self.path.with_name(self.path.name + ".json"), self.path.with_name(self.path.name + ".npy")
+
+    def load(self):
+        """Read the saved index; an index built with another model is discarded."""
+        meta_path, matrix_path = self._files()
+        if not (meta_path.exists() and matrix_path.exists()):
+            return
+        try:
+            meta = json.loads(meta_path.read_text())
+            matrix = np.load(matrix_path)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable embedding index {self.path}: {e}")
+            return
+        if meta.get("model") != self.model or len(meta["keys"]) != len(matrix):
+            return
+
+        self.keys, self.hashes = meta["keys"], meta["hashes"]
+        self.user_ids = np.asarray(meta["user_ids"], dtype=np.int32)
+        self.matrix = matrix.astype(np.float16, copy=False)
+        self._rows = {key: i for i, key in enumerate(self.keys)}
+
+    def save(self):
+        """Write the index atomically (temp file, then rename)."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        meta_path, matrix_path = self._files()
+        matrix = self.matrix if self.matrix is not None else np.zeros((0, 0), dtype=np.float16)
+
+        tmp_matrix = matrix_path.with_name(matrix_path.name + ".tmp")
+        with open(tmp_matrix, "wb") as f:
+            np.save(f, matrix)
+        tmp_meta = meta_path.with_name(meta_path.name + ".tmp")
+        tmp_meta.write_text(json.dumps({
+            "model": self.model,
+            "keys": self.keys,
+            "hashes": self.hashes,
+            "user_ids": self.user_ids.tolist(),
+        }))
+        os.replace(tmp_matrix, matrix_path)
+        os.replace(tmp_meta, meta_path)
+
+    # Updates
+
+    def mark_dirty(self, kind: str, row_id: int):
+        with self._dirty_lock:
+            self._dirty.add(index_key(kind, row_id))
+
+    def _take_dirty(self) -> List[str]:
+        with self._dirty_lock:
+            keys = sorted(self._dirty)
+            self._dirty.clear()
+        return keys
+
+    def _remove(self, keys: Iterable[str]):
+        drop = {self._rows[key] for key in keys if key in self._rows}
+        if not drop:
+            return
+        keep = [i for i in range(len(self.keys)) if i not in drop]
+        self.keys = [self.keys[i] for i in keep]
+        self.hashes = [self.hashes[i] for i in keep]
+        self.user_ids = self.user_ids[keep]
+        self.matrix = self.matrix[keep]
+        self._rows = {key: i for i, key in enumerate(self.keys)}
+
+    def _upsert(self, keys: List[str], user_ids: List[int], hashes: List[str], vectors: np.ndarray):
+        vectors = vectors.astype(np.float16)
+        if self.matrix is None or self.matrix.shape[1] != vectors.shape[1]:
+            # First batch, or the model's dimension changed: start over and re-embed the rest
+            for key in self.keys:
+                self.mark_dirty(*split_key(key))
+            self.keys, self.hashes = [], []
+            self.user_ids = np.zeros(0, dtype=np.int32)
+            self.matrix = np.zeros((0, vectors.shape[1]), dtype=np.float16)
+            self._rows = {}
+
+        new = []
+        for key, user_id, digest, vector in zip(keys, user_ids, hashes, vectors):
+            row = self._rows.get(key)
+            if row is None:
+                new.append((key, user_id, digest, vector))
+            else:
+                self.matrix[row] = vector
+                self.user_ids[row] = user_id
+                self.hashes[row] = digest
+
+        if new:
+            self._rows.update({key: len(self.keys) + i for i, (key, _, _, _) in enumerate(new)})
+            self.keys.extend(key for key, _, _, _ in new)
+            self.hashes.extend(digest for _, _, digest, _ in new)
+            self.user_ids = np.concatenate([self.user_ids, np.asarray([u for _, u, _, _ in new], dtype=np.int32)])
+            self.matrix = np.vstack([self.matrix, np.stack([v for _, _, _, v in new])])
+
+    async def embed(self, texts: List[str]) -> np.ndarray:
+        """Unit-normalized float32 embeddings, one row per text."""
+        vectors = []
+        for start in range(0, len(texts), self.batch_size):
+            response = await self._client.post(
+                "/api/embed",
+                json={"model": self.model, "input": texts[start:start + self.batch_size]},
+            )
+            response.raise_for_status()
+            vectors.extend(response.json()["embeddings"])
+
+        matrix = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix / np.maximum(norms, 1e-12)
+
+    def _read_rows(self, keys: Optional[List[str]] = None) -> Dict[str, Tuple[int, str]]:
+        """Current {key: (user_id, text)} for ``keys``, or for every indexed row."""
+        rows = {}
+        max_chars = settings.embedding_max_chars
+        with SessionLocal() as db:
+            for kind, source in SOURCES.items():
+                query = db.query(source.model)
+                if keys is not None:
+                    ids = [row_id for k, row_id in map(split_key, keys) if k == kind]
+                    if not ids:
+                        continue
+                    query = query.filter(source.model.id.in_(ids))
+                for row in query:
+                    rows[index_key(kind, row.id)] = (row.user_id, source.text(row)[:max_chars])
+        return rows
+
+    async def _apply(self, rows: Dict[str, Tuple[int, str]], removed: Iterable[str]):
+        """Embed changed rows and drop removed ones, then save."""
+        removed = list(removed)
+        changed = [
+            key for key, (_, text) in rows.items()
+            if key not in self._rows or self.hashes[self._rows[key]] != content_hash(text)
+        ]
+        if changed:
+            vectors = await self.embed([rows[key][1] for key in changed])
+            self._upsert(
+                changed,
+                [rows[key][0] for key in changed],
+                [content_hash(rows[key][1]) for key in changed],
+                vectors,
+            )
+        self._remove(removed)
+        if changed or removed:
+            self.save()
+            logger.info(f"Embedding index: {len(changed)} embedded, {len(removed)} removed, {len(self)} total")
+
+    async def sync_all(self):
+        """Reconcile the whole index with the database."""
+        rows = await asyncio.to_thread(self._read_rows)
+        await self._apply(rows, [key for key in self.keys if key not in rows])
+        self._synced = True
+
+    async def flush(self):
+        """Re-embed rows marked dirty since the last flush."""
+        keys = self._take_dirty()
+        if not keys:
+            return
+        try:
+            rows = await asyncio.to_thread(self._read_rows, keys)
+            await self._apply(rows, [key for key in keys if key not in rows])
+        except Exception:
+            # Ollama unavailable or the model missing; retry on the next flush
+            with self._dirty_lock:
+                self._dirty.update(keys)
+            raise
+
+    async def _run(self):
+        delay = self.flush_s
+        model_missing = False
+        while True:
+            try:
+                # Retry the full sync until it succeeds (e.g. the model not pulled yet)
+                await (self.flush() if self._synced else self.sync_all())
+                delay = self.flush_s
+                model_missing = False
+            except Exception as e:
+                missing = isinstance(e, httpx.HTTPStatusError) and e.response.status_code == 404
+                if missing and not model_missing:
+                    logger.warning(
+                        f"Embedding model {self.model} is not installed; retrieval is off until it is "
+                        f"(ollama pull {self.model})"
+                    )
+                elif not missing:
+                    logger.warning(f"Embedding index update failed: {e}")
+                model_missing = missing
+                # Back off so a missing model or a down Ollama isn't hit every few seconds
+                delay = min(delay * 2, MAX_RETRY_S)
+            await asyncio.sleep(delay)
+
+    def start(self):
+        """Load the saved index and start syncing in the background."""
+        if not self._listening:
+            _register_listeners(self)
+            self._listening = True
+        self._client = httpx.AsyncClient(base_url=settings.ollama_url, timeout=60.0)
+        self.load()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._client:
+            await self._client.aclose()
+            self._client = None
+
+    # Retrieval
+
+    async def search(self, user_id: int, query: str, k: int, kinds: Optional[List[str]] = None) -> List[Tuple[str, float]]:
+        """Top-``k`` (key, cosine similarity) for ``query`` among the user's rows.
+
+        Raises:
+            IndexNotReady: Nothing has been embedded yet and the first sync has not finished
+        """
+        if not self.ready:
+            raise IndexNotReady("Embedding index is not built yet")
+        if self.matrix is None or not len(self.keys):
+            return []
+
+        vector = (await self.embed([query]))[0]
+        scores = self.matrix.astype(np.float32) @ vector
+
+        mask = self.user_ids == user_id
+        if kinds:
+            mask &= np.asarray([split_key(key)[0] in kinds for key in self.keys])
+        candidates = np.flatnonzero(mask)
+        if not len(candidates):
+            return []
+
+        k = min(k, len(candidates))
+        top = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(self.keys[i], float(scores[i])) for i in top]
+
+
+index = EmbeddingIndex(
+    index_path(),
+    model=settings.embedding_model,
+    batch_size=settings.embedding_batch_size,
+    flush_s=settings.embedding_flush_s,
+)
+
+
+def _register_listeners(index: EmbeddingIndex):
+    """Mark rows dirty on ORM writes; rows written in a session are handed to the index once it commits."""
+    for kind, source in SOURCES.items():
+        def track(mapper, connection, target, kind=kind):
+            session = object_session(target)
+            if session is not None:
+                session.info.setdefault("embedding_dirty", set()).add((kind, target.id))
+
+        for name in ("after_insert", "after_update", "after_delete"):
+            event.listen(source.model, name, track)
+
+    @event.listens_for(SessionLocal, "after_commit")
+    def after_commit(session):
+        for kind, row_id in session.info.pop("embedding_dirty", ()):
+            index.mark_dirty(kind, row_id)
+
+    @event.listens_for(SessionLocal, "after_rollback")
+    def after_rollback(session):
+        session.info.pop("embedding_dirty", None)
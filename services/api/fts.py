@@ -0,0 +1,82 @@
+"""SQLite FTS5 full-text indexes.
+
+Each indexed table gets an external-content FTS5 table named
+``<table>_fts`` whose rowid is the source row id. Triggers on the source
+table keep the index in sync, so writes through the ORM, raw SQL and seed
+scripts are all picked up without any application code.
+"""
+import re
+from typing import Dict, List, Optional
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+# Source table -> indexed text columns
+FTS_INDEXES: Dict[str, List[str]] = {
+    "notes": ["title", "content_md", "tags"],
+    "emails": ["subject", "body", "from_addr", "to_addr"],
+}
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def fts_table(table: str) -> str:
+    """Name of the FTS5 table mirroring ``table``."""
+    return f"{table}_fts"
+
+
+def _ddl(table: str, columns: List[str]) -> List[str]:
+    fts = fts_table(table)
+    cols = ", ".join(columns)
+    new_vals = ", ".join(f"new.{c}" for c in columns)
+    old_vals = ", ".join(f"old.{c}" for c in columns)
+
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+        f"{cols}, content='{table}', content_rowid='id', "
+        f"tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN "
+        f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new_vals}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old_vals}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {cols} ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old_vals}); "
+        f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new_vals}); END",
+    ]
+
+
+def create_fts_indexes(engine: Engine):
+    """Create missing FTS tables and triggers, backfilling new indexes.
+
+    Safe to call on every startup; existing indexes are left untouched.
+    """
+    with engine.begin() as conn:
+        for table, columns in FTS_INDEXES.items():
+            exists = conn.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+                {"name": fts_table(table)},
+            ).first()
+
+            for statement in _ddl(table, columns):
+                conn.execute(text(statement))
+
+            if not exists:
+                fts = fts_table(table)
+                conn.execute(text(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')"))
+
+
+def match_query(search: str) -> Optional[str]:
+    """Turn free text into a safe FTS5 MATCH expression.
+
+    Every word becomes a quoted prefix term and all terms must match, so
+    user input can never produce an FTS syntax error.
+
+    Args:
+        search: Text typed by the user
+
+    Returns:
+        MATCH expression, or None when the text contains no searchable words
+    """
+    tokens = _TOKEN_RE.findall(search)
+    if not tokens:
+        return None
+    return " ".join(f'"{token}"*' for token in tokens)
@@ -1,22 +1,42 @@
 """Main FastAPI application for JuliusOS."""
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from database import engine, Base
 from app_config import settings
+from pagination import NEXT_CURSOR_HEADER
+from fts import create_fts_indexes
+from agent_proxy import proxy as agent_proxy
+from embeddings import index as embedding_index
 from routers import (
     health, settings as settings_router, calendar, tasks, habits,
     meals, workouts, sleep, projects, skills, journal, notes,
     bible, finances, contacts, routines, goals, automations, agent,
-    skin, profile, relationships, files, terminal, calendar_events, emails
+    skin, profile, relationships, files, terminal, calendar_events, emails,
+    context
 )
 
 # Create database tables
 Base.metadata.create_all(bind=engine)
+create_fts_indexes(engine)
+emails.import_json_emails()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.embedding_enabled:
+        embedding_index.start()
+    yield
+    await embedding_index.stop()
+    # Release the pooled connections to the agent service
+    await agent_proxy.close()
+
 
 app = FastAPI(
     title="JuliOS API",
     description="Local-first life operating system API",
     version="2.0.0",
+    lifespan=lifespan,
 )
 
 # CORS middleware for local development
@@ -26,6 +46,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
 # Include routers
@@ -55,6 +76,7 @@ app.include_router(files.router, prefix="/files", tags=["files"])
 app.include_router(terminal.router, prefix="/terminal", tags=["terminal"])
 app.include_router(calendar_events.router, prefix="/calendar-events", tags=["calendar-events"])
 app.include_router(emails.router, prefix="/emails", tags=["emails"])
+app.include_router(context.router, prefix="/context", tags=["context"])
 
 
 if __name__ == "__main__":
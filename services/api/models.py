@@ -1,7 +1,7 @@
 """SQLAlchemy models for JuliusOS."""
 from datetime import datetime
 from sqlalchemy import (
-    Boolean, Column, Integer, String, Text, DateTime,
+    BigInteger, Boolean, Column, Integer, String, Text, DateTime,
     ForeignKey, Index, JSON
 )
 from sqlalchemy.orm import relationship
@@ -689,3 +689,24 @@ class OnboardingProgress(Base):
     monthly_checkin_last = Column(DateTime, nullable=True)
 
     user = relationship("User", backref="onboarding_progress", uselist=False)
+
+
+# Email
+class EmailMessage(Base):
+    __tablename__ = "emails"
+
+    id = Column(Integer, primary_key=True, index=True)
+    from_addr = Column(String(255), nullable=False)
+    to_addr = Column(Text, nullable=False)
+    subject = Column(Text, nullable=False, default="")
+    body = Column(Text, nullable=False, default="")
+    timestamp = Column(BigInteger, nullable=False)  # epoch milliseconds
+    folder = Column(String(20), nullable=False, default="inbox")  # inbox, sent, drafts, trash
+    unread = Column(Boolean, nullable=False, default=False)
+    starred = Column(Boolean, nullable=False, default=False)
+
+    __table_args__ = (
+        Index("idx_emails_folder_timestamp", "folder", "timestamp"),
+        Index("idx_emails_unread_folder", "unread", "folder"),
+        Index("idx_emails_starred_timestamp", "starred", "timestamp"),
+    )
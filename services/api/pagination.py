@@ -0,0 +1,119 @@
+"""Keyset pagination for list endpoints.
+
+List routes keep returning a plain JSON array. When a page is cut short the
+opaque cursor for the next page is sent in the ``X-Next-Cursor`` response
+header; pass it back as ``?cursor=`` to continue after the last row.
+Paging is opt-in: without ``?limit=`` a route returns every row, because the
+desktop clients don't read the cursor header.
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional
+from fastapi import HTTPException, Response
+from sqlalchemy import and_, or_, false
+from sqlalchemy.orm import Query
+from sqlalchemy.sql import operators
+from sqlalchemy.sql.elements import UnaryExpression
+
+MAX_PAGE_SIZE = 500
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(values: List[Any]) -> str:
+    """Encode the sort-key values of the last row into an opaque cursor."""
+    payload = [{"dt": v.isoformat()} if isinstance(v, datetime) else v for v in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> List[Any]:
+    """Decode a cursor produced by encode_cursor."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        values = [
+            datetime.fromisoformat(v["dt"]) if isinstance(v, dict) else v
+            for v in payload
+        ]
+    except (ValueError, TypeError, KeyError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    if len(values) != size:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+
+def _split_key(key):
+    """Return (column, descending) for a column or column.asc()/.desc()."""
+    if isinstance(key, UnaryExpression) and key.modifier in (operators.desc_op, operators.asc_op):
+        return key.element, key.modifier is operators.desc_op
+    return key, False
+
+
+def _equals(column, value):
+    return column.is_(None) if value is None else column == value
+
+
+def _beyond(column, descending: bool, value):
+    """Rows strictly after ``value`` in the sort order (SQLite sorts NULL first)."""
+    if value is None:
+        return None if descending else column.isnot(None)
+    if descending:
+        return or_(column < value, column.is_(None))
+    return column > value
+
+
+def _after(keys, values):
+    """Row-value comparison ``(k1, k2, ...) > (v1, v2, ...)`` honouring each key's direction."""
+    clauses = []
+    for i, (column, descending) in enumerate(keys):
+        beyond = _beyond(column, descending, values[i])
+        if beyond is None:
+            continue
+        prefix = [_equals(c, v) for (c, _), v in zip(keys[:i], values[:i])]
+        clauses.append(and_(*prefix, beyond))
+    return or_(*clauses) if clauses else false()
+
+
+def paginate(
+    query: Query,
+    response: Response,
+    limit: Optional[int],
+    cursor: Optional[str],
+    *order_by,
+) -> list:
+    """Apply ordering and keyset pagination to a query.
+
+    Args:
+        query: Filtered query for the rows to list
+        response: Response to receive the next-page cursor header
+        limit: Page size (None = no limit, capped at MAX_PAGE_SIZE)
+        cursor: Cursor from a previous page's X-Next-Cursor header
+        order_by: Sort keys, e.g. ``Meal.dt.desc(), Meal.id.desc()``;
+            the last key must be unique so the order is total
+
+    Returns:
+        List of rows for the requested page
+    """
+    keys = [_split_key(key) for key in order_by]
+
+    if cursor:
+        query = query.filter(_after(keys, decode_cursor(cursor, len(keys))))
+
+    query = query.order_by(*order_by)
+
+    if limit is None:
+        return query.all()
+
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    rows = query.limit(limit + 1).all()
+
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(
+            [getattr(last, column.key) for column, _ in keys]
+        )
+
+    return rows
@@ -0,0 +1,337 @@
+"""Pool of long-lived PTY-backed shell sessions for the terminal router.
+
+Each session is an interactive shell on a pseudo-terminal, so ``cd``,
+exported variables and shell startup survive between commands. Output is
+kept in a ring buffer addressed by absolute byte offsets, which lets a
+client that reconnects ask for everything since the last offset it saw.
+The pool caps the number of sessions (evicting the least recently used
+one without attached clients) and closes sessions that have been idle for
+too long.
+"""
+import asyncio
+import codecs
+import fcntl
+import os
+import re
+import shlex
+import signal
+import struct
+import subprocess
+import termios
+import time
+import uuid
+from collections import deque
+from typing import Deque, Dict, List, Optional, Set, Tuple
+
+from app_config import settings
+
+SHELL = os.environ.get("SHELL") or "/bin/sh"
+if not os.path.exists(SHELL):
+    SHELL = "/bin/sh"
+READ_SIZE = 65536
+REAPER_INTERVAL_S = 60
+# After SIGHUP, how long a shell gets to exit (polled) before SIGKILL
+CLOSE_GRACE_S = 1.0
+CLOSE_POLL_S = 0.05
+
+
+class SessionClosed(Exception):
+    """The session's shell exited."""
+
+
+class SessionLimitReached(Exception):
+    """Every session slot is taken by a session with attached clients."""
+
+
+def _make_controlling_tty():
+    # Runs in the child after setsid(): adopt the PTY on stdin as our tty
+    fcntl.ioctl(0, termios.TIOCSCTTY, 0)
+
+
+class ShellSession:
+    """One interactive shell running on a PTY."""
+
+    def __init__(self, session_id: str, cwd: str, rows: int, cols: int, buffer_size: int):
+        self.id = session_id
+        self.cwd = cwd
+        self.rows = rows
+        self.cols = cols
+        self.created_at = time.time()
+        self.last_active = self.created_at
+        self.exit_code: Optional[int] = None
+        self.exec_lock = asyncio.Lock()
+        self._buffer: Deque[bytes] = deque()
+        self._buffer_bytes = 0
+        self._buffer_size = buffer_size
+        self._offset = 0
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._master: Optional[int] = None
+        self._process: Optional[subprocess.Popen] = None
+
+    @property
+    def alive(self) -> bool:
+        return self._process is not None and self.exit_code is None
+
+    @property
+    def offset(self) -> int:
+        """Total number of output bytes produced so far."""
+        return self._offset
+
+    @property
+    def attached(self) -> int:
+        return len(self._subscribers)
+
+    def start(self):
+        master, slave = os.openpty()
+        env = {
+            **os.environ,
+            "TERM": "xterm-256color",
+            # Commands sent by exec() start with a space and stay out of history
+            "HISTCONTROL": "ignoreboth",
+        }
+        try:
+            self._process = subprocess.Popen(
+                [SHELL, "-i"],
+                stdin=slave,
+                stdout=slave,
+                stderr=slave,
+                cwd=self.cwd,
+                env=env,
+                start_new_session=True,
+                preexec_fn=_make_controlling_tty,
+            )
+        finally:
+            os.close(slave)
+
+        self._master = master
+        os.set_blocking(master, False)
+        self.resize(self.rows, self.cols)
+        asyncio.get_running_loop().add_reader(master, self._on_readable)
+
+    def _on_readable(self):
+        try:
+            data = os.read(self._master, READ_SIZE)
+        except OSError:
+            # EIO once the shell has exited and the slave side is closed
+            data = b""
+
+        if not data:
+            self._on_exit()
+            return
+
+        self.last_active = time.time()
+        self._buffer.append(data)
+        self._buffer_bytes += len(data)
+        self._offset += len(data)
+        while self._buffer_bytes > self._buffer_size and len(self._buffer) > 1:
+            self._buffer_bytes -= len(self._buffer.popleft())
+
+        for queue in self._subscribers:
+            queue.put_nowait(data)
+
+    def _on_exit(self):
+        asyncio.get_running_loop().remove_reader(self._master)
+        os.close(self._master)
+        if self._process.poll() is None:
+            # Slave side closed but the shell lingers; don't block the loop on it
+            os.killpg(self._process.pid, signal.SIGKILL)
+        self.exit_code = self._process.wait()
+        for queue in self._subscribers:
+            queue.put_nowait(None)
+
+    def backlog(self, since: Optional[int] = None) -> Tuple[int, bytes]:
+        """Buffered output from ``since`` (or the oldest byte still kept).
+
+        Returns:
+            (offset of the first returned byte, data)
+        """
+        start = self._offset - self._buffer_bytes
+        data = b"".join(self._buffer)
+        if since is not None and since > start:
+            data = data[since - start:]
+            start = min(since, self._offset)
+        return start, data
+
+    def subscribe(self) -> asyncio.Queue:
+        """Receive every new output chunk; None marks the shell exiting."""
+        queue: asyncio.Queue = asyncio.Queue()
+        self._subscribers.add(queue)
+        if not self.alive:
+            queue.put_nowait(None)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        self._subscribers.discard(queue)
+        self.last_active = time.time()
+
+    def write(self, data: str):
+        if not self.alive:
+            raise SessionClosed(self.id)
+        self.last_active = time.time()
+        os.write(self._master, data.encode())
+
+    def resize(self, rows: int, cols: int):
+        self.rows, self.cols = rows, cols
+        fcntl.ioctl(self._master, termios.TIOCSWINSZ, struct.pack("HHHH", rows, cols, 0, 0))
+        if self.alive:
+            os.killpg(self._process.pid, signal.SIGWINCH)
+
+    async def exec(self, command: str, timeout: Optional[float] = None, cwd: Optional[str] = None) -> Tuple[str, int, str]:
+        """Run a command in the shell and collect its output.
+
+        The command is bracketed by marker lines printed by the shell itself,
+        so its output, exit status and the resulting working directory can be
+        told apart from prompts and echoed input. On timeout the command is
+        interrupted with Ctrl-C and the session stays usable.
+
+        Returns:
+            (output, exit_code, cwd)
+        """
+        async with self.exec_lock:
+            token = uuid.uuid4().hex[:12]
+            begin = re.compile(rf"__JOS_BEGIN_{token}\r?\n")
+            end = re.compile(rf"__JOS_END_{token}:(-?\d+):(.*?)\r?\n")
+            body = shlex.quote(command)
+            if cwd:
+                body = f"cd -- {shlex.quote(cwd)} && eval {body}"
+            else:
+                body = f"eval {body}"
+            line = (
+                f" printf '%s%s\\n' __JOS_BEGIN_ {token}; {body};"
+                f" printf '%s%s:%s:%s\\n' __JOS_END_ {token} \"$?\" \"$PWD\"\n"
+            )
+
+            queue = self.subscribe()
+            decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+            text = ""
+            started = None
+            # Markers may straddle chunks; rescan only this much of the old text
+            overlap = 512
+            try:
+                self.write(line)
+                deadline = None if timeout is None else time.monotonic() + timeout
+                while True:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        raise asyncio.TimeoutError()
+                    chunk = await asyncio.wait_for(queue.get(), remaining)
+                    if chunk is None:
+                        raise SessionClosed(self.id)
+                    scan_from = max(len(text) - overlap, 0)
+                    text += decoder.decode(chunk)
+                    if started is None:
+                        started = begin.search(text, scan_from)
+                        if started is None:
+                            continue
+                        scan_from = started.end()
+                    finished = end.search(text, max(scan_from, started.end()))
+                    if finished:
+                        break
+            except asyncio.TimeoutError:
+                if self.alive:
+                    self.write("\x03")
+                raise
+            finally:
+                self.unsubscribe(queue)
+
+            output = text[started.end():finished.start()].replace("\r\n", "\n")
+            self.cwd = finished.group(2)
+            return output, int(finished.group(1)), self.cwd
+
+    async def close(self):
+        """Hang up the shell, killing it if it hasn't exited within CLOSE_GRACE_S."""
+        if not self.alive:
+            return
+        try:
+            os.killpg(self._process.pid, signal.SIGHUP)
+        except ProcessLookupError:
+            pass
+        # Poll rather than wait(), which would block the event loop
+        deadline = time.monotonic() + CLOSE_GRACE_S
+        while self._process.poll() is None and time.monotonic() < deadline:
+            await asyncio.sleep(CLOSE_POLL_S)
+        # The reader may have seen the exit while we slept
+        if self.alive:
+            self._on_exit()
+
+
+class ShellSessionPool:
+    """Shell sessions keyed by session id."""
+
+    def __init__(self, max_sessions: int, idle_timeout_s: float, buffer_size: int):
+        self.max_sessions = max_sessions
+        self.idle_timeout_s = idle_timeout_s
+        self.buffer_size = buffer_size
+        self._sessions: Dict[str, ShellSession] = {}
+        self._reaper: Optional[asyncio.Task] = None
+
+    def get(self, session_id: str) -> Optional[ShellSession]:
+        session = self._sessions.get(session_id)
+        if session and not session.alive:
+            del self._sessions[session_id]
+            return None
+        return session
+
+    async def list(self) -> List[ShellSession]:
+        await self.evict_idle()
+        return list(self._sessions.values())
+
+    async def open(self, session_id: Optional[str] = None, cwd: Optional[str] = None,
+                   rows: int = 24, cols: int = 80) -> ShellSession:
+        """Return the live session ``session_id``, starting it if needed.
+
+        Raises:
+            SessionLimitReached: The pool is full and every session has attached clients
+        """
+        self._ensure_reaper()
+        session = self.get(session_id) if session_id else None
+        if session:
+            return session
+
+        await self.evict_idle()
+        while len(self._sessions) >= self.max_sessions:
+            # Sessions with a terminal attached or a command running are never evicted
+            detached = [s for s in self._sessions.values() if s.attached == 0]
+            if not detached:
+                raise SessionLimitReached(self.max_sessions)
+            lru = min(detached, key=lambda s: s.last_active)
+            await self.close(lru.id)
+
+        session = ShellSession(
+            session_id or uuid.uuid4().hex,
+            cwd or os.path.expanduser("~"),
+            rows, cols, self.buffer_size,
+        )
+        session.start()
+        self._sessions[session.id] = session
+        return session
+
+    async def close(self, session_id: str):
+        session = self._sessions.pop(session_id, None)
+        if session:
+            await session.close()
+
+    async def evict_idle(self):
+        """Close sessions that have no attached clients and sat idle too long."""
+        cutoff = time.time() - self.idle_timeout_s
+        stale = [
+            session.id for session in self._sessions.values()
+            if not session.alive or (session.attached == 0 and session.last_active < cutoff)
+        ]
+        await asyncio.gather(*(self.close(session_id) for session_id in stale))
+
+    def _ensure_reaper(self):
+        if self._reaper is None or self._reaper.done():
+            self._reaper = asyncio.create_task(self._reap())
+
+    async def _reap(self):
+        while self._sessions:
+            await asyncio.sleep(REAPER_INTERVAL_S)
+            await self.evict_idle()
+
+
+pool = ShellSessionPool(
+    max_sessions=settings.terminal_max_sessions,
+    idle_timeout_s=settings.terminal_idle_timeout_s,
+    buffer_size=settings.terminal_buffer_bytes,
+)
@@ -1,130 +1,305 @@
 """Agent endpoints router."""
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy.orm import Session
+from dataclasses import replace
+from typing import Any, Dict, List, Optional
 from database import get_db
-from models import User
-from schemas import AgentAskRequest, AgentAskResponse, DailyDigestResponse, WeeklyReviewResponse
-from routers.settings import get_default_user
+from schemas import AgentAskRequest, AgentAskResponse, AgentJobResponse, DailyDigestResponse, WeeklyReviewResponse
+from routers.settings import get_default_user, UserIdentity
+from agent_proxy import proxy, ProxyJob, RoutePolicy, STREAM, INTERACTIVE, BATCH
 import httpx
-import os
+import json
 
 router = APIRouter()
 
-# Agent service URL (will be running separately)
-AGENT_SERVICE_URL = os.getenv("AGENT_SERVICE_URL", "http://localhost:8001")
+
+def job_response(job: ProxyJob) -> AgentJobResponse:
+    return AgentJobResponse(
+        job_id=job.id,
+        method=job.method,
+        path=job.path,
+        status=job.status,
+        status_code=job.status_code,
+        error=job.error,
+        created_at=job.created_at,
+        finished_at=job.finished_at,
+        result_url=f"/agent/jobs/{job.id}/result",
+    )
+
+
+def error_detail(content_type: Optional[str], body: bytes) -> str:
+    """Pull FastAPI's ``detail`` out of an agent service error body."""
+    text = body.decode(errors="replace")
+    if content_type and content_type.startswith("application/json"):
+        try:
+            return json.loads(text).get("detail", text)
+        except (ValueError, AttributeError):
+            pass
+    return text
+
+
+async def forward(
+    method: str,
+    path: str,
+    policy: RoutePolicy,
+    json: Any = None,
+    params: Optional[Dict[str, Any]] = None,
+    wait: bool = False,
+) -> Response:
+    """Proxy a call to the agent service, relaying its response body unparsed.
+
+    Args:
+        method: HTTP method
+        path: Agent service path
+        policy: Timeouts and interactive budget for the route
+        json: JSON body
+        params: Query parameters
+        wait: Wait for the full timeout instead of handing back a job
+
+    Returns:
+        The agent's response, or 202 with an AgentJobResponse when the call
+        outlasts the interactive budget
+    """
+    if wait:
+        policy = replace(policy, budget_s=None)
+
+    try:
+        result = await proxy.send(method, path, policy, json=json, params=params)
+    except httpx.HTTPError as e:
+        raise HTTPException(status_code=500, detail=f"Agent service error: {str(e)}")
+
+    if isinstance(result, ProxyJob):
+        return JSONResponse(
+            status_code=202,
+            content=job_response(result).model_dump(),
+            headers={"Location": f"/agent/jobs/{result.id}"},
+        )
+
+    response = result
+    if response.status_code >= 400:
+        try:
+            body = await response.aread()
+        finally:
+            await response.aclose()
+        detail = error_detail(response.headers.get("content-type"), body)
+        raise HTTPException(status_code=response.status_code, detail=f"Agent service error: {detail}")
+
+    async def body():
+        try:
+            async for chunk in response.aiter_raw():
+                yield chunk
+        finally:
+            await response.aclose()
+
+    headers = {"Content-Type": response.headers.get("content-type", "application/json")}
+    if policy is STREAM:
+        headers.update({"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+    return StreamingResponse(body(), status_code=response.status_code, headers=headers)
 
 
 @router.post("/ask", response_model=AgentAskResponse)
 async def agent_ask(
     request: AgentAskRequest,
+    wait: bool = False,
     db: Session = Depends(get_db),
-    user: User = Depends(get_default_user)
+    user: UserIdentity = Depends(get_default_user)
 ):
     """Ask the agent a question with context."""
-    try:
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            response = await client.post(
-                f"{AGENT_SERVICE_URL}/ask",
-                json={
-                    "query": request.query,
-                    "user_id": user.id,
-                    "context_window_days": request.context_window_days,
-                }
-            )
-            response.raise_for_status()
-            return response.json()
-    except httpx.HTTPError as e:
-        raise HTTPException(status_code=500, detail=f"Agent service error: {str(e)}")
+    return await forward(
+        "POST",
+        "/ask",
+        INTERACTIVE,
+        json={
+            "query": request.query,
+            "user_id": user.id,
+            "context_window_days": request.context_window_days,
+        },
+        wait=wait,
+    )
+
+
+@router.post("/ask/stream")
+async def agent_ask_stream(
+    request: AgentAskRequest,
+    user: UserIdentity = Depends(get_default_user)
+):
+    """Ask the agent a question, streaming the answer as server-sent events."""
+    return await forward(
+        "POST",
+        "/ask/stream",
+        STREAM,
+        json={
+            "query": request.query,
+            "user_id": user.id,
+            "context_window_days": request.context_window_days,
+        },
+    )
 
 
 @router.post("/digest/daily", response_model=DailyDigestResponse)
 async def daily_digest(
+    wait: bool = False,
+    bypass_cache: bool = False,
     db: Session = Depends(get_db),
-    user: User = Depends(get_default_user)
+    user: UserIdentity = Depends(get_default_user)
 ):
     """Generate daily digest."""
-    try:
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            response = await client.post(
-                f"{AGENT_SERVICE_URL}/digest/daily",
-                json={"user_id": user.id}
-            )
-            response.raise_for_status()
-            return response.json()
-    except httpx.HTTPError as e:
-        raise HTTPException(status_code=500, detail=f"Agent service error: {str(e)}")
+    return await forward(
+        "POST",
+        "/digest/daily",
+        BATCH,
+        json={"user_id": user.id, "bypass_cache": bypass_cache},
+        wait=wait,
+    )
 
 
 @router.post("/review/weekly", response_model=WeeklyReviewResponse)
 async def weekly_review(
+    wait: bool = False,
+    bypass_cache: bool = False,
     db: Session = Depends(get_db),
-    user: User = Depends(get_default_user)
+    user: UserIdentity = Depends(get_default_user)
 ):
     """Generate weekly review."""
-    try:
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            response = await client.post(
-                f"{AGENT_SERVICE_URL}/review/weekly",
-                json={"user_id": user.id}
-            )
-            response.raise_for_status()
-            return response.json()
-    except httpx.HTTPError as e:
-        raise HTTPException(status_code=500, detail=f"Agent service error: {str(e)}")
+    return await forward(
+        "POST",
+        "/review/weekly",
+        BATCH,
+        json={"user_id": user.id, "bypass_cache": bypass_cache},
+        wait=wait,
+    )
 
 
 @router.post("/actions/run")
 async def run_action(
     action_name: str,
+    wait: bool = False,
     db: Session = Depends(get_db),
-    user: User = Depends(get_default_user)
+    user: UserIdentity = Depends(get_default_user)
 ):
     """Run a named agent action."""
-    try:
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            response = await client.post(
-                f"{AGENT_SERVICE_URL}/actions/run",
-                json={"action_name": action_name, "user_id": user.id}
-            )
-            response.raise_for_status()
-            return response.json()
-    except httpx.HTTPError as e:
-        raise HTTPException(status_code=500, detail=f"Agent service error: {str(e)}")
+    return await forward(
+        "POST",
+        "/actions/run",
+        INTERACTIVE,
+        params={"action_name": action_name, "user_id": user.id},
+        wait=wait,
+    )
 
 
 @router.post("/recipes/{recipe_name}")
 async def run_recipe(
     recipe_name: str,
     params: dict = None,
+    wait: bool = False,
+    bypass_cache: bool = False,
     db: Session = Depends(get_db),
-    user: User = Depends(get_default_user)
+    user: UserIdentity = Depends(get_default_user)
 ):
-    """Run a named recipe (e.g., sleep_optimizer, macro_coach, bible_reflector)."""
-    try:
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            response = await client.post(
-                f"{AGENT_SERVICE_URL}/recipes/{recipe_name}",
-                json={"user_id": user.id, "params": params or {}}
-            )
-            response.raise_for_status()
-            return response.json()
-    except httpx.HTTPError as e:
-        raise HTTPException(status_code=500, detail=f"Agent service error: {str(e)}")
+    """Run a named recipe (e.g., sleep_optimizer, macro_coach, bible_reflector).
+
+    ``bypass_cache`` regenerates deterministic recipes instead of serving a cached result.
+    """
+    return await forward(
+        "POST",
+        f"/recipes/{recipe_name}",
+        BATCH,
+        json={"user_id": user.id, "params": params or {}, "bypass_cache": bypass_cache},
+        wait=wait,
+    )
+
+
+@router.post("/recipes/{recipe_name}/stream")
+async def run_recipe_stream(
+    recipe_name: str,
+    params: dict = None,
+    user: UserIdentity = Depends(get_default_user)
+):
+    """Run a streaming-capable recipe (e.g., chat_assistant) as server-sent events."""
+    return await forward(
+        "POST",
+        f"/recipes/{recipe_name}/stream",
+        STREAM,
+        json={"user_id": user.id, "params": params or {}},
+    )
+
+
+@router.get("/chat/sessions/{session_id}")
+async def get_chat_session(session_id: str):
+    """Get a chat session's turns and summary."""
+    return await forward("GET", f"/chat/sessions/{session_id}", INTERACTIVE, wait=True)
+
+
+@router.delete("/chat/sessions/{session_id}")
+async def delete_chat_session(session_id: str):
+    """End a chat session."""
+    return await forward("DELETE", f"/chat/sessions/{session_id}", INTERACTIVE, wait=True)
 
 
 @router.post("/next-best-step")
 async def next_best_step(
+    wait: bool = False,
     db: Session = Depends(get_db),
-    user: User = Depends(get_default_user)
+    user: UserIdentity = Depends(get_default_user)
 ):
     """Get the next best step recommendation."""
-    try:
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            response = await client.post(
-                f"{AGENT_SERVICE_URL}/recipes/next_best_step",
-                json={"user_id": user.id, "params": {}}
-            )
-            response.raise_for_status()
-            return response.json()
-    except httpx.HTTPError as e:
-        raise HTTPException(status_code=500, detail=f"Agent service error: {str(e)}")
+    return await forward(
+        "POST",
+        "/recipes/next_best_step",
+        INTERACTIVE,
+        json={"user_id": user.id, "params": {}},
+        wait=wait,
+    )
+
+
+@router.get("/jobs", response_model=List[AgentJobResponse])
+async def list_jobs():
+    """List agent calls that were handed back as jobs."""
+    return [job_response(job) for job in proxy.list()]
+
+
+def get_job_or_404(job_id: str) -> ProxyJob:
+    job = proxy.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.get("/jobs/{job_id}", response_model=AgentJobResponse)
+async def get_job(job_id: str):
+    """Get a job's status."""
+    return job_response(get_job_or_404(job_id))
+
+
+@router.get("/jobs/{job_id}/result")
+async def get_job_result(job_id: str):
+    """Get a finished job's response body, exactly as the agent service sent it.
+
+    Returns 202 with the job status while it is still running.
+    """
+    job = get_job_or_404(job_id)
+    if not job.done:
+        return JSONResponse(status_code=202, content=job_response(job).model_dump())
+
+    if job.error is not None:
+        raise HTTPException(status_code=500, detail=f"Agent service error: {job.error}")
+
+    if job.status_code >= 400:
+        detail = error_detail(job.content_type, job.body)
+        raise HTTPException(status_code=job.status_code, detail=f"Agent service error: {detail}")
+
+    return Response(
+        content=job.body,
+        status_code=job.status_code,
+        headers={"Content-Type": job.content_type or "application/json"},
+    )
+
+
+@router.delete("/jobs/{job_id}", response_model=AgentJobResponse)
+async def cancel_job(job_id: str):
+    """Cancel a running job."""
+    job = get_job_or_404(job_id)
+    job.cancel()
+    return job_response(job)
@@ -1,21 +1,25 @@
 """Automations router."""
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from datetime import datetime
 from database import get_db
-from models import AutomationRule, AutomationLog, User
+from models import AutomationRule, AutomationLog
 from schemas import AutomationRuleCreate, AutomationRuleUpdate, AutomationRuleResponse, AutomationLogResponse
-from routers.settings import get_default_user
+from routers.settings import get_default_user, UserIdentity
+from pagination import paginate
 
 router = APIRouter()
 
 
 @router.get("", response_model=List[AutomationRuleResponse])
 def list_automation_rules(
+    response: Response,
     is_active: bool = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
-    user: User = Depends(get_default_user)
+    user: UserIdentity = Depends(get_default_user)
 ):
     """List all automation rules for the user."""
     query = db.query(AutomationRule).filter(AutomationRule.user_id == user.id)
@@ -23,14 +27,14 @@ def list_automation_rules(
     if is_active is not None:
         query = query.filter(AutomationRule.is_active == is_active)
 
-    return query.all()
+    return paginate(query, response, limit, cursor, AutomationRule.id)
 
 
 @router.post("", response_model=AutomationRuleResponse)
 def create_automation_rule(
     rule: AutomationRuleCreate,
     db: Session = Depends(get_db),
-    user: User = Depends(get_default_user)
+    user: UserIdentity = Depends(get_default_user)
 ):
     """Create a new automation rule."""
     db_rule = AutomationRule(user_id=user.id, **rule.model_dump())
@@ -78,9 +82,12 @@ def delete_automation_rule(rule_id: int, db: Session = Depends(get_db)):
 
 @router.get("/logs", response_model=List[AutomationLogResponse])
 def list_automation_logs(
+    response: Response,
     rule_id: int = None,
     start: datetime = None,
     end: datetime = None,
+    limit: Optional[int] = 100,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db)
 ):
     """List automation logs."""
@@ -93,4 +100,4 @@ def list_automation_logs(
     if end:
         query = query.filter(AutomationLog.dt <= end)
 
-    return query.order_by(AutomationLog.dt.desc()).limit(100).all()
+    return paginate(query, response, limit, cursor, AutomationLog.dt.desc(), AutomationLog.id.desc())
@@ -1,33 +1,41 @@
 """Bible study router."""
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from datetime import datetime
 from database import get_db
-from models import BiblePlan, BibleReading, BibleReflection, PrayerItem, User
+from models import BiblePlan, BibleReading, BibleReflection, PrayerItem
 from schemas import (
     BiblePlanCreate, BiblePlanResponse,
     BibleReadingCreate, BibleReadingResponse,
     BibleReflectionCreate, BibleReflectionResponse,
     PrayerItemCreate, PrayerItemUpdate, PrayerItemResponse
 )
-from routers.settings import get_default_user
+from routers.settings import get_default_user, UserIdentity
+from pagination import paginate
 
 router = APIRouter()
 
 
 # Bible Plans
 @router.get("/plans", response_model=List[BiblePlanResponse])
-def list_bible_plans(db: Session = Depends(get_db), user: User = Depends(get_default_user)):
+def list_bible_plans(
+    response: Response,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db),
+    user: UserIdentity = Depends(get_default_user)
+):
     """List all Bible plans for the user."""
-    return db.query(BiblePlan).filter(BiblePlan.user_id == user.id).all()
+    query = db.query(BiblePlan).filter(BiblePlan.user_id == user.id)
+    return paginate(query, response, limit, cursor, BiblePlan.id)
 
 
 @router.post("/plans", response_model=BiblePlanResponse)
 def create_bible_plan(
     plan: BiblePlanCreate,
     db: Session = Depends(get_db),
-    user: User = Depends(get_default_user)
+    user: UserIdentity = Depends(get_default_user)
 ):
     """Create a new Bible plan."""
     db_plan = BiblePlan(user_id=user.id, **plan.model_dump())
@@ -76,9 +84,12 @@ def delete_bible_plan(plan_id: int, db: Session = Depends(get_db)):
 # Bible Readings
 @router.get("/readings", response_model=List[BibleReadingResponse])
 def list_bible_readings(
+    response: Response,
     plan_id: int = None,
     start: datetime = None,
     end: datetime = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db)
 ):
     """List Bible readings."""
@@ -91,7 +102,7 @@ def list_bible_readings(
     if end:
         query = query.filter(BibleReading.dt <= end)
 
-    return query.order_by(BibleReading.dt.desc()).all()
+    return paginate(query, response, limit, cursor, BibleReading.dt.desc(), BibleReading.id.desc())
 
 
 @router.post("/readings", response_model=BibleReadingResponse)
@@ -119,10 +130,13 @@ def delete_bible_reading(reading_id: int, db: Session = Depends(get_db)):
 # Bible Reflections
 @router.get("/reflections", response_model=List[BibleReflectionResponse])
 def list_bible_reflections(
+    response: Response,
     start: datetime = None,
     end: datetime = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
-    user: User = Depends(get_default_user)
+    user: UserIdentity = Depends(get_default_user)
 ):
     """List Bible reflections."""
     query = db.query(BibleReflection).filter(BibleReflection.user_id == user.id)
@@ -132,14 +146,14 @@ def list_bible_reflections(
     if end:
         query = query.filter(BibleReflection.dt <= end)
 
-    return query.order_by(BibleReflection.dt.desc()).all()
+    return paginate(query, response, limit, cursor, BibleReflection.dt.desc(), BibleReflection.id.desc())
 
 
 @router.post("/reflections", response_model=BibleReflectionResponse)
 def create_bible_reflection(
     reflection: BibleReflectionCreate,
     db: Session = Depends(get_db),
-    user: User = Depends(get_default_user)
+    user: UserIdentity = Depends(get_default_user)
 ):
     """Create a new Bible reflection."""
     db_reflection = BibleReflection(user_id=user.id, **reflection.model_dump())
@@ -164,9 +178,12 @@ def delete_bible_reflection(reflection_id: int, db: Session = Depends(get_db)):
 # Prayer Items
 @router.get("/prayers", response_model=List[PrayerItemResponse])
 def list_prayer_items(
+    response: Response,
     status: str = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
-    user: User = Depends(get_default_user)
+    user: UserIdentity = Depends(get_default_user)
 ):
     """List prayer items."""
     query = db.query(PrayerItem).filter(PrayerItem.user_id == user.id)
@@ -174,14 +191,14 @@ def list_prayer_items(
     if status:
         query = query.filter(PrayerItem.status == status)
 
-    return query.order_by(PrayerItem.created_at.desc()).all()
+    return paginate(query, response, limit, cursor, PrayerItem.created_at.desc(), PrayerItem.id.desc())
 
 
 @router.post("/prayers", response_model=PrayerItemResponse)
 def create_prayer_item(
     prayer: PrayerItemCreate,
     db: Session = Depends(get_db),
-    user: User = Depends(get_default_user)
+    user: UserIdentity = Depends(get_default_user)
 ):
     """Create a new prayer item."""
     db_prayer = PrayerItem(user_id=user.id, **prayer.model_dump())
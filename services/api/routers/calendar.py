@@ -1,27 +1,35 @@
 """Calendar and events router."""
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from datetime import datetime
 from database import get_db
-from models import Calendar, Event, User
+from models import Calendar, Event
 from schemas import CalendarCreate, CalendarResponse, EventCreate, EventUpdate, EventResponse
-from routers.settings import get_default_user
+from routers.settings import get_default_user, UserIdentity
+from pagination import paginate
 
 router = APIRouter()
 
 
 @router.get("", response_model=List[CalendarResponse])
-def list_calendars(db: Session = Depends(get_db), user: User = Depends(get_default_user)):
+def list_calendars(
+    response: Response,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db),
+    user: UserIdentity = Depends(get_default_user)
+):
     """List all calendars for the user."""
-    return db.query(Calendar).filter(Calendar.user_id == user.id).all()
+    query = db.query(Calendar).filter(Calendar.user_id == user.id)
+    return paginate(query, response, limit, cursor, Calendar.id)
 
 
 @router.post("", response_model=CalendarResponse)
 def create_calendar(
     calendar: CalendarCreate,
     db: Session = Depends(get_db),
-    user: User = Depends(get_default_user)
+    user: UserIdentity = Depends(get_default_user)
 ):
     """Create a new calendar."""
     db_calendar = Calendar(user_id=user.id, **calendar.model_dump())
@@ -33,11 +41,14 @@ def create_calendar(
 
 @router.get("/events", response_model=List[EventResponse])
 def list_events(
+    response: Response,
     start: datetime = None,
     end: datetime = None,
     calendar_id: int = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
-    user: User = Depends(get_default_user)
+    user: UserIdentity = Depends(get_default_user)
 ):
     """List events with optional filters."""
     query = db.query(Event).join(Calendar).filter(Calendar.user_id == user.id)
@@ -49,7 +60,7 @@ def list_events(
     if end:
         query = query.filter(Event.start_ts <= end)
 
-    return query.order_by(Event.start_ts).all()
+    return paginate(query, response, limit, cursor, Event.start_ts, Event.id)
 
 
 @router.post("/events", response_model=EventResponse)
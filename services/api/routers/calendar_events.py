@@ -1,10 +1,13 @@
 """Calendar events management router for AI agent integration."""
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime
+from bisect import bisect_left
 import json
 import os
+import tempfile
+import threading
 from pathlib import Path
 
 router = APIRouter()
@@ -25,23 +28,151 @@ class CalendarEventCreate(BaseModel):
     title: str
     time: Optional[str] = ""
 
-def load_events() -> List[dict]:
-    """Load events from JSON file."""
-    if not EVENTS_FILE.exists():
-        return []
-    try:
-        with open(EVENTS_FILE, 'r') as f:
-            return json.load(f)
-    except Exception:
-        return []
-
-def save_events(events: List[dict]):
-    """Save events to JSON file."""
-    with open(EVENTS_FILE, 'w') as f:
-        json.dump(events, f, indent=2)
+
+class CalendarEventStore:
+    """JSON-file event store with a date-sorted in-memory index.
+
+    The file is parsed once and kept as a list sorted by (date, time, id),
+    so date, month and year lookups are binary searches. The index is
+    reloaded when the file's mtime or size changes under us. Writes hold a
+    lock for the whole read-modify-write and replace the file atomically
+    (temp file + fsync + rename), so a crash never leaves a torn file.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._lock = threading.RLock()
+        self._stat: Optional[Tuple[int, int]] = None
+        self._keys: List[Tuple[str, str, int]] = []
+        self._events: List[dict] = []
+        self._by_id: Dict[int, dict] = {}
+
+    @staticmethod
+    def _key(event: dict) -> Tuple[str, str, int]:
+        return (event['date'], event['time'], event['id'])
+
+    def _file_stat(self) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def _index(self, events: List[dict]):
+        events = [{**e, 'time': e.get('time') or ''} for e in events]
+        events.sort(key=self._key)
+        self._events = events
+        self._keys = [self._key(e) for e in events]
+        self._by_id = {e['id']: e for e in events}
+
+    def _refresh(self):
+        """Reload the index if the file changed since it was last read."""
+        stat = self._file_stat()
+        if stat == self._stat:
+            return
+
+        events = []
+        if stat is not None:
+            try:
+                with open(self.path, 'r') as f:
+                    events = json.load(f)
+            except (OSError, ValueError):
+                events = []
+
+        self._index(events)
+        self._stat = stat
+
+    def _write(self, events: List[dict]):
+        """Atomically replace the file and the index with ``events``."""
+        fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, prefix=f".{self.path.name}.", suffix=".tmp")
+        try:
+            # mkstemp creates 0600 files; keep the mode the store already had
+            os.chmod(tmp_path, os.stat(self.path).st_mode & 0o777 if self.path.exists() else 0o644)
+            with os.fdopen(fd, 'w') as f:
+                json.dump(events, f, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+        self._index(events)
+        self._stat = self._file_stat()
+
+    def _slice(self, start: Optional[str] = None, end: Optional[str] = None) -> List[dict]:
+        """Events with start <= date < end (either bound optional)."""
+        lo = bisect_left(self._keys, (start,)) if start is not None else 0
+        hi = bisect_left(self._keys, (end,)) if end is not None else len(self._keys)
+        return self._events[lo:hi]
+
+    def all(self) -> List[dict]:
+        with self._lock:
+            self._refresh()
+            return list(self._events)
+
+    def on_date(self, date: str) -> List[dict]:
+        """Events on one YYYY-MM-DD date, ordered by time."""
+        with self._lock:
+            self._refresh()
+            return self._slice(date, date + "\x00")
+
+    def with_prefix(self, prefix: str) -> List[dict]:
+        """Events whose date starts with ``prefix`` (e.g. "2025" or "2025-03")."""
+        with self._lock:
+            self._refresh()
+            return self._slice(prefix, prefix + "\uffff")
+
+    def from_date(self, start: str, limit: Optional[int] = None) -> List[dict]:
+        """Events on or after ``start``, ordered by date and time."""
+        with self._lock:
+            self._refresh()
+            lo = bisect_left(self._keys, (start,))
+            hi = len(self._keys) if limit is None else lo + max(limit, 0)
+            return self._events[lo:hi]
+
+    def get(self, event_id: int) -> Optional[dict]:
+        with self._lock:
+            self._refresh()
+            return self._by_id.get(event_id)
+
+    def create(self, date: str, title: str, time: str) -> dict:
+        with self._lock:
+            self._refresh()
+            new_event = {
+                'id': max(self._by_id, default=0) + 1,
+                'date': date,
+                'title': title,
+                'time': time
+            }
+            self._write(self._events + [new_event])
+            return new_event
+
+    def update(self, event_id: int, date: str, title: str, time: str) -> Optional[dict]:
+        with self._lock:
+            self._refresh()
+            if event_id not in self._by_id:
+                return None
+            updated_event = {'id': event_id, 'date': date, 'title': title, 'time': time}
+            self._write([updated_event if e['id'] == event_id else e for e in self._events])
+            return updated_event
+
+    def delete(self, event_id: int):
+        with self._lock:
+            self._refresh()
+            if event_id in self._by_id:
+                self._write([e for e in self._events if e['id'] != event_id])
+
+    def replace_all(self, events: List[dict]):
+        with self._lock:
+            self._write(events)
+
+
+store = CalendarEventStore(EVENTS_FILE)
 
 @router.get("/events", response_model=List[CalendarEvent])
-async def get_all_events(
+def get_all_events(
     date: Optional[str] = None,
     year: Optional[int] = None,
     month: Optional[int] = None
@@ -53,38 +184,26 @@ async def get_all_events(
     - year: Filter by year
     - month: Filter by month (1-12, requires year)
     """
-    events = load_events()
-
     if date:
-        events = [e for e in events if e['date'] == date]
+        return store.on_date(date)
     elif year and month:
-        date_prefix = f"{year}-{str(month).zfill(2)}"
-        events = [e for e in events if e['date'].startswith(date_prefix)]
+        return store.with_prefix(f"{year}-{str(month).zfill(2)}")
     elif year:
-        date_prefix = f"{year}"
-        events = [e for e in events if e['date'].startswith(date_prefix)]
+        return store.with_prefix(f"{year}")
 
-    # Sort by date
-    events.sort(key=lambda e: e['date'])
-
-    return events
+    # Sorted by date
+    return store.all()
 
 @router.get("/events/upcoming")
-async def get_upcoming_events(limit: int = 10):
+def get_upcoming_events(limit: int = 10):
     """Get upcoming events (future and today), sorted by date."""
-    events = load_events()
     today = datetime.now().strftime('%Y-%m-%d')
-
-    upcoming = [e for e in events if e['date'] >= today]
-    upcoming.sort(key=lambda e: (e['date'], e.get('time', '')))
-
-    return upcoming[:limit]
+    return store.from_date(today, limit)
 
 @router.get("/events/{event_id}", response_model=CalendarEvent)
-async def get_event(event_id: int):
+def get_event(event_id: int):
     """Get a specific event by ID."""
-    events = load_events()
-    event = next((e for e in events if e['id'] == event_id), None)
+    event = store.get(event_id)
 
     if not event:
         raise HTTPException(status_code=404, detail="Event not found")
@@ -92,72 +211,38 @@ async def get_event(event_id: int):
     return event
 
 @router.post("/events", response_model=CalendarEvent)
-async def create_event(event: CalendarEventCreate):
+def create_event(event: CalendarEventCreate):
     """Create a new calendar event."""
-    events = load_events()
-
-    # Generate new ID
-    new_id = max([e['id'] for e in events], default=0) + 1
-
-    new_event = {
-        'id': new_id,
-        'date': event.date,
-        'title': event.title,
-        'time': event.time or ''
-    }
-
-    events.append(new_event)
-    save_events(events)
-
-    return new_event
+    return store.create(event.date, event.title, event.time or '')
 
 @router.put("/events/{event_id}", response_model=CalendarEvent)
-async def update_event(event_id: int, event: CalendarEventCreate):
+def update_event(event_id: int, event: CalendarEventCreate):
     """Update an existing event."""
-    events = load_events()
-
-    event_index = next((i for i, e in enumerate(events) if e['id'] == event_id), None)
-    if event_index is None:
+    updated_event = store.update(event_id, event.date, event.title, event.time or '')
+    if updated_event is None:
         raise HTTPException(status_code=404, detail="Event not found")
 
-    updated_event = {
-        'id': event_id,
-        'date': event.date,
-        'title': event.title,
-        'time': event.time or ''
-    }
-
-    events[event_index] = updated_event
-    save_events(events)
-
     return updated_event
 
 @router.delete("/events/{event_id}")
-async def delete_event(event_id: int):
+def delete_event(event_id: int):
     """Delete an event."""
-    events = load_events()
-
-    events = [e for e in events if e['id'] != event_id]
-    save_events(events)
+    store.delete(event_id)
 
     return {"success": True, "deleted_id": event_id}
 
 @router.get("/events/date/{date}")
-async def get_events_by_date(date: str):
+def get_events_by_date(date: str):
     """Get all events for a specific date (YYYY-MM-DD)."""
-    events = load_events()
-    date_events = [e for e in events if e['date'] == date]
-    date_events.sort(key=lambda e: e.get('time', ''))
-
-    return date_events
+    return store.on_date(date)
 
 @router.post("/sync")
-async def sync_with_frontend(events_data: List[CalendarEvent]):
+def sync_with_frontend(events_data: List[CalendarEvent]):
     """
     Sync events from frontend localStorage to backend.
     This allows the desktop app to push its localStorage data to the API.
     """
-    events = [e.dict() for e in events_data]
-    save_events(events)
+    events = [e.model_dump() for e in events_data]
+    store.replace_all(events)
 
     return {"success": True, "synced_count": len(events)}
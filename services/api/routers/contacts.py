@@ -1,28 +1,36 @@
 """Contacts and relationships router."""
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from datetime import datetime
 from database import get_db
-from models import Contact, Interaction, User
+from models import Contact, Interaction
 from schemas import ContactCreate, ContactUpdate, ContactResponse, InteractionCreate, InteractionResponse
-from routers.settings import get_default_user
+from routers.settings import get_default_user, UserIdentity
+from pagination import paginate
 
 router = APIRouter()
 
 
 # Contacts
 @router.get("", response_model=List[ContactResponse])
-def list_contacts(db: Session = Depends(get_db), user: User = Depends(get_default_user)):
+def list_contacts(
+    response: Response,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db),
+    user: UserIdentity = Depends(get_default_user)
+):
     """List all contacts for the user."""
-    return db.query(Contact).filter(Contact.user_id == user.id).all()
+    query = db.query(Contact).filter(Contact.user_id == user.id)
+    return paginate(query, response, limit, cursor, Contact.id)
 
 
 @router.post("", response_model=ContactResponse)
 def create_contact(
     contact: ContactCreate,
     db: Session = Depends(get_db),
-    user: User = Depends(get_default_user)
+    user: UserIdentity = Depends(get_default_user)
 ):
     """Create a new contact."""
     db_contact = Contact(user_id=user.id, **contact.model_dump())
@@ -71,11 +79,14 @@ def delete_contact(contact_id: int, db: Session = Depends(get_db)):
 # Interactions
 @router.get("/interactions", response_model=List[InteractionResponse])
 def list_interactions(
+    response: Response,
     contact_id: int = None,
     start: datetime = None,
     end: datetime = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
-    user: User = Depends(get_default_user)
+    user: UserIdentity = Depends(get_default_user)
 ):
     """List all interactions for the user."""
     query = db.query(Interaction).filter(Interaction.user_id == user.id)
@@ -87,14 +98,14 @@ def list_interactions(
     if end:
         query = query.filter(Interaction.dt <= end)
 
-    return query.order_by(Interaction.dt.desc()).all()
+    return paginate(query, response, limit, cursor, Interaction.dt.desc(), Interaction.id.desc())
 
 
 @router.post("/interactions", response_model=InteractionResponse)
 def create_interaction(
     interaction: InteractionCreate,
     db: Session = Depends(get_db),
-    user: User = Depends(get_default_user)
+    user: UserIdentity = Depends(get_default_user)
 ):
     """Create a new interaction."""
     db_interaction = Interaction(user_id=user.id, **interaction.model_dump())
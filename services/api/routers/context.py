@@ -0,0 +1,232 @@
+"""Agent context bundle router."""
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from typing import Dict, List, Optional, Tuple
+from datetime import datetime, timedelta
+from database import get_db
+from models import (
+    Task, Calendar, Event, Habit, Meal, Workout, SleepLog,
+    JournalEntry, Project, Skill, Goal, Transaction, Contact,
+    BiblePlan, BibleReading, Routine
+)
+from schemas import ContextBundleResponse, RetrievedItemResponse
+from embeddings import SOURCES, IndexNotReady, index as embedding_index, split_key
+import httpx
+from routers.settings import get_default_user, UserIdentity
+from routers.habits import get_logs_by_habit
+
+router = APIRouter()
+
+# Modules understood by the bundle, in the same vocabulary as the agent's ContextBuilder
+CONTEXT_MODULES = [
+    "tasks", "events", "habits", "meals", "workouts", "sleep",
+    "journal", "projects", "skills", "goals", "transactions",
+    "contacts", "bible", "routines"
+]
+
+
+@router.get("/bundle", response_model=ContextBundleResponse, response_model_exclude_unset=True)
+def get_context_bundle(
+    window_days: int = 7,
+    modules: Optional[str] = None,
+    db: Session = Depends(get_db),
+    user: UserIdentity = Depends(get_default_user)
+):
+    """Assemble the agent context for several modules in one request.
+
+    Args:
+        window_days: Number of days of history to include
+        modules: Comma-separated module names (None = all)
+
+    Returns:
+        Raw rows for every requested module, keyed by module name
+    """
+    if modules:
+        requested = [m.strip() for m in modules.split(",") if m.strip()]
+    else:
+        requested = CONTEXT_MODULES
+
+    unknown = [m for m in requested if m not in CONTEXT_MODULES]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown modules: {', '.join(unknown)}")
+
+    now = datetime.utcnow()
+    start = now - timedelta(days=window_days)
+
+    bundle = {
+        "window_start": start,
+        "window_end": now,
+        "window_days": window_days,
+        "modules": requested,
+    }
+
+    if "tasks" in requested:
+        bundle["tasks"] = (
+            db.query(Task)
+            .filter(Task.user_id == user.id, Task.status.in_(["todo", "doing"]))
+            .order_by(Task.status.desc(), Task.priority.desc(), Task.due_ts, Task.id)
+            .all()
+        )
+
+    if "events" in requested:
+        bundle["events"] = (
+            db.query(Event)
+            .join(Calendar)
+            .filter(Calendar.user_id == user.id, Event.end_ts >= start, Event.start_ts <= now)
+            .order_by(Event.start_ts, Event.id)
+            .all()
+        )
+
+    if "habits" in requested:
+        habits = (
+            db.query(Habit)
+            .filter(Habit.user_id == user.id, Habit.is_active == True)
+            .all()
+        )
+        bundle["habits"] = habits
+        bundle["habit_logs"] = get_logs_by_habit(db, [habit.id for habit in habits], start)
+
+    if "meals" in requested:
+        bundle["meals"] = (
+            db.query(Meal)
+            .filter(Meal.user_id == user.id, Meal.dt >= start, Meal.dt <= now)
+            .order_by(Meal.dt.desc(), Meal.id.desc())
+            .all()
+        )
+
+    if "workouts" in requested:
+        bundle["workouts"] = (
+            db.query(Workout)
+            .filter(Workout.user_id == user.id, Workout.dt >= start, Workout.dt <= now)
+            .order_by(Workout.dt.desc(), Workout.id.desc())
+            .all()
+        )
+
+    if "sleep" in requested:
+        bundle["sleep"] = (
+            db.query(SleepLog)
+            .filter(SleepLog.user_id == user.id, SleepLog.date >= start, SleepLog.date <= now)
+            .order_by(SleepLog.date.desc(), SleepLog.id.desc())
+            .all()
+        )
+
+    if "journal" in requested:
+        bundle["journal"] = (
+            db.query(JournalEntry)
+            .filter(JournalEntry.user_id == user.id, JournalEntry.dt >= start, JournalEntry.dt <= now)
+            .order_by(JournalEntry.dt.desc(), JournalEntry.id.desc())
+            .all()
+        )
+
+    if "projects" in requested:
+        bundle["projects"] = (
+            db.query(Project)
+            .filter(Project.user_id == user.id, Project.status == "active")
+            .all()
+        )
+
+    if "skills" in requested:
+        bundle["skills"] = db.query(Skill).filter(Skill.user_id == user.id).all()
+
+    if "goals" in requested:
+        bundle["goals"] = (
+            db.query(Goal)
+            .filter(Goal.user_id == user.id, Goal.status == "active")
+            .all()
+        )
+
+    if "transactions" in requested:
+        bundle["transactions"] = (
+            db.query(Transaction)
+            .filter(Transaction.user_id == user.id, Transaction.dt >= start, Transaction.dt <= now)
+            .order_by(Transaction.dt.desc(), Transaction.id.desc())
+            .all()
+        )
+
+    if "contacts" in requested:
+        bundle["contacts"] = db.query(Contact).filter(Contact.user_id == user.id).all()
+
+    if "bible" in requested:
+        bundle["bible_plans"] = db.query(BiblePlan).filter(BiblePlan.user_id == user.id).all()
+        bundle["recent_readings"] = (
+            db.query(BibleReading)
+            .filter(BibleReading.dt >= start)
+            .order_by(BibleReading.dt.desc(), BibleReading.id.desc())
+            .all()
+        )
+
+    if "routines" in requested:
+        bundle["routines"] = db.query(Routine).filter(Routine.user_id == user.id).all()
+
+    return bundle
+
+
+def _retrieved_items(db: Session, hits: List[Tuple[str, float]], max_chars: int) -> List[dict]:
+    """Rows for search hits, loaded with one query per kind, in rank order."""
+    ids_by_kind: Dict[str, List[int]] = {}
+    for key, _ in hits:
+        kind, row_id = split_key(key)
+        ids_by_kind.setdefault(kind, []).append(row_id)
+
+    rows = {}
+    for kind, ids in ids_by_kind.items():
+        model = SOURCES[kind].model
+        for row in db.query(model).filter(model.id.in_(ids)):
+            rows[(kind, row.id)] = row
+
+    items = []
+    for key, score in hits:
+        kind, row_id = split_key(key)
+        row = rows.get((kind, row_id))
+        if row is None:
+            continue
+        source = SOURCES[kind]
+        items.append({
+            "kind": kind,
+            "id": row_id,
+            "score": round(score, 4),
+            "title": source.title(row),
+            "dt": source.dt(row),
+            "text": source.text(row)[:max_chars],
+        })
+    return items
+
+
+@router.get("/retrieve", response_model=List[RetrievedItemResponse])
+async def retrieve_context(
+    q: str,
+    k: int = 8,
+    kinds: Optional[str] = None,
+    max_chars: int = 600,
+    db: Session = Depends(get_db),
+    user: UserIdentity = Depends(get_default_user)
+):
+    """Journal entries, notes and memory events most similar to ``q``.
+
+    Args:
+        q: Query text
+        k: Number of items to return (max 50)
+        kinds: Comma-separated subset of journal, notes, memory (None = all)
+        max_chars: Text returned per item
+
+    Returns:
+        Items ranked by cosine similarity of their embeddings to the query
+    """
+    if not embedding_index.running:
+        raise HTTPException(status_code=503, detail="Embedding index is disabled")
+
+    requested = [kind.strip() for kind in kinds.split(",") if kind.strip()] if kinds else None
+    unknown = [kind for kind in requested or [] if kind not in SOURCES]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown kinds: {', '.join(unknown)}")
+
+    try:
+        hits = await embedding_index.search(user.id, q, min(max(k, 1), 50), requested)
+    except IndexNotReady as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except (httpx.HTTPError, KeyError, ValueError) as e:
+        raise HTTPException(status_code=503, detail=f"Embedding failed: {e}")
+
+    # Synchronous queries, off the event loop
+    return await asyncio.to_thread(_retrieved_items, db, hits, max_chars)
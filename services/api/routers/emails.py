@@ -1,18 +1,29 @@
 """Email management router for AI agent integration."""
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
+from fastapi import APIRouter, Depends, HTTPException, Response
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import Integer, cast, func, text
+from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import datetime
 import json
+import logging
 from pathlib import Path
+from database import get_db, SessionLocal
+from models import EmailMessage
+from pagination import paginate
+from fts import match_query
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-# Store emails in a JSON file
+# Legacy JSON store, imported once into the emails table
 DATA_DIR = Path.home() / ".julios" / "data"
 DATA_DIR.mkdir(parents=True, exist_ok=True)
 EMAILS_FILE = DATA_DIR / "emails.json"
 
+FOLDERS = ["inbox", "sent", "drafts", "trash"]
+
 class Email(BaseModel):
     id: int
     from_addr: str
@@ -24,6 +35,9 @@ class Email(BaseModel):
     unread: bool
     starred: bool
 
+    class Config:
+        from_attributes = True
+
 class EmailCreate(BaseModel):
     from_addr: str = "me@julios.local"
     to_addr: str
@@ -36,27 +50,63 @@ class EmailUpdate(BaseModel):
     unread: Optional[bool] = None
     starred: Optional[bool] = None
 
-def load_emails() -> List[dict]:
-    """Load emails from JSON file."""
-    if not EMAILS_FILE.exists():
-        return []
-    try:
-        with open(EMAILS_FILE, 'r') as f:
-            return json.load(f)
-    except Exception:
-        return []
+class UnreadEmails(BaseModel):
+    count: int
+    emails: List[Email]
+
+def import_json_emails(path: Path = EMAILS_FILE) -> int:
+    """One-time import of the legacy emails.json store into SQLite.
+
+    Rows are only imported into an empty table; malformed records are logged
+    and skipped. The file is then renamed to ``emails.json.imported`` so it
+    is never read again.
+
+    Returns:
+        Number of emails imported
+    """
+    if not path.exists():
+        return 0
 
-def save_emails(emails: List[dict]):
-    """Save emails to JSON file."""
-    with open(EMAILS_FILE, 'w') as f:
-        json.dump(emails, f, indent=2)
+    try:
+        with open(path, 'r') as f:
+            records = json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Could not read {path}, skipping email import: {e}")
+        return 0
+    if not isinstance(records, list):
+        logger.warning(f"{path} is not a list of emails, skipping email import")
+        return 0
+
+    imported = 0
+    db = SessionLocal()
+    try:
+        if db.query(EmailMessage.id).first() is None:
+            emails = []
+            for i, record in enumerate(records):
+                try:
+                    emails.append(Email.model_validate(record))
+                except ValidationError as e:
+                    logger.warning(f"Skipping malformed email record {i} in {path}: {e.error_count()} errors")
+            db.bulk_insert_mappings(EmailMessage, [email.model_dump() for email in emails])
+            db.commit()
+            imported = len(emails)
+    finally:
+        db.close()
+
+    path.rename(path.with_name(path.name + ".imported"))
+    logger.info(f"Imported {imported} emails from {path}")
+    return imported
 
 @router.get("/emails", response_model=List[Email])
-async def get_all_emails(
+def get_all_emails(
+    response: Response,
     folder: Optional[str] = None,
     unread: Optional[bool] = None,
     starred: Optional[bool] = None,
-    search: Optional[str] = None
+    search: Optional[str] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db)
 ):
     """
     Get all emails, optionally filtered.
@@ -64,53 +114,82 @@ async def get_all_emails(
     - folder: Filter by folder (inbox, sent, drafts, trash)
     - unread: Filter by unread status
     - starred: Filter by starred status
-    - search: Search in subject, from, to, and body
+    - search: Full-text search in subject, from, to, and body
     """
-    emails = load_emails()
+    query = db.query(EmailMessage)
 
     if folder:
         # Special case for starred - show starred emails from all folders except trash
         if folder == 'starred':
-            emails = [e for e in emails if e.get('starred', False) and e.get('folder') != 'trash']
+            query = query.filter(EmailMessage.starred == True, EmailMessage.folder != 'trash')
         else:
-            emails = [e for e in emails if e.get('folder') == folder]
+            query = query.filter(EmailMessage.folder == folder)
 
     if unread is not None:
-        emails = [e for e in emails if e.get('unread', False) == unread]
+        query = query.filter(EmailMessage.unread == unread)
 
     if starred is not None:
-        emails = [e for e in emails if e.get('starred', False) == starred]
+        query = query.filter(EmailMessage.starred == starred)
 
     if search:
-        search_lower = search.lower()
-        emails = [e for e in emails if
-                  search_lower in e.get('subject', '').lower() or
-                  search_lower in e.get('from_addr', '').lower() or
-                  search_lower in e.get('to_addr', '').lower() or
-                  search_lower in e.get('body', '').lower()]
-
-    # Sort by timestamp (newest first)
-    emails.sort(key=lambda e: e.get('timestamp', 0), reverse=True)
-
-    return emails
-
-@router.get("/emails/inbox/unread")
-async def get_unread_inbox():
+        match = match_query(search)
+        if match is None:
+            return []
+        query = query.filter(
+            EmailMessage.id.in_(
+                text("SELECT rowid FROM emails_fts WHERE emails_fts MATCH :match")
+                .bindparams(match=match)
+            )
+        )
+
+    # Newest first
+    return paginate(
+        query, response, limit, cursor,
+        EmailMessage.timestamp.desc(), EmailMessage.id.desc()
+    )
+
+@router.get("/emails/inbox/unread", response_model=UnreadEmails)
+def get_unread_inbox(db: Session = Depends(get_db)):
     """Get unread emails in inbox."""
-    emails = load_emails()
-    unread = [e for e in emails if e.get('folder') == 'inbox' and e.get('unread', False)]
-    unread.sort(key=lambda e: e.get('timestamp', 0), reverse=True)
+    unread = (
+        db.query(EmailMessage)
+        .filter(EmailMessage.folder == 'inbox', EmailMessage.unread == True)
+        .order_by(EmailMessage.timestamp.desc(), EmailMessage.id.desc())
+        .all()
+    )
 
     return {
         "count": len(unread),
         "emails": unread
     }
 
+@router.get("/emails/stats")
+def get_email_stats(db: Session = Depends(get_db)):
+    """Get email statistics."""
+    rows = (
+        db.query(
+            EmailMessage.folder,
+            func.count(EmailMessage.id),
+            func.sum(cast(EmailMessage.unread, Integer)),
+            func.sum(cast(EmailMessage.starred, Integer)),
+        )
+        .group_by(EmailMessage.folder)
+        .all()
+    )
+
+    per_folder = {folder: count for folder, count, _, _ in rows}
+
+    return {
+        "total": sum(per_folder.values()),
+        **{folder: per_folder.get(folder, 0) for folder in FOLDERS},
+        "unread": sum(unread or 0 for _, _, unread, _ in rows),
+        "starred": sum(starred or 0 for _, _, _, starred in rows)
+    }
+
 @router.get("/emails/{email_id}", response_model=Email)
-async def get_email(email_id: int):
+def get_email(email_id: int, db: Session = Depends(get_db)):
     """Get a specific email by ID."""
-    emails = load_emails()
-    email = next((e for e in emails if e['id'] == email_id), None)
+    email = db.query(EmailMessage).filter(EmailMessage.id == email_id).first()
 
     if not email:
         raise HTTPException(status_code=404, detail="Email not found")
@@ -118,36 +197,31 @@ async def get_email(email_id: int):
     return email
 
 @router.post("/emails", response_model=Email)
-async def create_email(email: EmailCreate):
+def create_email(email: EmailCreate, db: Session = Depends(get_db)):
     """
     Create/send a new email.
 
     Note: This is a local email system, so emails are just stored locally.
     """
-    emails = load_emails()
-
-    # Generate new ID
-    new_id = max([e['id'] for e in emails], default=0) + 1
-
-    new_email = {
-        'id': new_id,
-        'from_addr': email.from_addr,
-        'to_addr': email.to_addr,
-        'subject': email.subject,
-        'body': email.body,
-        'timestamp': int(datetime.now().timestamp() * 1000),
-        'folder': email.folder,
-        'unread': False,
-        'starred': False
-    }
-
-    emails.append(new_email)
-    save_emails(emails)
+    new_email = EmailMessage(
+        from_addr=email.from_addr,
+        to_addr=email.to_addr,
+        subject=email.subject,
+        body=email.body,
+        timestamp=int(datetime.now().timestamp() * 1000),
+        folder=email.folder,
+        unread=False,
+        starred=False
+    )
+
+    db.add(new_email)
+    db.commit()
+    db.refresh(new_email)
 
     return new_email
 
 @router.patch("/emails/{email_id}", response_model=Email)
-async def update_email(email_id: int, update: EmailUpdate):
+def update_email(email_id: int, update: EmailUpdate, db: Session = Depends(get_db)):
     """
     Update email properties (folder, unread, starred).
 
@@ -156,73 +230,50 @@ async def update_email(email_id: int, update: EmailUpdate):
     - Mark as read: unread=false
     - Star email: starred=true
     """
-    emails = load_emails()
-
-    email_index = next((i for i, e in enumerate(emails) if e['id'] == email_id), None)
-    if email_index is None:
+    email = db.query(EmailMessage).filter(EmailMessage.id == email_id).first()
+    if not email:
         raise HTTPException(status_code=404, detail="Email not found")
 
-    email = emails[email_index]
-
     # Update only provided fields
-    if update.folder is not None:
-        email['folder'] = update.folder
-    if update.unread is not None:
-        email['unread'] = update.unread
-    if update.starred is not None:
-        email['starred'] = update.starred
+    for key, value in update.model_dump(exclude_none=True).items():
+        setattr(email, key, value)
 
-    save_emails(emails)
+    db.commit()
+    db.refresh(email)
 
     return email
 
 @router.delete("/emails/{email_id}")
-async def delete_email(email_id: int, permanent: bool = False):
+def delete_email(email_id: int, permanent: bool = False, db: Session = Depends(get_db)):
     """
     Delete an email.
 
     - If permanent=false and email is not in trash: move to trash
     - If permanent=true or email is in trash: permanently delete
     """
-    emails = load_emails()
-
-    email = next((e for e in emails if e['id'] == email_id), None)
+    email = db.query(EmailMessage).filter(EmailMessage.id == email_id).first()
     if not email:
         raise HTTPException(status_code=404, detail="Email not found")
 
-    if permanent or email.get('folder') == 'trash':
+    if permanent or email.folder == 'trash':
         # Permanently delete
-        emails = [e for e in emails if e['id'] != email_id]
-        save_emails(emails)
+        db.delete(email)
+        db.commit()
         return {"success": True, "deleted_id": email_id, "permanent": True}
     else:
         # Move to trash
-        email['folder'] = 'trash'
-        save_emails(emails)
+        email.folder = 'trash'
+        db.commit()
         return {"success": True, "moved_to_trash": email_id, "permanent": False}
 
 @router.post("/emails/sync")
-async def sync_with_frontend(emails_data: List[Email]):
+def sync_with_frontend(emails_data: List[Email], db: Session = Depends(get_db)):
     """
     Sync emails from frontend localStorage to backend.
     This allows the desktop app to push its localStorage data to the API.
     """
-    emails = [e.dict() for e in emails_data]
-    save_emails(emails)
-
-    return {"success": True, "synced_count": len(emails)}
+    db.query(EmailMessage).delete()
+    db.bulk_insert_mappings(EmailMessage, [e.model_dump() for e in emails_data])
+    db.commit()
 
-@router.get("/emails/stats")
-async def get_email_stats():
-    """Get email statistics."""
-    emails = load_emails()
-
-    return {
-        "total": len(emails),
-        "inbox": len([e for e in emails if e.get('folder') == 'inbox']),
-        "sent": len([e for e in emails if e.get('folder') == 'sent']),
-        "drafts": len([e for e in emails if e.get('folder') == 'drafts']),
-        "trash": len([e for e in emails if e.get('folder') == 'trash']),
-        "unread": len([e for e in emails if e.get('unread', False)]),
-        "starred": len([e for e in emails if e.get('starred', False)])
-    }
+    return {"success": True, "synced_count": len(emails_data)}
@@ -1,16 +1,17 @@
 """Finances router."""
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from datetime import datetime
 from database import get_db
-from models import Budget, Transaction, SavingsGoal, User
+from models import Budget, Transaction, SavingsGoal
 from schemas import (
     BudgetCreate, BudgetResponse,
     TransactionCreate, TransactionResponse,
     SavingsGoalCreate, SavingsGoalUpdate, SavingsGoalResponse
 )
-from routers.settings import get_default_user
+from routers.settings import get_default_user, UserIdentity
+from pagination import paginate
 
 router = APIRouter()
 
@@ -18,9 +19,12 @@ router = APIRouter()
 # Budgets
 @router.get("/budgets", response_model=List[BudgetResponse])
 def list_budgets(
+    response: Response,
     month: str = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
-    user: User = Depends(get_default_user)
+    user: UserIdentity = Depends(get_default_user)
 ):
     """List all budgets for the user."""
     query = db.query(Budget).filter(Budget.user_id == user.id)
@@ -28,14 +32,14 @@ def list_budgets(
     if month:
         query = query.filter(Budget.month_yyyymm == month)
 
-    return query.all()
+    return paginate(query, response, limit, cursor, Budget.id)
 
 
 @router.post("/budgets", response_model=BudgetResponse)
 def create_budget(
     budget: BudgetCreate,
     db: Session = Depends(get_db),
-    user: User = Depends(get_default_user)
+    user: UserIdentity = Depends(get_default_user)
 ):
     """Create a new budget."""
     db_budget = Budget(user_id=user.id, **budget.model_dump())
@@ -84,11 +88,14 @@ def delete_budget(budget_id: int, db: Session = Depends(get_db)):
 # Transactions
 @router.get("/transactions", response_model=List[TransactionResponse])
 def list_transactions(
+    response: Response,
     start: datetime = None,
     end: datetime = None,
     category: str = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
-    user: User = Depends(get_default_user)
+    user: UserIdentity = Depends(get_default_user)
 ):
     """List all transactions for the user."""
     query = db.query(Transaction).filter(Transaction.user_id == user.id)
@@ -100,14 +107,14 @@ def list_transactions(
     if category:
         query = query.filter(Transaction.category == category)
 
-    return query.order_by(Transaction.dt.desc()).all()
+    return paginate(query, response, limit, cursor, Transaction.dt.desc(), Transaction.id.desc())
 
 
 @router.post("/transactions", response_model=TransactionResponse)
 def create_transaction(
     transaction: TransactionCreate,
     db: Session = Depends(get_db),
-    user: User = Depends(get_default_user)
+    user: UserIdentity = Depends(get_default_user)
 ):
     """Create a new transaction."""
     db_transaction = Transaction(user_id=user.id, **transaction.model_dump())
@@ -155,16 +162,23 @@ def delete_transaction(transaction_id: int, db: Session = Depends(get_db)):
 
 # Savings Goals
 @router.get("/savings-goals", response_model=List[SavingsGoalResponse])
-def list_savings_goals(db: Session = Depends(get_db), user: User = Depends(get_default_user)):
+def list_savings_goals(
+    response: Response,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db),
+    user: UserIdentity = Depends(get_default_user)
+):
     """List all savings goals for the user."""
-    return db.query(SavingsGoal).filter(SavingsGoal.user_id == user.id).all()
+    query = db.query(SavingsGoal).filter(SavingsGoal.user_id == user.id)
+    return paginate(query, response, limit, cursor, SavingsGoal.id)
 
 
 @router.post("/savings-goals", response_model=SavingsGoalResponse)
 def create_savings_goal(
     goal: SavingsGoalCreate,
     db: Session = Depends(get_db),
-    user: User = Depends(get_default_user)
+    user: UserIdentity = Depends(get_default_user)
 ):
     """Create a new savings goal."""
     db_goal = SavingsGoal(user_id=user.id, **goal.model_dump())
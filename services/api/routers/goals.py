@@ -1,22 +1,26 @@
 """Goals and vision router."""
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from datetime import datetime
 from database import get_db
-from models import Goal, GoalCheckin, User
+from models import Goal, GoalCheckin
 from schemas import GoalCreate, GoalUpdate, GoalResponse, GoalCheckinCreate, GoalCheckinResponse
-from routers.settings import get_default_user
+from routers.settings import get_default_user, UserIdentity
+from pagination import paginate
 
 router = APIRouter()
 
 
 @router.get("", response_model=List[GoalResponse])
 def list_goals(
+    response: Response,
     horizon: str = None,
     status: str = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
-    user: User = Depends(get_default_user)
+    user: UserIdentity = Depends(get_default_user)
 ):
     """List all goals for the user."""
     query = db.query(Goal).filter(Goal.user_id == user.id)
@@ -26,14 +30,14 @@ def list_goals(
     if status:
         query = query.filter(Goal.status == status)
 
-    return query.all()
+    return paginate(query, response, limit, cursor, Goal.id)
 
 
 @router.post("", response_model=GoalResponse)
 def create_goal(
     goal: GoalCreate,
     db: Session = Depends(get_db),
-    user: User = Depends(get_default_user)
+    user: UserIdentity = Depends(get_default_user)
 ):
     """Create a new goal."""
     db_goal = Goal(user_id=user.id, **goal.model_dump())
@@ -82,9 +86,12 @@ def delete_goal(goal_id: int, db: Session = Depends(get_db)):
 # Goal Check-ins
 @router.get("/checkins", response_model=List[GoalCheckinResponse])
 def list_goal_checkins(
+    response: Response,
     goal_id: int = None,
     start: datetime = None,
     end: datetime = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db)
 ):
     """List goal check-ins."""
@@ -97,7 +104,7 @@ def list_goal_checkins(
     if end:
         query = query.filter(GoalCheckin.dt <= end)
 
-    return query.order_by(GoalCheckin.dt.desc()).all()
+    return paginate(query, response, limit, cursor, GoalCheckin.dt.desc(), GoalCheckin.id.desc())
 
 
 @router.post("/checkins", response_model=GoalCheckinResponse)
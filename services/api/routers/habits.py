@@ -1,21 +1,25 @@
 """Habits router."""
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Dict, Optional
 from datetime import datetime
 from database import get_db
-from models import Habit, HabitLog, User
+from models import Habit, HabitLog
 from schemas import HabitCreate, HabitResponse, HabitLogCreate, HabitLogResponse
-from routers.settings import get_default_user
+from routers.settings import get_default_user, UserIdentity
+from pagination import paginate
 
 router = APIRouter()
 
 
 @router.get("", response_model=List[HabitResponse])
 def list_habits(
+    response: Response,
     is_active: bool = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
-    user: User = Depends(get_default_user)
+    user: UserIdentity = Depends(get_default_user)
 ):
     """List all habits for the user."""
     query = db.query(Habit).filter(Habit.user_id == user.id)
@@ -23,14 +27,14 @@ def list_habits(
     if is_active is not None:
         query = query.filter(Habit.is_active == is_active)
 
-    return query.all()
+    return paginate(query, response, limit, cursor, Habit.id)
 
 
 @router.post("", response_model=HabitResponse)
 def create_habit(
     habit: HabitCreate,
     db: Session = Depends(get_db),
-    user: User = Depends(get_default_user)
+    user: UserIdentity = Depends(get_default_user)
 ):
     """Create a new habit."""
     db_habit = Habit(user_id=user.id, **habit.model_dump())
@@ -40,6 +44,50 @@ def create_habit(
     return db_habit
 
 
+def get_logs_by_habit(
+    db: Session,
+    habit_ids: List[int],
+    start: datetime = None,
+    end: datetime = None
+) -> Dict[int, List[HabitLog]]:
+    """Fetch logs for several habits in one query, grouped by habit id."""
+    grouped = {habit_id: [] for habit_id in habit_ids}
+    if not grouped:
+        return grouped
+
+    query = db.query(HabitLog).filter(HabitLog.habit_id.in_(list(grouped)))
+
+    if start:
+        query = query.filter(HabitLog.date >= start)
+    if end:
+        query = query.filter(HabitLog.date <= end)
+
+    for log in query.order_by(HabitLog.habit_id, HabitLog.date.desc(), HabitLog.id.desc()):
+        grouped[log.habit_id].append(log)
+
+    return grouped
+
+
+@router.get("/logs", response_model=Dict[int, List[HabitLogResponse]])
+def get_logs_for_habits(
+    habit_ids: Optional[List[int]] = Query(None),
+    is_active: bool = None,
+    start: datetime = None,
+    end: datetime = None,
+    db: Session = Depends(get_db),
+    user: UserIdentity = Depends(get_default_user)
+):
+    """Get logs for many habits at once, grouped by habit id."""
+    query = db.query(Habit.id).filter(Habit.user_id == user.id)
+
+    if habit_ids:
+        query = query.filter(Habit.id.in_(habit_ids))
+    if is_active is not None:
+        query = query.filter(Habit.is_active == is_active)
+
+    return get_logs_by_habit(db, [row.id for row in query], start, end)
+
+
 @router.get("/{habit_id}", response_model=HabitResponse)
 def get_habit(habit_id: int, db: Session = Depends(get_db)):
     """Get a specific habit."""
@@ -92,9 +140,12 @@ def log_habit(habit_id: int, log: HabitLogCreate, db: Session = Depends(get_db))
 
 @router.get("/{habit_id}/logs", response_model=List[HabitLogResponse])
 def get_habit_logs(
+    response: Response,
     habit_id: int,
     start: datetime = None,
     end: datetime = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db)
 ):
     """Get logs for a habit."""
@@ -105,4 +156,4 @@ def get_habit_logs(
     if end:
         query = query.filter(HabitLog.date <= end)
 
-    return query.order_by(HabitLog.date.desc()).all()
+    return paginate(query, response, limit, cursor, HabitLog.date.desc(), HabitLog.id.desc())
@@ -1,22 +1,26 @@
 """Journal entries router."""
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from datetime import datetime
 from database import get_db
-from models import JournalEntry, User
+from models import JournalEntry
 from schemas import JournalEntryCreate, JournalEntryResponse
-from routers.settings import get_default_user
+from routers.settings import get_default_user, UserIdentity
+from pagination import paginate
 
 router = APIRouter()
 
 
 @router.get("", response_model=List[JournalEntryResponse])
 def list_journal_entries(
+    response: Response,
     start: datetime = None,
     end: datetime = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
-    user: User = Depends(get_default_user)
+    user: UserIdentity = Depends(get_default_user)
 ):
     """List all journal entries for the user."""
     query = db.query(JournalEntry).filter(JournalEntry.user_id == user.id)
@@ -26,14 +30,14 @@ def list_journal_entries(
     if end:
         query = query.filter(JournalEntry.dt <= end)
 
-    return query.order_by(JournalEntry.dt.desc()).all()
+    return paginate(query, response, limit, cursor, JournalEntry.dt.desc(), JournalEntry.id.desc())
 
 
 @router.post("", response_model=JournalEntryResponse)
 def create_journal_entry(
     entry: JournalEntryCreate,
     db: Session = Depends(get_db),
-    user: User = Depends(get_default_user)
+    user: UserIdentity = Depends(get_default_user)
 ):
     """Create a new journal entry."""
     db_entry = JournalEntry(user_id=user.id, **entry.model_dump())
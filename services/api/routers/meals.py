@@ -1,22 +1,26 @@
 """Meals router."""
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from datetime import datetime
 from database import get_db
-from models import Meal, User
+from models import Meal
 from schemas import MealCreate, MealResponse
-from routers.settings import get_default_user
+from routers.settings import get_default_user, UserIdentity
+from pagination import paginate
 
 router = APIRouter()
 
 
 @router.get("", response_model=List[MealResponse])
 def list_meals(
+    response: Response,
     start: datetime = None,
     end: datetime = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
-    user: User = Depends(get_default_user)
+    user: UserIdentity = Depends(get_default_user)
 ):
     """List all meals for the user."""
     query = db.query(Meal).filter(Meal.user_id == user.id)
@@ -26,14 +30,14 @@ def list_meals(
     if end:
         query = query.filter(Meal.dt <= end)
 
-    return query.order_by(Meal.dt.desc()).all()
+    return paginate(query, response, limit, cursor, Meal.dt.desc(), Meal.id.desc())
 
 
 @router.post("", response_model=MealResponse)
 def create_meal(
     meal: MealCreate,
     db: Session = Depends(get_db),
-    user: User = Depends(get_default_user)
+    user: UserIdentity = Depends(get_default_user)
 ):
     """Create a new meal."""
     db_meal = Meal(user_id=user.id, **meal.model_dump())
@@ -1,40 +1,127 @@
 """Notes and personal wiki router."""
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy import text
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from database import get_db
-from models import Note, NoteLink, User
-from schemas import NoteCreate, NoteUpdate, NoteResponse
-from routers.settings import get_default_user
+from models import Note, NoteLink
+from schemas import NoteCreate, NoteUpdate, NoteResponse, NoteSearchResult
+from routers.settings import get_default_user, UserIdentity
+from pagination import paginate, encode_cursor, decode_cursor, MAX_PAGE_SIZE, NEXT_CURSOR_HEADER
+from fts import match_query
+
+# bm25 column weights for notes_fts(title, content_md, tags)
+NOTE_RANK = "bm25(notes_fts, 10.0, 1.0, 5.0)"
 
 router = APIRouter()
 
 
 @router.get("", response_model=List[NoteResponse])
 def list_notes(
+    response: Response,
     search: str = None,
     tag: str = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
-    user: User = Depends(get_default_user)
+    user: UserIdentity = Depends(get_default_user)
 ):
     """List all notes for the user."""
     query = db.query(Note).filter(Note.user_id == user.id)
 
     if search:
+        match = match_query(search)
+        if match is None:
+            return []
         query = query.filter(
-            (Note.title.contains(search)) | (Note.content_md.contains(search))
+            Note.id.in_(
+                text("SELECT rowid FROM notes_fts WHERE notes_fts MATCH :match")
+                .bindparams(match=match)
+            )
         )
     if tag:
         query = query.filter(Note.tags.contains(tag))
 
-    return query.order_by(Note.updated_at.desc()).all()
+    return paginate(query, response, limit, cursor, Note.updated_at.desc(), Note.id.desc())
+
+
+@router.get("/search", response_model=List[NoteSearchResult])
+def search_notes(
+    response: Response,
+    q: str,
+    tag: Optional[str] = None,
+    limit: int = 20,
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db),
+    user: UserIdentity = Depends(get_default_user)
+):
+    """Full-text search over notes, best matches first.
+
+    Args:
+        q: Words to search for (prefix-matched, all must appear)
+        tag: Only include notes whose tags contain this value
+        limit: Page size (capped at MAX_PAGE_SIZE)
+        cursor: Cursor from a previous page's X-Next-Cursor header
+
+    Returns:
+        Notes ranked by BM25 with highlighted title and content snippet
+    """
+    match = match_query(q)
+    if match is None:
+        return []
+
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    params = {"match": match, "user_id": user.id, "limit": limit + 1}
+    filters = ""
+
+    if tag:
+        filters += " AND n.tags LIKE :tag"
+        params["tag"] = f"%{tag}%"
+    if cursor:
+        params["after_rank"], params["after_id"] = decode_cursor(cursor, 2)
+        filters += (
+            f" AND ({NOTE_RANK} > :after_rank"
+            f" OR ({NOTE_RANK} = :after_rank AND n.id > :after_id))"
+        )
+
+    rows = db.execute(
+        text(
+            f"SELECT n.id, {NOTE_RANK} AS score,"
+            " highlight(notes_fts, 0, '<mark>', '</mark>') AS title_highlight,"
+            " snippet(notes_fts, 1, '<mark>', '</mark>', '…', 24) AS snippet"
+            " FROM notes_fts JOIN notes n ON n.id = notes_fts.rowid"
+            " WHERE notes_fts MATCH :match AND n.user_id = :user_id"
+            f"{filters}"
+            " ORDER BY score, n.id"
+            " LIMIT :limit"
+        ),
+        params,
+    ).all()
+
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor([rows[-1].score, rows[-1].id])
+
+    notes = {
+        note.id: note
+        for note in db.query(Note).filter(Note.id.in_([row.id for row in rows]))
+    }
+
+    return [
+        NoteSearchResult.model_validate(notes[row.id]).model_copy(update={
+            "rank": row.score,
+            "title_highlight": row.title_highlight,
+            "snippet": row.snippet,
+        })
+        for row in rows
+    ]
 
 
 @router.post("", response_model=NoteResponse)
 def create_note(
     note: NoteCreate,
     db: Session = Depends(get_db),
-    user: User = Depends(get_default_user)
+    user: UserIdentity = Depends(get_default_user)
 ):
     """Create a new note."""
     db_note = Note(user_id=user.id, **note.model_dump())
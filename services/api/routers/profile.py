@@ -1,16 +1,17 @@
 """User profile and memory router."""
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from datetime import datetime
 from database import get_db
-from models import UserProfile, ProfileHistory, MemoryEvent, ValuesJournal, User
+from models import UserProfile, ProfileHistory, MemoryEvent, ValuesJournal
 from schemas import (
     UserProfileUpdate, UserProfileResponse,
     MemoryEventCreate, MemoryEventResponse,
     ValuesJournalCreate, ValuesJournalResponse
 )
-from routers.settings import get_default_user
+from routers.settings import get_default_user, identity_cache, UserIdentity
+from pagination import paginate
 
 router = APIRouter()
 
@@ -19,9 +20,12 @@ router = APIRouter()
 @router.get("", response_model=UserProfileResponse)
 def get_user_profile(
     db: Session = Depends(get_db),
-    user: User = Depends(get_default_user)
+    user: UserIdentity = Depends(get_default_user)
 ):
     """Get user profile."""
+    if identity_cache.profile is not None:
+        return identity_cache.profile
+
     profile = db.query(UserProfile).filter(UserProfile.user_id == user.id).first()
     if not profile:
         # Create empty profile
@@ -29,14 +33,14 @@ def get_user_profile(
         db.add(profile)
         db.commit()
         db.refresh(profile)
-    return profile
+    return identity_cache.store_profile(profile)
 
 
 @router.put("", response_model=UserProfileResponse)
 def update_user_profile(
     profile_data: UserProfileUpdate,
     db: Session = Depends(get_db),
-    user: User = Depends(get_default_user)
+    user: UserIdentity = Depends(get_default_user)
 ):
     """Update user profile."""
     profile = db.query(UserProfile).filter(UserProfile.user_id == user.id).first()
@@ -66,22 +70,22 @@ def update_user_profile(
 
     db.commit()
     db.refresh(profile)
-    return profile
+    return identity_cache.store_profile(profile)
 
 
 @router.get("/history", response_model=List[dict])
 def get_profile_history(
-    limit: int = 20,
+    response: Response,
+    limit: Optional[int] = 20,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
-    user: User = Depends(get_default_user)
+    user: UserIdentity = Depends(get_default_user)
 ):
     """Get profile change history."""
-    history = (
-        db.query(ProfileHistory)
-        .filter(ProfileHistory.user_id == user.id)
-        .order_by(ProfileHistory.changed_at.desc())
-        .limit(limit)
-        .all()
+    query = db.query(ProfileHistory).filter(ProfileHistory.user_id == user.id)
+    history = paginate(
+        query, response, limit, cursor,
+        ProfileHistory.changed_at.desc(), ProfileHistory.id.desc()
     )
 
     return [
@@ -98,17 +102,17 @@ def get_profile_history(
 # Memory Events
 @router.get("/memory", response_model=List[MemoryEventResponse])
 def list_memory_events(
-    limit: int = 50,
+    response: Response,
+    limit: Optional[int] = 50,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
-    user: User = Depends(get_default_user)
+    user: UserIdentity = Depends(get_default_user)
 ):
     """List memory events (Q&A pairs)."""
-    return (
-        db.query(MemoryEvent)
-        .filter(MemoryEvent.user_id == user.id)
-        .order_by(MemoryEvent.created_at.desc())
-        .limit(limit)
-        .all()
+    query = db.query(MemoryEvent).filter(MemoryEvent.user_id == user.id)
+    return paginate(
+        query, response, limit, cursor,
+        MemoryEvent.created_at.desc(), MemoryEvent.id.desc()
     )
 
 
@@ -116,7 +120,7 @@ def list_memory_events(
 def create_memory_event(
     event: MemoryEventCreate,
     db: Session = Depends(get_db),
-    user: User = Depends(get_default_user)
+    user: UserIdentity = Depends(get_default_user)
 ):
     """Create a new memory event."""
     db_event = MemoryEvent(user_id=user.id, **event.model_dump())
@@ -129,15 +133,17 @@ def create_memory_event(
 # Values Journal
 @router.get("/values", response_model=List[ValuesJournalResponse])
 def list_values_journal(
+    response: Response,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
-    user: User = Depends(get_default_user)
+    user: UserIdentity = Depends(get_default_user)
 ):
     """List values journal entries."""
-    return (
-        db.query(ValuesJournal)
-        .filter(ValuesJournal.user_id == user.id)
-        .order_by(ValuesJournal.dt.desc())
-        .all()
+    query = db.query(ValuesJournal).filter(ValuesJournal.user_id == user.id)
+    return paginate(
+        query, response, limit, cursor,
+        ValuesJournal.dt.desc(), ValuesJournal.id.desc()
     )
 
 
@@ -145,7 +151,7 @@ def list_values_journal(
 def create_values_entry(
     entry: ValuesJournalCreate,
     db: Session = Depends(get_db),
-    user: User = Depends(get_default_user)
+    user: UserIdentity = Depends(get_default_user)
 ):
     """Create a new values journal entry."""
     db_entry = ValuesJournal(user_id=user.id, **entry.model_dump())
@@ -1,20 +1,24 @@
 """Projects router."""
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from database import get_db
-from models import Project, User
+from models import Project
 from schemas import ProjectCreate, ProjectResponse
-from routers.settings import get_default_user
+from routers.settings import get_default_user, UserIdentity
+from pagination import paginate
 
 router = APIRouter()
 
 
 @router.get("", response_model=List[ProjectResponse])
 def list_projects(
+    response: Response,
     status: str = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
-    user: User = Depends(get_default_user)
+    user: UserIdentity = Depends(get_default_user)
 ):
     """List all projects for the user."""
     query = db.query(Project).filter(Project.user_id == user.id)
@@ -22,14 +26,14 @@ def list_projects(
     if status:
         query = query.filter(Project.status == status)
 
-    return query.all()
+    return paginate(query, response, limit, cursor, Project.id)
 
 
 @router.post("", response_model=ProjectResponse)
 def create_project(
     project: ProjectCreate,
     db: Session = Depends(get_db),
-    user: User = Depends(get_default_user)
+    user: UserIdentity = Depends(get_default_user)
 ):
     """Create a new project."""
     db_project = Project(user_id=user.id, **project.model_dump())
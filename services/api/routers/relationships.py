@@ -1,19 +1,23 @@
 """Relationships and nurture cycles router."""
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from database import get_db
-from models import User, NurtureCycle
+from models import NurtureCycle
 from schemas import NurtureCycleCreate, NurtureCycleUpdate, NurtureCycleResponse
-from routers.settings import get_default_user
+from routers.settings import get_default_user, UserIdentity
+from pagination import paginate
 
 router = APIRouter()
 
 
 @router.get("/nurture-cycles", response_model=List[NurtureCycleResponse])
 def list_nurture_cycles(
+    response: Response,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
-    user: User = Depends(get_default_user)
+    user: UserIdentity = Depends(get_default_user)
 ):
     """List all nurture cycles with their contacts."""
     # Get all contacts for the user
@@ -21,18 +25,18 @@ def list_nurture_cycles(
     contacts = db.query(Contact).filter(Contact.user_id == user.id).all()
     contact_ids = [c.id for c in contacts]
 
-    cycles = db.query(NurtureCycle).filter(
+    query = db.query(NurtureCycle).filter(
         NurtureCycle.contact_id.in_(contact_ids)
-    ).all()
+    )
 
-    return cycles
+    return paginate(query, response, limit, cursor, NurtureCycle.id)
 
 
 @router.post("/nurture-cycles", response_model=NurtureCycleResponse)
 def create_nurture_cycle(
     cycle: NurtureCycleCreate,
     db: Session = Depends(get_db),
-    user: User = Depends(get_default_user)
+    user: UserIdentity = Depends(get_default_user)
 ):
     """Create a new nurture cycle for a contact."""
     # Verify the contact belongs to the user
@@ -64,7 +68,7 @@ def create_nurture_cycle(
 def get_nurture_cycle(
     cycle_id: int,
     db: Session = Depends(get_db),
-    user: User = Depends(get_default_user)
+    user: UserIdentity = Depends(get_default_user)
 ):
     """Get a specific nurture cycle."""
     cycle = db.query(NurtureCycle).filter(NurtureCycle.id == cycle_id).first()
@@ -90,7 +94,7 @@ def update_nurture_cycle(
     cycle_id: int,
     cycle_update: NurtureCycleUpdate,
     db: Session = Depends(get_db),
-    user: User = Depends(get_default_user)
+    user: UserIdentity = Depends(get_default_user)
 ):
     """Update a nurture cycle."""
     cycle = db.query(NurtureCycle).filter(NurtureCycle.id == cycle_id).first()
@@ -120,7 +124,7 @@ def update_nurture_cycle(
 def delete_nurture_cycle(
     cycle_id: int,
     db: Session = Depends(get_db),
-    user: User = Depends(get_default_user)
+    user: UserIdentity = Depends(get_default_user)
 ):
     """Delete a nurture cycle."""
     cycle = db.query(NurtureCycle).filter(NurtureCycle.id == cycle_id).first()
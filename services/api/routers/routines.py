@@ -1,27 +1,35 @@
 """Routines and chores router."""
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from datetime import datetime
 from database import get_db
-from models import Routine, RoutineRun, User
+from models import Routine, RoutineRun
 from schemas import RoutineCreate, RoutineResponse, RoutineRunCreate, RoutineRunResponse
-from routers.settings import get_default_user
+from routers.settings import get_default_user, UserIdentity
+from pagination import paginate
 
 router = APIRouter()
 
 
 @router.get("", response_model=List[RoutineResponse])
-def list_routines(db: Session = Depends(get_db), user: User = Depends(get_default_user)):
+def list_routines(
+    response: Response,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db),
+    user: UserIdentity = Depends(get_default_user)
+):
     """List all routines for the user."""
-    return db.query(Routine).filter(Routine.user_id == user.id).all()
+    query = db.query(Routine).filter(Routine.user_id == user.id)
+    return paginate(query, response, limit, cursor, Routine.id)
 
 
 @router.post("", response_model=RoutineResponse)
 def create_routine(
     routine: RoutineCreate,
     db: Session = Depends(get_db),
-    user: User = Depends(get_default_user)
+    user: UserIdentity = Depends(get_default_user)
 ):
     """Create a new routine."""
     db_routine = Routine(user_id=user.id, **routine.model_dump())
@@ -70,9 +78,12 @@ def delete_routine(routine_id: int, db: Session = Depends(get_db)):
 # Routine Runs
 @router.get("/runs", response_model=List[RoutineRunResponse])
 def list_routine_runs(
+    response: Response,
     routine_id: int = None,
     start: datetime = None,
     end: datetime = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db)
 ):
     """List routine runs."""
@@ -85,7 +96,7 @@ def list_routine_runs(
     if end:
         query = query.filter(RoutineRun.dt <= end)
 
-    return query.order_by(RoutineRun.dt.desc()).all()
+    return paginate(query, response, limit, cursor, RoutineRun.dt.desc(), RoutineRun.id.desc())
 
 
 @router.post("/runs", response_model=RoutineRunResponse)
@@ -1,42 +1,106 @@
 """Settings router."""
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
+from dataclasses import dataclass
+import threading
 from database import get_db
-from models import Settings, User
-from schemas import SettingsBase, SettingsResponse
+from models import Settings, User, UserProfile
+from schemas import SettingsBase, SettingsResponse, UserProfileResponse
 
 router = APIRouter()
 
 
-def get_default_user(db: Session = Depends(get_db)) -> User:
-    """Get or create default user (single-user system)."""
-    user = db.query(User).first()
-    if not user:
-        user = User(display_name="Julius", timezone="America/Chicago")
-        db.add(user)
-        db.commit()
-        db.refresh(user)
-    return user
+@dataclass(frozen=True)
+class UserIdentity:
+    """Detached snapshot of the User row; enough to scope queries by user id."""
+    id: int
+    display_name: str
+    timezone: str
+
+
+class IdentityCache:
+    """Process-level cache of the single user and their hot rows.
+
+    Holds the resolved user plus serialized Settings and UserProfile rows so
+    that get_default_user, GET /settings and GET /profile cost no query after
+    the first request. The settings and profile write routes refresh their
+    entries; anything writing those tables outside the API needs a restart
+    (or clear()) to be seen.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.user: Optional[UserIdentity] = None
+        self.settings: Optional[dict] = None
+        self.profile: Optional[dict] = None
+
+    def store_settings(self, settings: Settings) -> dict:
+        """Cache a Settings row and return its serialized form."""
+        self.settings = SettingsResponse.model_validate(settings).model_dump()
+        return self.settings
+
+    def store_profile(self, profile: UserProfile) -> dict:
+        """Cache a UserProfile row and return its serialized form."""
+        self.profile = UserProfileResponse.model_validate(profile).model_dump()
+        return self.profile
+
+    def clear(self):
+        """Drop every cached entry."""
+        with self.lock:
+            self.user = None
+            self.settings = None
+            self.profile = None
+
+
+identity_cache = IdentityCache()
+
+
+def get_default_user(db: Session = Depends(get_db)) -> UserIdentity:
+    """Get or create default user (single-user system).
+
+    The user is resolved once per process and served from identity_cache.
+    """
+    user = identity_cache.user
+    if user is not None:
+        return user
+
+    with identity_cache.lock:
+        if identity_cache.user is None:
+            db_user = db.query(User).first()
+            if not db_user:
+                db_user = User(display_name="Julius", timezone="America/Chicago")
+                db.add(db_user)
+                db.commit()
+                db.refresh(db_user)
+            identity_cache.user = UserIdentity(
+                id=db_user.id,
+                display_name=db_user.display_name,
+                timezone=db_user.timezone,
+            )
+        return identity_cache.user
 
 
 @router.get("", response_model=SettingsResponse)
-def get_settings(db: Session = Depends(get_db), user: User = Depends(get_default_user)):
+def get_settings(db: Session = Depends(get_db), user: UserIdentity = Depends(get_default_user)):
     """Get user settings."""
+    if identity_cache.settings is not None:
+        return identity_cache.settings
+
     settings = db.query(Settings).filter(Settings.user_id == user.id).first()
     if not settings:
         settings = Settings(user_id=user.id)
         db.add(settings)
         db.commit()
         db.refresh(settings)
-    return settings
+    return identity_cache.store_settings(settings)
 
 
 @router.put("", response_model=SettingsResponse)
 def update_settings(
     settings_data: SettingsBase,
     db: Session = Depends(get_db),
-    user: User = Depends(get_default_user)
+    user: UserIdentity = Depends(get_default_user)
 ):
     """Update user settings."""
     settings = db.query(Settings).filter(Settings.user_id == user.id).first()
@@ -49,4 +113,4 @@ def update_settings(
 
     db.commit()
     db.refresh(settings)
-    return settings
+    return identity_cache.store_settings(settings)
@@ -1,27 +1,35 @@
 """Skills and learning router."""
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from datetime import datetime
 from database import get_db
-from models import Skill, LearningSession, User
+from models import Skill, LearningSession
 from schemas import SkillCreate, SkillResponse, LearningSessionCreate, LearningSessionResponse
-from routers.settings import get_default_user
+from routers.settings import get_default_user, UserIdentity
+from pagination import paginate
 
 router = APIRouter()
 
 
 @router.get("", response_model=List[SkillResponse])
-def list_skills(db: Session = Depends(get_db), user: User = Depends(get_default_user)):
+def list_skills(
+    response: Response,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db),
+    user: UserIdentity = Depends(get_default_user)
+):
     """List all skills for the user."""
-    return db.query(Skill).filter(Skill.user_id == user.id).all()
+    query = db.query(Skill).filter(Skill.user_id == user.id)
+    return paginate(query, response, limit, cursor, Skill.id)
 
 
 @router.post("", response_model=SkillResponse)
 def create_skill(
     skill: SkillCreate,
     db: Session = Depends(get_db),
-    user: User = Depends(get_default_user)
+    user: UserIdentity = Depends(get_default_user)
 ):
     """Create a new skill."""
     db_skill = Skill(user_id=user.id, **skill.model_dump())
@@ -69,11 +77,14 @@ def delete_skill(skill_id: int, db: Session = Depends(get_db)):
 
 @router.get("/learning-sessions", response_model=List[LearningSessionResponse])
 def list_learning_sessions(
+    response: Response,
     skill_id: int = None,
     start: datetime = None,
     end: datetime = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
-    user: User = Depends(get_default_user)
+    user: UserIdentity = Depends(get_default_user)
 ):
     """List all learning sessions for the user."""
     query = db.query(LearningSession).filter(LearningSession.user_id == user.id)
@@ -85,14 +96,14 @@ def list_learning_sessions(
     if end:
         query = query.filter(LearningSession.dt <= end)
 
-    return query.order_by(LearningSession.dt.desc()).all()
+    return paginate(query, response, limit, cursor, LearningSession.dt.desc(), LearningSession.id.desc())
 
 
 @router.post("/learning-sessions", response_model=LearningSessionResponse)
 def create_learning_session(
     session: LearningSessionCreate,
     db: Session = Depends(get_db),
-    user: User = Depends(get_default_user)
+    user: UserIdentity = Depends(get_default_user)
 ):
     """Create a new learning session."""
     db_session = LearningSession(user_id=user.id, **session.model_dump())
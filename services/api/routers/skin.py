@@ -1,16 +1,17 @@
 """Skin & hygiene router."""
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from datetime import datetime
 from database import get_db
-from models import SkinProduct, SkinRoutine, SkinLog, User
+from models import SkinProduct, SkinRoutine, SkinLog
 from schemas import (
     SkinProductCreate, SkinProductResponse,
     SkinRoutineCreate, SkinRoutineResponse,
     SkinLogCreate, SkinLogResponse
 )
-from routers.settings import get_default_user
+from routers.settings import get_default_user, UserIdentity
+from pagination import paginate
 
 router = APIRouter()
 
@@ -18,9 +19,12 @@ router = APIRouter()
 # Products
 @router.get("/products", response_model=List[SkinProductResponse])
 def list_skin_products(
+    response: Response,
     is_active: bool = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
-    user: User = Depends(get_default_user)
+    user: UserIdentity = Depends(get_default_user)
 ):
     """List all skin products for the user."""
     query = db.query(SkinProduct).filter(SkinProduct.user_id == user.id)
@@ -28,14 +32,14 @@ def list_skin_products(
     if is_active is not None:
         query = query.filter(SkinProduct.is_active == is_active)
 
-    return query.all()
+    return paginate(query, response, limit, cursor, SkinProduct.id)
 
 
 @router.post("/products", response_model=SkinProductResponse)
 def create_skin_product(
     product: SkinProductCreate,
     db: Session = Depends(get_db),
-    user: User = Depends(get_default_user)
+    user: UserIdentity = Depends(get_default_user)
 ):
     """Create a new skin product."""
     db_product = SkinProduct(user_id=user.id, **product.model_dump())
@@ -79,18 +83,22 @@ def delete_skin_product(product_id: int, db: Session = Depends(get_db)):
 # Routines
 @router.get("/routines", response_model=List[SkinRoutineResponse])
 def list_skin_routines(
+    response: Response,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
-    user: User = Depends(get_default_user)
+    user: UserIdentity = Depends(get_default_user)
 ):
     """List all skin routines for the user."""
-    return db.query(SkinRoutine).filter(SkinRoutine.user_id == user.id).all()
+    query = db.query(SkinRoutine).filter(SkinRoutine.user_id == user.id)
+    return paginate(query, response, limit, cursor, SkinRoutine.id)
 
 
 @router.post("/routines", response_model=SkinRoutineResponse)
 def create_skin_routine(
     routine: SkinRoutineCreate,
     db: Session = Depends(get_db),
-    user: User = Depends(get_default_user)
+    user: UserIdentity = Depends(get_default_user)
 ):
     """Create a new skin routine."""
     db_routine = SkinRoutine(user_id=user.id, **routine.model_dump())
@@ -122,10 +130,13 @@ def update_skin_routine(
 # Logs
 @router.get("/logs", response_model=List[SkinLogResponse])
 def list_skin_logs(
+    response: Response,
     start: datetime = None,
     end: datetime = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
-    user: User = Depends(get_default_user)
+    user: UserIdentity = Depends(get_default_user)
 ):
     """List skin logs for the user."""
     query = db.query(SkinLog).filter(SkinLog.user_id == user.id)
@@ -135,14 +146,14 @@ def list_skin_logs(
     if end:
         query = query.filter(SkinLog.dt <= end)
 
-    return query.order_by(SkinLog.dt.desc()).all()
+    return paginate(query, response, limit, cursor, SkinLog.dt.desc(), SkinLog.id.desc())
 
 
 @router.post("/logs", response_model=SkinLogResponse)
 def create_skin_log(
     log: SkinLogCreate,
     db: Session = Depends(get_db),
-    user: User = Depends(get_default_user)
+    user: UserIdentity = Depends(get_default_user)
 ):
     """Create a new skin log."""
     db_log = SkinLog(user_id=user.id, **log.model_dump())
@@ -1,22 +1,26 @@
 """Sleep logs router."""
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from datetime import datetime
 from database import get_db
-from models import SleepLog, User
+from models import SleepLog
 from schemas import SleepLogCreate, SleepLogResponse
-from routers.settings import get_default_user
+from routers.settings import get_default_user, UserIdentity
+from pagination import paginate
 
 router = APIRouter()
 
 
 @router.get("", response_model=List[SleepLogResponse])
 def list_sleep_logs(
+    response: Response,
     start: datetime = None,
     end: datetime = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
-    user: User = Depends(get_default_user)
+    user: UserIdentity = Depends(get_default_user)
 ):
     """List all sleep logs for the user."""
     query = db.query(SleepLog).filter(SleepLog.user_id == user.id)
@@ -26,14 +30,14 @@ def list_sleep_logs(
     if end:
         query = query.filter(SleepLog.date <= end)
 
-    return query.order_by(SleepLog.date.desc()).all()
+    return paginate(query, response, limit, cursor, SleepLog.date.desc(), SleepLog.id.desc())
 
 
 @router.post("", response_model=SleepLogResponse)
 def create_sleep_log(
     sleep_log: SleepLogCreate,
     db: Session = Depends(get_db),
-    user: User = Depends(get_default_user)
+    user: UserIdentity = Depends(get_default_user)
 ):
     """Create a new sleep log."""
     db_sleep_log = SleepLog(user_id=user.id, **sleep_log.model_dump())
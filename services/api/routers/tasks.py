@@ -1,21 +1,25 @@
 """Tasks router."""
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from database import get_db
-from models import Task, User
+from models import Task
 from schemas import TaskCreate, TaskUpdate, TaskResponse
-from routers.settings import get_default_user
+from routers.settings import get_default_user, UserIdentity
+from pagination import paginate
 
 router = APIRouter()
 
 
 @router.get("", response_model=List[TaskResponse])
 def list_tasks(
+    response: Response,
     status: Optional[str] = None,
     project_id: Optional[int] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
-    user: User = Depends(get_default_user)
+    user: UserIdentity = Depends(get_default_user)
 ):
     """List all tasks for the user."""
     query = db.query(Task).filter(Task.user_id == user.id)
@@ -25,14 +29,14 @@ def list_tasks(
     if project_id:
         query = query.filter(Task.project_id == project_id)
 
-    return query.order_by(Task.priority.desc(), Task.due_ts).all()
+    return paginate(query, response, limit, cursor, Task.priority.desc(), Task.due_ts, Task.id)
 
 
 @router.post("", response_model=TaskResponse)
 def create_task(
     task: TaskCreate,
     db: Session = Depends(get_db),
-    user: User = Depends(get_default_user)
+    user: UserIdentity = Depends(get_default_user)
 ):
     """Create a new task."""
     db_task = Task(user_id=user.id, **task.model_dump())
@@ -1,16 +1,25 @@
 """Terminal command execution router."""
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import Optional
-import subprocess
+from typing import List, Optional
+import asyncio
+import codecs
+import json
 import os
-import shlex
+from terminal_engine import engine, CommandRun
+from pty_sessions import pool, ShellSession, SessionClosed, SessionLimitReached
 
 router = APIRouter()
 
+# Queued to a session subscription when its websocket client disconnects
+DETACHED = object()
+
 class CommandRequest(BaseModel):
     command: str
     cwd: Optional[str] = None
+    timeout: Optional[float] = 30  # seconds; None waits for the command to finish
+    session_id: Optional[str] = None  # run in this persistent shell session
 
 class CommandResponse(BaseModel):
     stdout: str
@@ -18,6 +27,40 @@ class CommandResponse(BaseModel):
     exit_code: int
     cwd: str
 
+class SessionRequest(BaseModel):
+    session_id: Optional[str] = None
+    cwd: Optional[str] = None
+    rows: int = 24
+    cols: int = 80
+
+class SessionResponse(BaseModel):
+    session_id: str
+    cwd: str  # as of the last exec in the session
+    rows: int
+    cols: int
+    alive: bool
+    attached: int
+    offset: int
+    created_at: float
+    last_active: float
+
+class ResizeRequest(BaseModel):
+    rows: int
+    cols: int
+
+class RunRequest(BaseModel):
+    command: str
+    cwd: Optional[str] = None
+
+class RunResponse(BaseModel):
+    run_id: str
+    command: str
+    cwd: str
+    status: str  # running, exited, cancelled
+    exit_code: Optional[int] = None
+    started_at: float
+    finished_at: Optional[float] = None
+
 # Dangerous commands that should be blocked
 BLOCKED_COMMANDS = ['rm -rf /', 'dd', 'mkfs', 'format', ':(){:|:&};:']
 
@@ -38,41 +81,286 @@ def is_command_safe(command: str) -> bool:
 
     return True
 
-@router.post("/execute", response_model=CommandResponse)
-async def execute_command(request: CommandRequest):
-    """Execute a shell command and return the output."""
+def resolve_command(command: str, cwd: Optional[str]) -> str:
+    """Validate a command and its working directory.
 
-    if not is_command_safe(request.command):
+    Returns:
+        The working directory to run in (defaults to the home directory)
+    """
+    if not is_command_safe(command):
         raise HTTPException(status_code=403, detail="Command blocked for safety reasons")
 
     # Default to home directory
-    cwd = request.cwd or os.path.expanduser('~')
+    cwd = cwd or os.path.expanduser('~')
+
+    if not os.path.isdir(cwd):
+        raise HTTPException(status_code=400, detail="Invalid working directory")
+
+    return cwd
+
+def get_run_or_404(run_id: str) -> CommandRun:
+    run = engine.get(run_id)
+    if not run:
+        raise HTTPException(status_code=404, detail="Run not found")
+    return run
+
+def run_response(run: CommandRun) -> RunResponse:
+    return RunResponse(
+        run_id=run.id,
+        command=run.command,
+        cwd=run.cwd,
+        status=run.status,
+        exit_code=run.exit_code,
+        started_at=run.started_at,
+        finished_at=run.finished_at
+    )
+
+@router.post("/execute", response_model=CommandResponse)
+async def execute_command(request: CommandRequest):
+    """Execute a shell command and return the output.
+
+    Compatibility wrapper around /runs that waits for the command to finish.
+    """
+    if request.session_id:
+        return await execute_in_session(request.session_id, request)
+
+    cwd = resolve_command(request.command, request.cwd)
+    run = engine.start(request.command, cwd)
+
+    try:
+        exit_code = await asyncio.wait_for(run.wait(), timeout=request.timeout)
+    except asyncio.TimeoutError:
+        await run.cancel()
+        raise HTTPException(status_code=408, detail=f"Command timed out after {request.timeout:g} seconds")
+
+    return CommandResponse(
+        stdout=run.output("stdout"),
+        stderr=run.output("stderr"),
+        exit_code=exit_code,
+        cwd=cwd
+    )
+
+@router.post("/runs", response_model=RunResponse)
+async def start_run(request: RunRequest):
+    """Start a command in the background.
+
+    Stream its output from /runs/{run_id}/ws (WebSocket) or
+    /runs/{run_id}/events (server-sent events).
+    """
+    cwd = resolve_command(request.command, request.cwd)
+    return run_response(engine.start(request.command, cwd))
+
+@router.get("/runs", response_model=List[RunResponse])
+async def list_runs():
+    """List running and recently finished commands."""
+    return [run_response(run) for run in engine.list()]
+
+@router.get("/runs/{run_id}", response_model=RunResponse)
+async def get_run(run_id: str):
+    """Get the status of a command run."""
+    return run_response(get_run_or_404(run_id))
+
+@router.delete("/runs/{run_id}", response_model=RunResponse)
+async def cancel_run(run_id: str):
+    """Cancel a running command (SIGTERM, then SIGKILL)."""
+    run = get_run_or_404(run_id)
+    await run.cancel()
+    return run_response(run)
+
+def exit_message(run: CommandRun) -> dict:
+    return {"type": "exit", "exit_code": run.exit_code, "cancelled": run.cancelled}
 
+@router.get("/runs/{run_id}/events")
+async def stream_run_events(run_id: str):
+    """Stream a run's output as server-sent events, replaying from the start."""
+    run = get_run_or_404(run_id)
+
+    async def events():
+        async for stream, data in run.follow():
+            yield f"data: {json.dumps({'type': 'output', 'stream': stream, 'data': data})}\n\n"
+        yield f"data: {json.dumps(exit_message(run))}\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+@router.websocket("/runs/{run_id}/ws")
+async def stream_run_ws(websocket: WebSocket, run_id: str):
+    """Stream a run's output over a WebSocket.
+
+    Server messages are {"type": "output", "stream", "data"} followed by a
+    final {"type": "exit", "exit_code", "cancelled"}. Send {"type": "cancel"}
+    to stop the command.
+    """
+    run = engine.get(run_id)
+    await websocket.accept()
+    if not run:
+        await websocket.close(code=4404, reason="Run not found")
+        return
+
+    async def receive_commands():
+        try:
+            while True:
+                message = await websocket.receive_json()
+                if message.get("type") == "cancel":
+                    await run.cancel()
+        except (WebSocketDisconnect, RuntimeError, ValueError):
+            # Client went away, socket closed, or a non-JSON message
+            pass
+
+    receiver = asyncio.create_task(receive_commands())
+    try:
+        async for stream, data in run.follow():
+            await websocket.send_json({"type": "output", "stream": stream, "data": data})
+        await websocket.send_json(exit_message(run))
+    except WebSocketDisconnect:
+        return
+    finally:
+        receiver.cancel()
+
+    await websocket.close()
+
+def get_session_or_404(session_id: str) -> ShellSession:
+    session = pool.get(session_id)
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+    return session
+
+async def open_or_429(session_id: Optional[str], cwd: Optional[str], rows: int = 24, cols: int = 80) -> ShellSession:
+    try:
+        return await pool.open(session_id, cwd, rows, cols)
+    except SessionLimitReached:
+        raise HTTPException(status_code=429, detail="All shell sessions are in use")
+
+def session_response(session: ShellSession) -> SessionResponse:
+    return SessionResponse(
+        session_id=session.id,
+        cwd=session.cwd,
+        rows=session.rows,
+        cols=session.cols,
+        alive=session.alive,
+        attached=session.attached,
+        offset=session.offset,
+        created_at=session.created_at,
+        last_active=session.last_active
+    )
+
+@router.post("/sessions", response_model=SessionResponse)
+async def open_session(request: SessionRequest):
+    """Open a persistent shell session, or return it if it is already running."""
+    cwd = request.cwd or os.path.expanduser('~')
     if not os.path.isdir(cwd):
         raise HTTPException(status_code=400, detail="Invalid working directory")
 
+    session = await open_or_429(request.session_id, cwd, request.rows, request.cols)
+    return session_response(session)
+
+@router.get("/sessions", response_model=List[SessionResponse])
+async def list_sessions():
+    """List live shell sessions."""
+    return [session_response(session) for session in await pool.list()]
+
+@router.get("/sessions/{session_id}", response_model=SessionResponse)
+async def get_session(session_id: str):
+    """Get a shell session."""
+    return session_response(get_session_or_404(session_id))
+
+@router.delete("/sessions/{session_id}")
+async def close_session(session_id: str):
+    """Close a shell session and kill its processes."""
+    get_session_or_404(session_id)
+    await pool.close(session_id)
+    return {"success": True, "closed_id": session_id}
+
+@router.post("/sessions/{session_id}/resize", response_model=SessionResponse)
+async def resize_session(session_id: str, request: ResizeRequest):
+    """Change the terminal size of a shell session."""
+    session = get_session_or_404(session_id)
+    session.resize(request.rows, request.cols)
+    return session_response(session)
+
+@router.post("/sessions/{session_id}/exec", response_model=CommandResponse)
+async def exec_in_session(session_id: str, request: CommandRequest):
+    """Run a command in a shell session (started on demand) and return its output."""
+    return await execute_in_session(session_id, request)
+
+async def execute_in_session(session_id: str, request: CommandRequest) -> CommandResponse:
+    """Run a command in a persistent session; stdout and stderr arrive merged."""
+    if not is_command_safe(request.command):
+        raise HTTPException(status_code=403, detail="Command blocked for safety reasons")
+    if request.cwd and not os.path.isdir(request.cwd):
+        raise HTTPException(status_code=400, detail="Invalid working directory")
+
+    session = await open_or_429(session_id, request.cwd)
+    cwd = request.cwd if request.cwd and request.cwd != session.cwd else None
+
     try:
-        # Execute command
-        result = subprocess.run(
-            request.command,
-            shell=True,
-            cwd=cwd,
-            capture_output=True,
-            text=True,
-            timeout=30  # 30 second timeout
-        )
-
-        return CommandResponse(
-            stdout=result.stdout,
-            stderr=result.stderr,
-            exit_code=result.returncode,
-            cwd=cwd
-        )
-
-    except subprocess.TimeoutExpired:
-        raise HTTPException(status_code=408, detail="Command timed out after 30 seconds")
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        output, exit_code, cwd = await session.exec(request.command, request.timeout, cwd)
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=408, detail=f"Command timed out after {request.timeout:g} seconds")
+    except SessionClosed:
+        await pool.close(session_id)
+        raise HTTPException(status_code=410, detail="Shell session exited")
+
+    return CommandResponse(stdout=output, stderr="", exit_code=exit_code, cwd=cwd)
+
+@router.websocket("/sessions/{session_id}/ws")
+async def attach_session(websocket: WebSocket, session_id: str, since: Optional[int] = None):
+    """Attach a terminal to a shell session.
+
+    On connect the buffered output since byte offset ``since`` (default: all
+    that is still buffered) is replayed. Server messages are
+    {"type": "output", "data", "offset"} and a final {"type": "exit", "exit_code"};
+    offset is where the next output starts, so pass it as ``since`` when
+    reconnecting. Client messages are {"type": "input", "data"} and
+    {"type": "resize", "rows", "cols"}.
+    """
+    session = pool.get(session_id)
+    await websocket.accept()
+    if not session:
+        await websocket.close(code=4404, reason="Session not found")
+        return
+
+    queue = session.subscribe()
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+    async def receive_input():
+        try:
+            while True:
+                message = await websocket.receive_json()
+                if message.get("type") == "input":
+                    session.write(message.get("data", ""))
+                elif message.get("type") == "resize":
+                    session.resize(int(message["rows"]), int(message["cols"]))
+        except (WebSocketDisconnect, RuntimeError):
+            # Client went away or socket closed: detach now, not at the next output
+            queue.put_nowait(DETACHED)
+        except (ValueError, KeyError, SessionClosed):
+            # Bad message, or shell exited
+            pass
+
+    receiver = asyncio.create_task(receive_input())
+    try:
+        start, backlog = session.backlog(since)
+        offset = start + len(backlog)
+        if backlog:
+            await websocket.send_json({"type": "output", "data": decoder.decode(backlog), "offset": offset})
+
+        while True:
+            chunk = await queue.get()
+            if chunk is DETACHED:
+                return
+            if chunk is None:
+                break
+            offset += len(chunk)
+            await websocket.send_json({"type": "output", "data": decoder.decode(chunk), "offset": offset})
+
+        await websocket.send_json({"type": "exit", "exit_code": session.exit_code})
+    except WebSocketDisconnect:
+        return
+    finally:
+        receiver.cancel()
+        session.unsubscribe(queue)
+
+    await websocket.close()
 
 @router.get("/cwd")
 async def get_cwd():
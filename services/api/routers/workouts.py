@@ -1,22 +1,26 @@
 """Workouts router."""
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from datetime import datetime
 from database import get_db
-from models import Workout, User
+from models import Workout
 from schemas import WorkoutCreate, WorkoutResponse
-from routers.settings import get_default_user
+from routers.settings import get_default_user, UserIdentity
+from pagination import paginate
 
 router = APIRouter()
 
 
 @router.get("", response_model=List[WorkoutResponse])
 def list_workouts(
+    response: Response,
     start: datetime = None,
     end: datetime = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
-    user: User = Depends(get_default_user)
+    user: UserIdentity = Depends(get_default_user)
 ):
     """List all workouts for the user."""
     query = db.query(Workout).filter(Workout.user_id == user.id)
@@ -26,14 +30,14 @@ def list_workouts(
     if end:
         query = query.filter(Workout.dt <= end)
 
-    return query.order_by(Workout.dt.desc()).all()
+    return paginate(query, response, limit, cursor, Workout.dt.desc(), Workout.id.desc())
 
 
 @router.post("", response_model=WorkoutResponse)
 def create_workout(
     workout: WorkoutCreate,
     db: Session = Depends(get_db),
-    user: User = Depends(get_default_user)
+    user: UserIdentity = Depends(get_default_user)
 ):
     """Create a new workout."""
     db_workout = Workout(user_id=user.id, **workout.model_dump())
@@ -330,6 +330,12 @@ class NoteResponse(BaseModel):
         from_attributes = True
 
 
+class NoteSearchResult(NoteResponse):
+    rank: float = 0.0
+    title_highlight: str = ""
+    snippet: str = ""
+
+
 # Bible
 class BiblePlanCreate(BaseModel):
     name: str
@@ -685,6 +691,51 @@ class WeeklyReviewResponse(BaseModel):
     habit_notes: List[str]
 
 
+class AgentJobResponse(BaseModel):
+    job_id: str
+    method: str
+    path: str
+    status: str  # running, succeeded, failed
+    status_code: Optional[int] = None
+    error: Optional[str] = None
+    created_at: float
+    finished_at: Optional[float] = None
+    result_url: str
+
+
+# Context bundle
+class ContextBundleResponse(BaseModel):
+    window_start: datetime
+    window_end: datetime
+    window_days: int
+    modules: List[str]
+    tasks: Optional[List[TaskResponse]] = None
+    events: Optional[List[EventResponse]] = None
+    habits: Optional[List[HabitResponse]] = None
+    habit_logs: Optional[Dict[int, List[HabitLogResponse]]] = None
+    meals: Optional[List[MealResponse]] = None
+    workouts: Optional[List[WorkoutResponse]] = None
+    sleep: Optional[List[SleepLogResponse]] = None
+    journal: Optional[List[JournalEntryResponse]] = None
+    projects: Optional[List[ProjectResponse]] = None
+    skills: Optional[List[SkillResponse]] = None
+    goals: Optional[List[GoalResponse]] = None
+    transactions: Optional[List[TransactionResponse]] = None
+    contacts: Optional[List[ContactResponse]] = None
+    bible_plans: Optional[List[BiblePlanResponse]] = None
+    recent_readings: Optional[List[BibleReadingResponse]] = None
+    routines: Optional[List[RoutineResponse]] = None
+
+
+class RetrievedItemResponse(BaseModel):
+    kind: str  # "journal", "notes" or "memory"
+    id: int
+    score: float
+    title: Optional[str]
+    dt: Optional[datetime]
+    text: str
+
+
 # Skin & Hygiene
 class SkinProductCreate(BaseModel):
     name: str
@@ -0,0 +1,170 @@
+"""Asynchronous shell command runner for the terminal router.
+
+Commands run as asyncio subprocesses in their own process group, so they
+never block the event loop and can be cancelled together with any children
+they spawn. Output is kept per run as (stream, text) chunks; any number of
+followers can replay it from the start and then receive new chunks live.
+"""
+import asyncio
+import codecs
+import os
+import signal
+import time
+import uuid
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+# Finished runs are kept this long so late clients can still read them
+FINISHED_RUN_TTL_S = 600
+# Grace period between SIGTERM and SIGKILL on cancel
+KILL_GRACE_S = 3.0
+READ_CHUNK_SIZE = 4096
+
+
+class CommandRun:
+    """One shell command and its captured output."""
+
+    def __init__(self, command: str, cwd: str):
+        self.id = uuid.uuid4().hex
+        self.command = command
+        self.cwd = cwd
+        self.started_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.exit_code: Optional[int] = None
+        self.cancelled = False
+        self.chunks: List[Tuple[str, str]] = []
+        self._process: Optional[asyncio.subprocess.Process] = None
+        self._changed = asyncio.Condition()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def done(self) -> bool:
+        return self.finished_at is not None
+
+    @property
+    def status(self) -> str:
+        if not self.done:
+            return "running"
+        return "cancelled" if self.cancelled else "exited"
+
+    def output(self, stream: str) -> str:
+        """All output captured so far on ``stream`` ("stdout" or "stderr")."""
+        return "".join(text for name, text in self.chunks if name == stream)
+
+    async def _publish(self, stream: str, text: str):
+        async with self._changed:
+            self.chunks.append((stream, text))
+            self._changed.notify_all()
+
+    async def _pump(self, reader: asyncio.StreamReader, stream: str):
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        while True:
+            data = await reader.read(READ_CHUNK_SIZE)
+            if not data:
+                break
+            text = decoder.decode(data)
+            if text:
+                await self._publish(stream, text)
+        tail = decoder.decode(b"", final=True)
+        if tail:
+            await self._publish(stream, tail)
+
+    async def _run(self):
+        try:
+            self._process = await asyncio.create_subprocess_shell(
+                self.command,
+                cwd=self.cwd,
+                stdin=asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                start_new_session=True,
+            )
+            if self.cancelled:
+                os.killpg(self._process.pid, signal.SIGKILL)
+            await asyncio.gather(
+                self._pump(self._process.stdout, "stdout"),
+                self._pump(self._process.stderr, "stderr"),
+            )
+            self.exit_code = await self._process.wait()
+        except Exception as e:
+            await self._publish("stderr", str(e))
+            self.exit_code = -1
+        finally:
+            async with self._changed:
+                self.finished_at = time.time()
+                self._changed.notify_all()
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def wait(self) -> int:
+        """Wait for the command to finish and return its exit code."""
+        await asyncio.shield(self._task)
+        return self.exit_code
+
+    async def cancel(self):
+        """Terminate the command's process group, escalating to SIGKILL."""
+        if self.done:
+            return
+
+        self.cancelled = True
+        process = self._process
+        if process is None:
+            # Not spawned yet; _run kills it as soon as it starts
+            return
+
+        try:
+            os.killpg(process.pid, signal.SIGTERM)
+            try:
+                await asyncio.wait_for(asyncio.shield(self._task), KILL_GRACE_S)
+            except asyncio.TimeoutError:
+                os.killpg(process.pid, signal.SIGKILL)
+                await asyncio.shield(self._task)
+        except ProcessLookupError:
+            pass
+
+    async def follow(self) -> AsyncIterator[Tuple[str, str]]:
+        """Yield every output chunk from the beginning until the run ends."""
+        sent = 0
+        while True:
+            async with self._changed:
+                await self._changed.wait_for(lambda: len(self.chunks) > sent or self.done)
+                pending = self.chunks[sent:]
+                sent = len(self.chunks)
+                finished = self.done
+
+            for chunk in pending:
+                yield chunk
+
+            if finished and sent == len(self.chunks):
+                return
+
+
+class TerminalEngine:
+    """Registry of command runs keyed by run id."""
+
+    def __init__(self):
+        self._runs: Dict[str, CommandRun] = {}
+
+    def start(self, command: str, cwd: str) -> CommandRun:
+        """Start ``command`` in ``cwd`` and return its run handle."""
+        self._evict()
+        run = CommandRun(command, cwd)
+        self._runs[run.id] = run
+        run.start()
+        return run
+
+    def get(self, run_id: str) -> Optional[CommandRun]:
+        return self._runs.get(run_id)
+
+    def list(self) -> List[CommandRun]:
+        self._evict()
+        return list(self._runs.values())
+
+    def _evict(self):
+        cutoff = time.time() - FINISHED_RUN_TTL_S
+        for run_id, run in list(self._runs.items()):
+            if run.done and run.finished_at < cutoff:
+                del self._runs[run_id]
+
+
+engine = TerminalEngine()